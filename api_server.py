@@ -0,0 +1,437 @@
+# api_server.py
+"""
+API JSON read-only (stdlib, ThreadingHTTPServer) di atas agregat kepemilikan KSEI.
+
+    python api_server.py --port 8502 [--data data/] [--types EQUITY] [--reload 300]
+
+Data (kubus, valuasi, Δ, indeks peristiwa) dimuat sekali lewat `data_analysis`
+dan diganti utuh saat versi dataset berubah (dicek tiap --reload detik;
+`sync_store` hanya stat file, tidak mem-parse ulang .txt yang sama).
+
+Endpoint (semua GET):
+    /health
+    /v1/codes                                  daftar kode
+    /v1/months                                 daftar bulan
+    /v1/codes/<KODE>/monthly                   per bulan × jenis × kategori
+    /v1/codes/<KODE>/summary                   total Lokal/Asing per bulan
+    /v1/codes/<KODE>/latest                    komposisi bulan terakhir
+    /v1/codes/<KODE>/events                    peristiwa signifikan kode tsb
+    /v1/rankings?bulan=YYYY-MM&jenis=Asing&kategori=MF&ukuran=saham&n=20
+    /v1/events?bulan=YYYY-MM[&jenis=Asing][&kategori=MF]
+
+Parameter umum: `fields=a,b` (proyeksi kolom), `limit` & `offset` (paginasi).
+Respons membawa ETag dari versi dataset + URL (If-None-Match -> 304), gzip
+kalau klien mendukung, dan di-cache di memori per (versi, URL, encoding).
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from balancepos import baca_banyak
+from data_analysis import (
+    investor_mapping,
+    muat_cube_ksei,
+    muat_peristiwa_ksei,
+    muat_valuasi_ksei,
+)
+from ksei_cube import JENIS, KATEGORI_KODE, OwnershipCube
+from ksei_store import dataset_version, sync_store
+from peristiwa import Peristiwa, peristiwa_bulan, peristiwa_kode
+from screener import Perubahan, UKURAN, hitung_perubahan, peringkat
+from valuasi import Valuasi
+
+LIMIT_DEFAULT = 500
+LIMIT_MAX = 5000
+GZIP_MIN_BYTES = 1024
+CACHE_RESPON_MAX = 1024     # respons (sudah di-encode) yang disimpan di memori
+MAX_AGE = 60
+
+_LABEL = np.array([investor_mapping[k] for k in KATEGORI_KODE], dtype=object)
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, pesan: str):
+        super().__init__(pesan)
+        self.status = status
+
+
+@dataclass(frozen=True)
+class Data:
+    cube: OwnershipCube
+    valuasi: Valuasi
+    perubahan: Perubahan
+    peristiwa: Peristiwa
+    dataset: str
+
+
+def muat_data(folder: str = "data/", types: List[str] | None = None) -> Data | None:
+    cube = muat_cube_ksei(folder, types=types)
+    if cube is None:
+        return None
+    return Data(
+        cube=cube,
+        valuasi=muat_valuasi_ksei(cube, folder),
+        perubahan=hitung_perubahan(cube),
+        peristiwa=muat_peristiwa_ksei(cube, folder),
+        dataset=cube.version,
+    )
+
+
+# ==========================
+# Frame per endpoint (kolom snake_case)
+# ==========================
+def _kode(d: Data, code: str) -> int:
+    try:
+        return d.cube.idx(code.upper())
+    except KeyError:
+        raise ApiError(404, f"kode {code} tidak ada") from None
+
+
+def _bulan(d: Data, q: Dict[str, str]) -> str:
+    bulan = q.get("bulan") or str(d.cube.months[-1])
+    if bulan not in set(d.cube.months):
+        raise ApiError(400, f"bulan {bulan} tidak ada di data")
+    return bulan
+
+
+def _pilihan(q: Dict[str, str], nama: str, opsi, default=None):
+    nilai = q.get(nama, default)
+    if nilai is not None and nilai not in opsi:
+        raise ApiError(400, f"{nama} harus salah satu dari {list(opsi)}")
+    return nilai
+
+
+def frame_monthly(d: Data, code: str) -> pd.DataFrame:
+    i = _kode(d, code)
+    m = np.flatnonzero(d.cube.present[i])
+    blok = d.cube.shares[i, m]                                   # (m, 2, 9)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        persen_jenis = blok / blok.sum(axis=2, keepdims=True) * 100
+    n_m, n_k = len(m), len(KATEGORI_KODE)
+    flat = lambda a: a.reshape(-1)                                # urutan: bulan, jenis, kategori
+    return pd.DataFrame({
+        "bulan": np.repeat(d.cube.months[m], 2 * n_k),
+        "jenis": np.tile(np.repeat(np.array(JENIS, dtype=object), n_k), n_m),
+        "kategori": np.tile(np.array(KATEGORI_KODE, dtype=object), 2 * n_m),
+        "kategori_label": np.tile(_LABEL, 2 * n_m),
+        "saham": flat(blok),
+        "delta": flat(d.perubahan.delta[i, m]),
+        "persen_jenis": flat(persen_jenis),
+        "persen_total": flat(d.perubahan.share[i, m]),
+        "nilai_rp": flat(d.valuasi.nilai[i, m]),
+        "persen_beredar": flat(d.valuasi.persen_beredar[i, m]),
+    })
+
+
+def frame_summary(d: Data, code: str) -> pd.DataFrame:
+    i = _kode(d, code)
+    m = np.flatnonzero(d.cube.present[i])
+    tot = d.cube.shares[i, m].sum(axis=2)                        # (m, 2)
+    nilai = d.valuasi.nilai[i, m].sum(axis=2)
+    return pd.DataFrame({
+        "bulan": d.cube.months[m],
+        "lokal": tot[:, 0],
+        "asing": tot[:, 1],
+        "total": tot.sum(axis=1),
+        "nilai_lokal_rp": nilai[:, 0],
+        "nilai_asing_rp": nilai[:, 1],
+        "harga": d.cube.price[i, m],
+        "saham_beredar": d.cube.sec_num[i, m],
+    })
+
+
+def frame_latest(d: Data, code: str) -> pd.DataFrame:
+    df = frame_monthly(d, code)
+    return df[df["bulan"] == df["bulan"].iloc[-1]] if len(df) else df
+
+
+def frame_events_kode(d: Data, code: str) -> pd.DataFrame:
+    _kode(d, code)
+    return _events(peristiwa_kode(d.cube, d.peristiwa, code.upper(), investor_mapping))
+
+
+def frame_events(d: Data, q: Dict[str, str]) -> pd.DataFrame:
+    return _events(peristiwa_bulan(
+        d.cube, d.peristiwa, _bulan(d, q), investor_mapping,
+        jenis=_pilihan(q, "jenis", JENIS), kategori=_pilihan(q, "kategori", KATEGORI_KODE),
+    ))
+
+
+def _events(df: pd.DataFrame) -> pd.DataFrame:
+    return df.rename(columns={
+        "Kode": "kode", "Bulan": "bulan", "Jenis": "jenis", "Kategori Lengkap": "kategori_label",
+        "Δ Saham": "delta", "Δ Relatif (%)": "relatif_pct", "Share (%)": "persen_total",
+        "Δ Share (pp)": "delta_persen_total", "Z-Skor": "z", "Z Lantai": "z_lantai",
+    })
+
+
+def frame_rankings(d: Data, q: Dict[str, str]) -> pd.DataFrame:
+    try:
+        n = max(1, min(int(q.get("n", 20)), LIMIT_MAX))
+    except ValueError:
+        raise ApiError(400, "n harus bilangan bulat") from None
+    jenis = _pilihan(q, "jenis", JENIS, "Asing")
+    akum, dist = peringkat(
+        d.cube, d.perubahan, _bulan(d, q), jenis=jenis,
+        kategori=_pilihan(q, "kategori", KATEGORI_KODE), ukuran=_pilihan(q, "ukuran", UKURAN, "saham"), top_n=n,
+    )
+    out = pd.concat([akum.assign(arah="akumulasi"), dist.assign(arah="distribusi")], ignore_index=True)
+    out.columns = ["kode", "kolom", "delta", "persen", "delta_jenis", "total_saham", "arah"]
+    return out[["arah", "kode", "kolom", "delta", "persen", "delta_jenis", "total_saham"]]
+
+
+_RUTE: List[Tuple[re.Pattern, Callable]] = [
+    (re.compile(r"/v1/codes/([^/]+)/monthly"), lambda d, q, c: frame_monthly(d, c)),
+    (re.compile(r"/v1/codes/([^/]+)/summary"), lambda d, q, c: frame_summary(d, c)),
+    (re.compile(r"/v1/codes/([^/]+)/latest"), lambda d, q, c: frame_latest(d, c)),
+    (re.compile(r"/v1/codes/([^/]+)/events"), lambda d, q, c: frame_events_kode(d, c)),
+    (re.compile(r"/v1/codes"), lambda d, q: pd.DataFrame({"kode": d.cube.codes})),
+    (re.compile(r"/v1/months"), lambda d, q: pd.DataFrame({"bulan": d.cube.months})),
+    (re.compile(r"/v1/rankings"), frame_rankings),
+    (re.compile(r"/v1/events"), frame_events),
+]
+
+
+# ==========================
+# Encoding respons
+# ==========================
+def _int(q: Dict[str, str], nama: str, default: int, maks: int | None = None) -> int:
+    try:
+        v = int(q.get(nama, default))
+    except ValueError:
+        raise ApiError(400, f"{nama} harus bilangan bulat") from None
+    if v < 0:
+        raise ApiError(400, f"{nama} tidak boleh negatif")
+    return min(v, maks) if maks is not None else v
+
+
+def render(d: Data, path: str, q: Dict[str, str]) -> bytes:
+    """Body JSON: {"dataset", "total", "offset", "limit", "data": [...]}."""
+    if path == "/health":
+        return json.dumps({"status": "ok", "dataset": d.dataset}).encode("utf-8")
+    for pola, fn in _RUTE:
+        cocok = pola.fullmatch(path)
+        if cocok:
+            df = fn(d, q, *cocok.groups())
+            break
+    else:
+        raise ApiError(404, f"tidak ada endpoint {path}")
+
+    if q.get("fields"):
+        kolom = [f.strip() for f in q["fields"].split(",") if f.strip()]
+        salah = [k for k in kolom if k not in df.columns]
+        if salah:
+            raise ApiError(400, f"kolom tidak dikenal: {', '.join(salah)}; tersedia: {', '.join(df.columns)}")
+        df = df[kolom]
+    offset = _int(q, "offset", 0)
+    limit = _int(q, "limit", LIMIT_DEFAULT, LIMIT_MAX)
+    halaman = df.iloc[offset:offset + limit]
+    kepala = json.dumps({"dataset": d.dataset, "total": len(df), "offset": offset, "limit": limit})
+    # data dari to_json (C, cepat; NaN/inf -> null) disisipkan langsung ke envelope
+    return (kepala[:-1] + ', "data": ' + halaman.to_json(orient="records", force_ascii=False) + "}").encode("utf-8")
+
+
+def etag(dataset: str, target: str) -> str:
+    # weak: representasi gzip & identitas dianggap setara
+    return 'W/"' + hashlib.sha1(f"{dataset}|{target}".encode("utf-8")).hexdigest()[:20] + '"'
+
+
+_ENTITY_TAG = re.compile(r'\s*((?:W/)?"[^"]*")\s*(?:,|$)')
+
+
+def _daftar_etag(header: str) -> List[str]:
+    """Entity-tag dari header daftar (`W/"a", "b"`); header rusak -> []."""
+    tags, pos, header = [], 0, header.strip()
+    while pos < len(header):
+        m = _ENTITY_TAG.match(header, pos)
+        if not m:
+            return []
+        tags.append(m.group(1))
+        pos = m.end()
+    return tags
+
+
+def cocok_etag(if_none_match: str | None, tag: str) -> bool:
+    """If-None-Match berisi `tag`? Daftar entity-tag dipisah koma, perbandingan weak (RFC 9110 §13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    inti = tag.removeprefix("W/")
+    return any(t.removeprefix("W/") == inti for t in _daftar_etag(if_none_match))
+
+
+def terima_gzip(accept_encoding: str | None) -> bool:
+    """Accept-Encoding mengizinkan gzip? Menghormati q=0 dan `*` (RFC 9110 §12.5.3)."""
+    q: Dict[str, float] = {}
+    for bagian in (accept_encoding or "").split(","):
+        nama, *param = [x.strip() for x in bagian.split(";")]
+        if not nama:
+            continue
+        bobot = 1.0
+        for pr in param:
+            k, _, v = pr.partition("=")
+            if k.strip().lower() == "q":
+                try:
+                    bobot = float(v)
+                except ValueError:
+                    bobot = 0.0
+        q[nama.lower()] = bobot
+    return q.get("gzip", q.get("x-gzip", q.get("*", 0.0))) > 0
+
+
+class Layanan:
+    """Data aktif + cache respons; dipakai bersama semua thread handler."""
+
+    def __init__(self, folder: str = "data/", types: List[str] | None = None):
+        self.folder = folder
+        self.types = types
+        self.data = muat_data(folder, types)
+        if self.data is None:
+            raise SystemExit(f"Tidak ada data KSEI di {folder}")
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def muat_ulang_jika_berubah(self) -> bool:
+        # sync_store cukup stat file; .txt hanya di-parse kalau baru/berubah
+        sync_store(self.folder, baca_banyak)
+        if self.data.dataset.startswith(f"{dataset_version(self.folder)}-"):
+            return False
+        data = muat_data(self.folder, self.types)
+        if data is None:
+            return False
+        with self._lock:
+            self.data = data
+            self._cache.clear()
+        return True
+
+    def respons(self, target: str, gz: bool, if_none_match: str | None = None) -> Tuple[int, bytes, str, bool]:
+        """
+        (status, body, etag, sudah_gzip) untuk request target (path + query).
+        304 hanya setelah target terbukti valid (ada di cache atau berhasil di-render),
+        jadi path/parameter salah tetap mendapat 404/400.
+        """
+        d = self.data
+        tag = etag(d.dataset, target)
+        kunci = (d.dataset, target, gz)
+        with self._lock:
+            hit = self._cache.get(kunci)
+            if hit is not None:
+                self._cache.move_to_end(kunci)
+        if hit is not None:
+            if cocok_etag(if_none_match, tag):
+                return 304, b"", tag, False
+            return 200, hit[0], tag, hit[1]
+        url = urlsplit(target)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        body = render(d, url.path.rstrip("/") or "/", q)
+        dikompres = gz and len(body) >= GZIP_MIN_BYTES
+        if dikompres:
+            body = gzip.compress(body, compresslevel=5)
+        with self._lock:
+            self._cache[kunci] = (body, dikompres)
+            if len(self._cache) > CACHE_RESPON_MAX:
+                self._cache.popitem(last=False)
+        if cocok_etag(if_none_match, tag):
+            return 304, b"", tag, False
+        return 200, body, tag, dikompres
+
+
+def buat_server(layanan: Layanan, host: str = "127.0.0.1", port: int = 8502) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"     # keep-alive; Content-Length selalu diisi
+        disable_nagle_algorithm = True    # header & body ditulis terpisah; tanpa ini kena delayed ACK ~40 ms
+        server_version = "ksei-api/1"
+
+        def do_GET(self):
+            gz = terima_gzip(self.headers.get("Accept-Encoding"))
+            try:
+                status, body, tag, dikompres = layanan.respons(self.path, gz, self.headers.get("If-None-Match"))
+            except ApiError as e:
+                status, body, tag, dikompres = e.status, json.dumps({"error": str(e)}).encode("utf-8"), None, False
+            except Exception as e:  # jangan matikan thread server
+                status, body, tag, dikompres = 500, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode("utf-8"), None, False
+            self._kirim(status, body, tag, dikompres)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def _kirim(self, status: int, body: bytes, tag: str | None, dikompres: bool):
+            self.send_response(status)
+            if status != 304:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Vary", "Accept-Encoding")
+            if dikompres:
+                self.send_header("Content-Encoding", "gzip")
+            if tag:
+                self.send_header("ETag", tag)
+                self.send_header("Cache-Control", f"public, max-age={MAX_AGE}")
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    return httpd
+
+
+def _pemuat_ulang(layanan: Layanan, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            if layanan.muat_ulang_jika_berubah():
+                print(f"🔄 Dataset baru: {layanan.data.dataset}")
+        except Exception as e:
+            print(f"⚠️ Gagal memuat ulang data: {e}")
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="API JSON read-only untuk agregat kepemilikan KSEI.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument("--data", default="data/", help="folder Balancepos*.txt")
+    ap.add_argument("--types", default="EQUITY", help="Type efek dipisah koma, atau 'all'")
+    ap.add_argument("--reload", type=float, default=300, help="detik antar cek versi dataset (0 = mati)")
+    args = ap.parse_args(argv)
+
+    types = None if args.types.lower() == "all" else [t.strip() for t in args.types.split(",") if t.strip()]
+    layanan = Layanan(args.data, types)
+    if args.reload > 0:
+        threading.Thread(target=_pemuat_ulang, args=(layanan, args.reload), daemon=True).start()
+    httpd = buat_server(layanan, args.host, args.port)
+    print(f"✅ {len(layanan.data.cube.codes)} kode, dataset {layanan.data.dataset} -> http://{args.host}:{args.port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+
+__all__ = [
+    "ApiError", "Data", "Layanan", "muat_data", "render", "etag", "cocok_etag", "terima_gzip", "buat_server", "main",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+# balancepos.py
+"""
+Reader khusus file KSEI `Balancepos*.txt` (pipe-delimited, 25 kolom).
+
+Skema dideklarasikan di depan supaya pandas tidak perlu menebak dtype, dan
+dua kolom `Total` diberi nama eksplisit (`Local Total` / `Foreign Total`).
+Tanggal diambil sekali per file (nama file, atau baris pertama), bukan per baris.
+"""
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+KATEGORI = ["IS", "CP", "PF", "IB", "ID", "MF", "SC", "FD", "OT"]
+
+COLUMNS: List[str] = (
+    ["Date", "Code", "Type", "Sec. Num", "Price"]
+    + [f"Local {k}" for k in KATEGORI] + ["Local Total"]
+    + [f"Foreign {k}" for k in KATEGORI] + ["Foreign Total"]
+)
+
+DTYPES: Dict[str, object] = {
+    "Date": "string",
+    "Code": "string",
+    "Type": "category",
+    "Sec. Num": "Int64",  # kosong untuk sebagian efek crowdfunding
+    **{c: np.int64 for c in COLUMNS[4:]},
+}
+
+_NAMA_FILE_RE = re.compile(r"(\d{8})")
+
+
+class BalanceposError(ValueError):
+    """File Balancepos tidak bisa dibaca sesuai skema."""
+
+
+def _tanggal_dari_nama(path: str) -> datetime | None:
+    m = _NAMA_FILE_RE.search(os.path.basename(path))
+    if not m:
+        return None
+    try:
+        return datetime.strptime(m.group(1), "%Y%m%d")
+    except ValueError:
+        return None
+
+
+def _tanggal_dari_baris_pertama(path: str) -> datetime | None:
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as fh:
+        fh.readline()  # header
+        first = fh.readline().split("|", 1)[0].strip()
+    if not first:
+        return None
+    for fmt in ("%d-%b-%Y", "%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(first.title(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def baca_balancepos(path: str) -> pd.DataFrame:
+    """
+    Parse satu file Balancepos. Kolom `Bulan` ('YYYY-MM') ditambahkan dari
+    tanggal file. Raise BalanceposError kalau header/isi tidak sesuai skema.
+    """
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as fh:
+        header = [h.strip() for h in fh.readline().split("|")]
+    if len(header) != len(COLUMNS) or header[:5] != COLUMNS[:5]:
+        raise BalanceposError(f"header tidak sesuai skema ({len(header)} kolom): {header[:5]}")
+
+    tanggal = _tanggal_dari_baris_pertama(path) or _tanggal_dari_nama(path)
+    if tanggal is None:
+        raise BalanceposError("tanggal tidak ditemukan di nama file maupun baris pertama")
+
+    try:
+        df = pd.read_csv(
+            path,
+            sep="|",
+            header=0,
+            names=COLUMNS,
+            dtype=DTYPES,  # type: ignore[arg-type]
+            engine="c",
+            encoding="utf-8-sig",
+        )
+    except (ValueError, pd.errors.ParserError) as e:
+        raise BalanceposError(str(e)) from e
+
+    df["Code"] = df["Code"].str.strip()
+    df["Bulan"] = tanggal.strftime("%Y-%m")
+    return df
+
+
+def _baca_aman(path: str) -> Tuple[str, pd.DataFrame | None, str | None]:
+    try:
+        return path, baca_balancepos(path), None
+    except Exception as e:  # dilaporkan ke pemanggil, bukan ditelan
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def baca_banyak(
+    paths: Iterable[str],
+    max_workers: int | None = None,
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+    """
+    Parse banyak file paralel di process pool.
+    Return (path -> frame, path -> pesan error) untuk file yang gagal.
+    """
+    paths = list(paths)
+    frames: Dict[str, pd.DataFrame] = {}
+    errors: Dict[str, str] = {}
+    if not paths:
+        return frames, errors
+
+    workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    if workers <= 1:
+        results = list(map(_baca_aman, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_baca_aman, paths))
+
+    for path, df, err in results:
+        if err is None:
+            frames[path] = df  # type: ignore[assignment]
+        else:
+            errors[path] = err
+    return frames, errors
+
+
+__all__ = [
+    "COLUMNS",
+    "DTYPES",
+    "BalanceposError",
+    "baca_balancepos",
+    "baca_banyak",
+]
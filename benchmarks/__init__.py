@@ -0,0 +1,6 @@
+"""
+Benchmark sintetis pipeline KSEI & berita.
+
+    python -m benchmarks --years 10 --codes 5000 --out hasil.json
+    python -m benchmarks --compare lama.json baru.json
+"""
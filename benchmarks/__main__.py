@@ -0,0 +1,282 @@
+# benchmarks/__main__.py
+"""
+Jalankan benchmark dan tulis hasil JSON (bisa dibandingkan antar commit).
+
+    python -m benchmarks                         # 2 tahun × 1000 kode + berita
+    python -m benchmarks --years 10 --codes 5000 --out hasil.json
+    python -m benchmarks --data data/ --skip-news
+    python -m benchmarks --compare lama.json baru.json [--threshold 0.1]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def _ukur(fn: Callable[[], object], repeat: int = 3, setup: Callable[[], None] | None = None,
+          memori: bool = True) -> dict:
+    """Waktu `repeat` kali (tanpa tracemalloc), lalu satu putaran lagi untuk puncak memori."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    out = {
+        "median_s": round(statistics.median(times), 6),
+        "min_s": round(min(times), 6),
+        "repeat": repeat,
+    }
+    if memori:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            out["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        finally:
+            tracemalloc.stop()
+    return out
+
+
+# ==========================
+# KSEI
+# ==========================
+def bench_ksei(folder: str, types: List[str] | None, repeat: int, n_kode: int) -> Dict[str, dict]:
+    from data_analysis import investor_mapping, muat_cube_ksei, proses_data_ksei
+    from ksei_cube import build_cube, frame_latest, frame_per_label, frame_summary, frame_trend
+    from ksei_store import store_dir
+    from screener import hitung_perubahan, peringkat
+    from valuasi import hitung_valuasi
+
+    hasil: Dict[str, dict] = {}
+    hapus_store = lambda: shutil.rmtree(store_dir(folder), ignore_errors=True)
+
+    hasil["ksei.cold_ingest"] = _ukur(lambda: proses_data_ksei(folder, types=types),
+                                      repeat=max(1, repeat // 2), setup=hapus_store)
+    hasil["ksei.warm_load"] = _ukur(lambda: proses_data_ksei(folder, types=types), repeat=repeat)
+
+    df, _, _, _ = proses_data_ksei(folder, types=types)
+    hasil["ksei.rows"] = {"n": int(len(df)), "codes": int(df["Code"].nunique()),
+                          "months": int(df["Bulan"].nunique())}
+    hasil["ksei.cube_build"] = _ukur(lambda: build_cube(df), repeat=repeat)
+    del df
+    muat_cube_ksei(folder, types=types)
+    hasil["ksei.warm_cube"] = _ukur(lambda: muat_cube_ksei(folder, types=types), repeat=repeat)
+    cube = muat_cube_ksei(folder, types=types)
+
+    rng = np.random.default_rng(0)
+    sampel = [str(c) for c in rng.choice(cube.codes, size=min(n_kode, len(cube.codes)), replace=False)]
+
+    def per_ticker():
+        for kode in sampel:
+            frame_summary(cube, kode)
+            frame_latest(cube, kode, investor_mapping)
+            frame_per_label(cube, kode, investor_mapping)
+            frame_trend(cube, kode, investor_mapping)
+
+    r = _ukur(per_ticker, repeat=repeat)
+    r["per_kode_ms"] = round(r["median_s"] / len(sampel) * 1000, 3)
+    r["kode"] = len(sampel)
+    hasil["ksei.per_ticker"] = r
+
+    hasil["ksei.screener_perubahan"] = _ukur(lambda: hitung_perubahan(cube), repeat=repeat)
+    perubahan = hitung_perubahan(cube)
+    bulan = list(cube.months[-12:])
+
+    def screener():
+        for b in bulan:
+            for jenis in ("Asing", "Lokal"):
+                for kategori in (None, "MF"):
+                    peringkat(cube, perubahan, b, jenis=jenis, kategori=kategori)
+
+    r = _ukur(screener, repeat=repeat)
+    r["queries"] = len(bulan) * 4
+    hasil["ksei.screener_peringkat"] = r
+    hasil["ksei.valuasi"] = _ukur(lambda: hitung_valuasi(cube), repeat=repeat)
+    return hasil
+
+
+# ==========================
+# Berita (stub HTTP lokal)
+# ==========================
+def bench_berita(tmp: str, repeat: int, n_feeds: int, items_per_feed: int, n_artikel: int,
+                 latency: float) -> Dict[str, dict]:
+    import berita_analysis
+    import http_cache
+    import scraping
+    from berita_dedup import cluster_berita
+    from benchmarks.stub_server import StubServer
+
+    # cache diarahkan ke folder sementara supaya cold benar-benar cold
+    berita_analysis.FEED_CACHE_DIR = os.path.join(tmp, "feeds")
+    http_cache.HTTP_CACHE_DIR = os.path.join(tmp, "http")
+    alias = {f"K{i:03d}": f"Perusahaan Contoh {i} Makmur" for i in range(1000)}
+    kodes = list(alias)[:200]
+
+    def kosongkan_memori():
+        with scraping._CACHE_LOCK:
+            scraping._CONTENT_CACHE.clear()
+
+    def kosongkan_semua():
+        kosongkan_memori()
+        shutil.rmtree(http_cache.HTTP_CACHE_DIR, ignore_errors=True)
+
+    hasil: Dict[str, dict] = {}
+    with StubServer(kodes, items_per_feed=items_per_feed, latency=latency) as stub:
+        feeds = stub.feeds(n_feeds)
+        urls = stub.artikel_urls(n_artikel)
+
+        def dengan_hits(nama, fn, **kw):
+            h0 = stub.hits
+            r = _ukur(fn, **kw)
+            r["http_requests"] = stub.hits - h0
+            hasil[nama] = r
+
+        dengan_hits("berita.feeds_cold", lambda: berita_analysis.ambil_feeds(feeds), repeat=repeat,
+                    setup=lambda: shutil.rmtree(berita_analysis.FEED_CACHE_DIR, ignore_errors=True))
+        dengan_hits("berita.feeds_warm", lambda: berita_analysis.ambil_feeds(feeds), repeat=repeat)
+
+        items, _ = berita_analysis.ambil_feeds(feeds)
+        matcher = berita_analysis.matcher_dari_alias(alias)
+        hasil["berita.matcher_build"] = _ukur(
+            lambda: berita_analysis.build_matcher({k: [k, v] for k, v in alias.items()}), repeat=repeat)
+        r = _ukur(lambda: berita_analysis.index_berita(items, matcher), repeat=repeat)
+        r["items"] = len(items)
+        hasil["berita.index"] = r
+        r = _ukur(lambda: cluster_berita([dict(it) for it in items]), repeat=repeat)
+        r["clusters"] = len(cluster_berita([dict(it) for it in items]))
+        hasil["berita.cluster"] = r
+
+        batch = lambda: scraping.ambil_isi_berita_batch(urls, deadline=120)
+        dengan_hits("berita.isi_cold", batch, repeat=repeat, setup=kosongkan_semua, memori=False)
+        dengan_hits("berita.isi_disk_warm", batch, repeat=repeat, setup=kosongkan_memori, memori=False)
+        dengan_hits("berita.isi_mem_warm", batch, repeat=repeat)
+    hasil["berita.params"] = {"feeds": n_feeds, "items_per_feed": items_per_feed,
+                              "artikel": n_artikel, "latency_s": latency}
+    return hasil
+
+
+# ==========================
+# Meta & perbandingan
+# ==========================
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _meta(args) -> dict:
+    # ru_maxrss: KB di Linux, byte di macOS
+    skala = 1 if sys.platform == "darwin" else 1024
+    return {
+        "waktu": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+        "maxrss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * skala / 1e6, 1),
+        "maxrss_children_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * skala / 1e6, 1),
+    }
+
+
+def bandingkan(lama_path: str, baru_path: str, threshold: float = 0.1) -> int:
+    """Cetak rasio median_s baru/lama per benchmark. Return jumlah regresi > threshold."""
+    with open(lama_path, encoding="utf-8") as fh:
+        lama = json.load(fh)["hasil"]
+    with open(baru_path, encoding="utf-8") as fh:
+        baru = json.load(fh)["hasil"]
+    regresi = 0
+    print(f"{'benchmark':32} {'lama (s)':>10} {'baru (s)':>10} {'rasio':>7}")
+    for nama in sorted(set(lama) & set(baru)):
+        a, b = lama[nama].get("median_s"), baru[nama].get("median_s")
+        if not a or b is None:
+            continue
+        rasio = b / a
+        tanda = ""
+        if rasio > 1 + threshold:
+            tanda, regresi = "  ⚠️ lebih lambat", regresi + 1
+        elif rasio < 1 - threshold:
+            tanda = "  ✅ lebih cepat"
+        print(f"{nama:32} {a:10.4f} {b:10.4f} {rasio:7.2f}{tanda}")
+    return regresi
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--data", help="folder Balancepos yang sudah ada (default: generate sintetis)")
+    ap.add_argument("--years", type=int, default=2)
+    ap.add_argument("--codes", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--types", default="EQUITY", help="Type dipisah koma, 'all' = semua")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--sample-codes", type=int, default=50)
+    ap.add_argument("--skip-ksei", action="store_true")
+    ap.add_argument("--skip-news", action="store_true")
+    ap.add_argument("--feeds", type=int, default=6)
+    ap.add_argument("--items-per-feed", type=int, default=30)
+    ap.add_argument("--articles", type=int, default=40)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--out", help="tulis hasil JSON ke file (default: stdout)")
+    ap.add_argument("--compare", nargs=2, metavar=("LAMA", "BARU"))
+    ap.add_argument("--threshold", type=float, default=0.1)
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        return 1 if bandingkan(*args.compare, threshold=args.threshold) else 0
+
+    types = None if args.types == "all" else [t.strip() for t in args.types.split(",") if t.strip()]
+    hasil: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+        if not args.skip_ksei:
+            folder = args.data
+            if folder is None:
+                from benchmarks.generator import generate
+                folder = os.path.join(tmp, "balancepos")
+                t0 = time.perf_counter()
+                generate(folder, years=args.years, codes=args.codes, seed=args.seed)
+                hasil["ksei.generate"] = {"median_s": None, "wall_s": round(time.perf_counter() - t0, 3)}
+            else:
+                # jangan sentuh store asli: salin file .txt ke folder sementara
+                src, folder = folder, os.path.join(tmp, "balancepos")
+                os.makedirs(folder)
+                for name in os.listdir(src):
+                    if name.endswith(".txt"):
+                        shutil.copy2(os.path.join(src, name), folder)
+            print("⏱️ KSEI ...", file=sys.stderr)
+            hasil.update(bench_ksei(folder, types, args.repeat, args.sample_codes))
+        if not args.skip_news:
+            print("⏱️ Berita ...", file=sys.stderr)
+            hasil.update(bench_berita(tmp, args.repeat, args.feeds, args.items_per_feed,
+                                      args.articles, args.latency_ms / 1000))
+
+    laporan = json.dumps({"meta": _meta(args), "hasil": hasil}, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(laporan + "\n")
+    else:
+        print(laporan)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# benchmarks/generator.py
+"""
+Generator file `Balancepos*.txt` sintetis dengan skema 25 kolom asli
+(pipe-delimited, dua kolom `Total`, CRLF) dan campuran Type seperti file KSEI.
+
+Kepemilikan tiap kode berjalan acak antar bulan; sebagian kode baru listing
+di tengah periode supaya `present` di kubus tidak penuh.
+"""
+from __future__ import annotations
+
+import os
+import string
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from balancepos import COLUMNS, KATEGORI
+
+# proporsi baris per Type (dari Balancepos November 2024)
+TYPE_MIX: Dict[str, float] = {
+    "EQUITY": 0.280,
+    "CORPORATE BOND": 0.241,
+    "STRUCTURED WARRANT": 0.134,
+    "SUKUK": 0.090,
+    "EQUITY CROWDFUNDING (ECF)": 0.074,
+    "SUKUK CROWD FUNDING": 0.055,
+    "TERM NOTES": 0.050,
+    "GOVERNMENT BOND": 0.020,
+    "SBSN": 0.014,
+    "MUTUAL FUND": 0.011,
+    "WARRANT": 0.008,
+    "DEBT CROWD FUNDING": 0.007,
+    "NEGOTIABLE CERTIFICATE OF DEPOSIT": 0.007,
+    "SPN": 0.004,
+    "EBA": 0.003,
+    "BANK INDONESIA RUPIAH SECURITIES (SRBI)": 0.002,
+    "DANA INVESTASI REAL ESTATE": 0.001,
+    "PERPETUAL BONDS": 0.001,
+}
+# Type yang kolom Sec. Num-nya kosong di file asli
+TANPA_SEC_NUM = {
+    "BANK INDONESIA RUPIAH SECURITIES (SRBI)",
+    "DEBT CROWD FUNDING",
+    "PERPETUAL BONDS",
+    "SUKUK CROWD FUNDING",
+}
+_HEADER = "|".join(c if not c.endswith(" Total") else "Total" for c in COLUMNS)
+
+
+def _akhir_bulan(tahun: int, bulan: int) -> date:
+    d = date(tahun + bulan // 12, bulan % 12 + 1, 1) - timedelta(days=1)
+    while d.weekday() >= 5:   # hari bursa terakhir (abaikan libur)
+        d -= timedelta(days=1)
+    return d
+
+
+def daftar_bulan(years: int, akhir: date | None = None) -> List[date]:
+    akhir = akhir or date(2024, 12, 31)
+    out = []
+    y, m = akhir.year, akhir.month
+    for _ in range(years * 12):
+        out.append(_akhir_bulan(y, m))
+        m -= 1
+        if m == 0:
+            y, m = y - 1, 12
+    return out[::-1]
+
+
+def _kode(rng: np.random.Generator, n: int, tipe: np.ndarray) -> np.ndarray:
+    huruf = np.array(list(string.ascii_uppercase))
+    base = ["".join(r) for r in rng.choice(huruf, size=(n, 4))]
+    kode = [
+        b if t == "EQUITY" else f"{b}{i % 100:02d}{t[:1]}{i % 7}"
+        for i, (b, t) in enumerate(zip(base, tipe))
+    ]
+    # jaga unik: tambahkan sufiks ke duplikat
+    seen: Dict[str, int] = {}
+    out = []
+    for k in kode:
+        c = seen.get(k, 0)
+        seen[k] = c + 1
+        out.append(k if c == 0 else f"{k}{c}")
+    return np.array(out, dtype=object)
+
+
+def generate(folder: str, years: int = 2, codes: int = 1000, seed: int = 42) -> List[str]:
+    """Tulis years*12 file Balancepos ke `folder` untuk `codes` kode. Return daftar path."""
+    os.makedirs(folder, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    types = np.array(list(TYPE_MIX))
+    p = np.array(list(TYPE_MIX.values()))
+    tipe = rng.choice(types, size=codes, p=p / p.sum())
+    kode = _kode(rng, codes, tipe)
+    order = np.argsort(kode)
+    kode, tipe = kode[order], tipe[order]
+
+    bulan = daftar_bulan(years)
+    n_k = len(KATEGORI)
+    # saham awal per kode×(Lokal/Asing)×kategori, lognormal; sebagian kategori kosong
+    saham = np.exp(rng.normal(16, 2.5, size=(codes, 2, n_k)))
+    saham *= rng.random((codes, 2, n_k)) > 0.25
+    sec_num = saham.sum(axis=(1, 2)) * rng.uniform(1.0, 1.3, size=codes)
+    harga = np.exp(rng.normal(5.5, 1.8, size=codes))
+    listing = np.where(rng.random(codes) < 0.2, rng.integers(0, len(bulan), size=codes), 0)
+    sec_kosong = np.isin(tipe, list(TANPA_SEC_NUM))
+
+    paths = []
+    for m, tgl in enumerate(bulan):
+        # random walk kepemilikan & harga
+        saham *= np.exp(rng.normal(0, 0.05, size=saham.shape))
+        harga *= np.exp(rng.normal(0, 0.08, size=codes))
+        ada = listing <= m
+        blok = np.round(saham[ada]).astype(np.int64)
+        lokal, asing = blok[:, 0], blok[:, 1]
+        sec = np.round(sec_num[ada]).astype(np.int64).astype(object)
+        sec[sec_kosong[ada]] = ""
+        df = pd.DataFrame({
+            "Date": tgl.strftime("%d-%b-%Y").upper(),
+            "Code": kode[ada],
+            "Type": tipe[ada],
+            "Sec. Num": sec,
+            "Price": np.round(harga[ada]).astype(np.int64),
+            **{f"Local {k}": lokal[:, j] for j, k in enumerate(KATEGORI)},
+            "Local Total": lokal.sum(axis=1),
+            **{f"Foreign {k}": asing[:, j] for j, k in enumerate(KATEGORI)},
+            "Foreign Total": asing.sum(axis=1),
+        })
+        path = os.path.join(folder, f"Balancepos{tgl:%Y%m%d}.txt")
+        with open(path, "w", encoding="utf-8", newline="") as fh:
+            fh.write(_HEADER + "\r\n")
+            df.to_csv(fh, sep="|", header=False, index=False, lineterminator="\r\n")
+        paths.append(path)
+    return paths
+
+
+__all__ = ["TYPE_MIX", "TANPA_SEC_NUM", "daftar_bulan", "generate"]
@@ -0,0 +1,117 @@
+# benchmarks/stub_server.py
+"""
+Server HTTP lokal untuk benchmark berita: RSS & HTML artikel kalengan dengan
+latensi buatan, supaya ambil_feeds / ambil_isi_berita_batch bisa diukur tanpa
+internet.
+
+    /rss/<n>.xml       feed ke-n, `items_per_feed` item (judul menyebut kode)
+    /artikel/<i>.html  halaman artikel ke-i (~4 KB teks di <div class="detail__body">)
+"""
+from __future__ import annotations
+
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Sequence
+from xml.sax.saxutils import escape
+
+_PARAGRAF = (
+    "Emiten {kode} mencatat kenaikan laba bersih kuartal ketiga, didorong penjualan "
+    "domestik dan efisiensi beban usaha, kata manajemen dalam paparan publik. "
+)
+
+
+def judul_artikel(i: int, kodes: Sequence[str]) -> str:
+    kode = kodes[i % len(kodes)]
+    # tiap artikel punya satu "salinan" sindikasi dengan judul sedikit beda (uji cluster)
+    varian = "" if (i // len(kodes)) % 2 == 0 else " (update)"
+    return f"Saham {kode} menguat, laba kuartal III naik{varian}"
+
+
+def rss(n: int, items_per_feed: int, kodes: Sequence[str], base: str) -> bytes:
+    items = []
+    for j in range(items_per_feed):
+        i = n * items_per_feed + j
+        items.append(
+            "<item>"
+            f"<title>{escape(judul_artikel(i, kodes))}</title>"
+            f"<link>{base}/artikel/{i}.html</link>"
+            f"<description>{escape(_PARAGRAF.format(kode=kodes[i % len(kodes)]))}</description>"
+            f"<pubDate>{formatdate(1_700_000_000 + i * 60)}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Stub Feed {n}</title>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def artikel(i: int, kodes: Sequence[str]) -> bytes:
+    kode = kodes[i % len(kodes)]
+    body = "".join(f"<p>{_PARAGRAF.format(kode=kode)}</p>" for _ in range(20))
+    return (
+        "<html><head>"
+        f'<meta property="og:title" content="{escape(judul_artikel(i, kodes))}">'
+        f'<meta property="article:published_time" content="2024-11-{i % 28 + 1:02d}T10:00:00+07:00">'
+        "</head><body><nav>menu</nav>"
+        f'<div class="detail__body">{body}</div><footer>footer</footer></body></html>'
+    ).encode("utf-8")
+
+
+class StubServer:
+    """ThreadingHTTPServer di 127.0.0.1 (port acak) yang jalan di thread daemon."""
+
+    def __init__(self, kodes: Sequence[str], items_per_feed: int = 20, latency: float = 0.05):
+        self.kodes: List[str] = list(kodes)
+        self.items_per_feed = items_per_feed
+        self.latency = latency
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.hits += 1
+                time.sleep(stub.latency)
+                path = self.path.split("?", 1)[0]
+                try:
+                    nomor = int(path.rsplit("/", 1)[-1].split(".", 1)[0])
+                except ValueError:
+                    nomor = -1
+                if path.startswith("/rss/") and nomor >= 0:
+                    body, ctype = rss(nomor, stub.items_per_feed, stub.kodes, stub.base), "application/rss+xml"
+                elif path.startswith("/artikel/") and nomor >= 0:
+                    body, ctype = artikel(nomor, stub.kodes), "text/html; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def feeds(self, n: int) -> List[str]:
+        return [f"{self.base}/rss/{i}.xml" for i in range(n)]
+
+    def artikel_urls(self, n: int) -> List[str]:
+        return [f"{self.base}/artikel/{i}.html" for i in range(n)]
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+__all__ = ["StubServer", "rss", "artikel", "judul_artikel"]
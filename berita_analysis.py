@@ -1,11 +1,19 @@
 # berita_analysis.py
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
+import threading
 import time
-from typing import Iterable, List, Dict, Tuple
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import FrozenSet, Iterable, List, Dict, Set, Tuple
 import pandas as pd
-import feedparser
+
+from berita_dedup import cluster_berita, fingerprint
+from profiling import span
 
 # ==========================
 # Konfigurasi & Utilities
@@ -60,45 +68,257 @@ def _normalize_aliases(kode: str, nama: str | None) -> List[str]:
         kws.update(tokens)
     return sorted(kws, key=str.lower)
 
-def _match(blob: str, keywords: Iterable[str]) -> bool:
-    text = (blob or "").lower()
-    for kw in keywords:
-        if not kw:
-            continue
-        pat = r"\b" + re.escape(kw.lower()) + r"\b"
-        if re.search(pat, text):
-            return True
-    return False
+# ==========================
+# Matcher multi-ticker (sekali scan per artikel)
+# ==========================
+_WORD_RE = re.compile(r"\w+")
 
-def _parse_feeds(sources: Iterable[str], retries: int = 1, sleep: float = 0.6):
+
+def _words(text: str) -> Tuple[str, ...]:
+    return tuple(_WORD_RE.findall((text or "").lower()))
+
+
+@dataclass(frozen=True)
+class TickerMatcher:
     """
-    Ambil item dari banyak RSS dengan retry ringan.
-    Return list of dicts: judul, link, summary, pubDate, source
+    Frasa kata kunci (sudah di-tokenisasi per kata) -> kode saham.
+    Pencocokan per batas kata seperti `\\b...\\b`, tapi seluruh kode dicek
+    dalam satu lintasan token artikel lewat lookup dict n-gram.
     """
-    items = []
-    for url in sources:
-        feed = None
-        for _ in range(retries + 1):
-            try:
-                feed = feedparser.parse(url)
-                if getattr(feed, "entries", None):
+    phrases: Dict[Tuple[str, ...], FrozenSet[str]]
+    lengths: Tuple[int, ...]
+
+    def scan(self, text: str) -> Set[str]:
+        words = _words(text)
+        found: Set[str] = set()
+        n_words = len(words)
+        for i in range(n_words):
+            for n in self.lengths:
+                if i + n > n_words:
                     break
-            except Exception:
-                pass
+                codes = self.phrases.get(words[i:i + n])
+                if codes:
+                    found.update(codes)
+        return found
+
+
+def build_matcher(keywords_per_code: Dict[str, Iterable[str]]) -> TickerMatcher:
+    """Bangun matcher dari {kode: [keyword, ...]}."""
+    phrases: Dict[Tuple[str, ...], Set[str]] = {}
+    for kode, kws in keywords_per_code.items():
+        for kw in kws:
+            toks = _words(kw)
+            if toks:
+                phrases.setdefault(toks, set()).add(kode)
+    return TickerMatcher(
+        phrases={k: frozenset(v) for k, v in phrases.items()},
+        lengths=tuple(sorted({len(k) for k in phrases})),
+    )
+
+
+_MATCHER_CACHE: Dict[int, TickerMatcher] = {}
+
+
+def matcher_dari_alias(alias_map: Dict[str, str]) -> TickerMatcher:
+    """Matcher untuk semua kode di `alias_map` (hasil load_alias), di-cache per isi map."""
+    key = hash(frozenset(alias_map.items()))
+    m = _MATCHER_CACHE.get(key)
+    if m is None:
+        m = build_matcher({k: _normalize_aliases(k, v) for k, v in alias_map.items()})
+        _MATCHER_CACHE.clear()
+        _MATCHER_CACHE[key] = m
+    return m
+
+
+def index_berita(items: Iterable[dict], matcher: TickerMatcher) -> Dict[str, List[dict]]:
+    """Inverted index kode -> artikel; judul+ringkasan tiap artikel di-scan sekali."""
+    index: Dict[str, List[dict]] = {}
+    for it in items:
+        blob = f"{it.get('judul','')} {it.get('summary','')}"
+        for kode in matcher.scan(blob):
+            index.setdefault(kode, []).append(it)
+    return index
+
+
+_INDEX_CACHE: Dict[tuple, Dict[str, List[dict]]] = {}
+_INDEX_CACHE_MAX = 8    # beberapa kombinasi sumber berbeda antar sesi
+
+
+def index_snapshot(items: List[dict], status: Dict[str, dict], alias_map: Dict[str, str]) -> Dict[str, List[dict]]:
+    """
+    Inverted index semua kode untuk satu snapshot feed (hasil ambil_feeds), dibangun
+    sekali per (alias_map, versi tiap feed) lalu dipakai ulang: lookup kode cukup dict hit.
+    """
+    key = (hash(frozenset(alias_map.items())),
+           tuple((url, st_.get("versi")) for url, st_ in status.items()))
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        index = index_berita(items, matcher_dari_alias(alias_map))
+        if len(_INDEX_CACHE) >= _INDEX_CACHE_MAX:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)), None)
+        _INDEX_CACHE[key] = index
+    return index
+
+FEED_TIMEOUT = 5.0     # deadline per feed (detik)
+FEED_BUDGET = 8.0      # total waktu tunggu semua feed (detik)
+FEED_TTL = 120.0       # detik; dalam jendela ini feed tidak di-request sama sekali
+FEED_CACHE_DIR = os.path.join(".cache", "feeds")
+FEED_OK_STATUS = ("ok", "cache", "not_modified", "stale")
+_FEED_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rss")
+
+
+# ==========================
+# Cache feed (ETag / Last-Modified)
+# ==========================
+def _feed_cache_path(url: str) -> str:
+    return os.path.join(FEED_CACHE_DIR, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+
+def _feed_cache_get(url: str) -> dict | None:
+    try:
+        with open(_feed_cache_path(url), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _feed_cache_put(url: str, entry: dict) -> None:
+    path = _feed_cache_path(url)
+    try:
+        os.makedirs(FEED_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Gagal simpan cache feed {url}: {e}")
+
+
+def _entries_to_items(feed, url: str) -> List[dict]:
+    src_title = (getattr(feed, "feed", {}) or {}).get("title", url)
+    items = []
+    for e in feed.entries:
+        items.append({
+            "judul": (e.get("title") or "").strip(),
+            "link": (e.get("link") or "").strip(),
+            "summary": ((e.get("summary") or e.get("description") or "")).strip(),
+            "pubDate": e.get("published", e.get("updated", "")),
+            "source": src_title,
+        })
+        fingerprint(items[-1])  # simhash dihitung sekali saat parse, ikut tersimpan di cache feed
+    return items
+
+
+def _fetch_feed(url: str, timeout: float, retries: int, sleep: float) -> Tuple[List[dict], dict]:
+    """
+    Ambil satu feed dalam batas `timeout` (termasuk retry). Return (items, status).
+    Dalam FEED_TTL hasil cache dipakai langsung; setelahnya dikirim conditional GET
+    (If-None-Match / If-Modified-Since) dan 304 memakai ulang entri yang sudah di-parse.
+    """
+    # impor berat (requests, feedparser, scraping -> bs4/lxml) baru saat feed benar-benar diambil,
+    # supaya app yang belum membuka bagian berita tidak ikut membayar waktu impornya
+    import feedparser
+    import requests
+    from scraping import UA
+
+    t0 = time.monotonic()
+    cached = _feed_cache_get(url)
+    # `versi` = kapan item feed ini terakhir di-parse; berubah hanya kalau isinya bisa berubah
+    versi = (cached or {}).get("versi", (cached or {}).get("fetched_at"))
+    if cached and time.time() - cached.get("fetched_at", 0) < FEED_TTL:
+        return cached["items"], {"status": "cache", "entries": len(cached["items"]),
+                                 "elapsed": time.monotonic() - t0, "error": None, "versi": versi}
+
+    headers = dict(UA)
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("modified"):
+            headers["If-Modified-Since"] = cached["modified"]
+
+    deadline = t0 + timeout
+    err = None
+    for attempt in range(retries + 1):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            r = requests.get(url, headers=headers, timeout=remaining)
+            if r.status_code == 304 and cached:
+                cached["fetched_at"] = time.time()
+                _feed_cache_put(url, cached)
+                return cached["items"], {"status": "not_modified", "entries": len(cached["items"]),
+                                         "elapsed": time.monotonic() - t0, "error": None, "versi": versi}
+            r.raise_for_status()
+            feed = feedparser.parse(r.content)
+            if getattr(feed, "entries", None):
+                items = _entries_to_items(feed, url)
+                versi = time.time()
+                _feed_cache_put(url, {
+                    "etag": r.headers.get("ETag"),
+                    "modified": r.headers.get("Last-Modified"),
+                    "fetched_at": versi,
+                    "versi": versi,
+                    "items": items,
+                })
+                return items, {"status": "ok", "entries": len(items),
+                               "elapsed": time.monotonic() - t0, "error": None, "versi": versi}
+            err = "feed kosong"
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+        if attempt < retries and deadline - time.monotonic() > sleep:
             time.sleep(sleep)
 
-        if not feed or not getattr(feed, "entries", None):
-            continue
-
-        src_title = (getattr(feed, "feed", {}) or {}).get("title", url)
-        for e in feed.entries:
-            items.append({
-                "judul": (e.get("title") or "").strip(),
-                "link": (e.get("link") or "").strip(),
-                "summary": ((e.get("summary") or e.get("description") or "")).strip(),
-                "pubDate": e.get("published", e.get("updated", "")),
-                "source": src_title,
-            })
+    if cached:
+        # lebih baik berita lama daripada kosong
+        return cached["items"], {"status": "stale", "entries": len(cached["items"]),
+                                 "elapsed": time.monotonic() - t0, "error": err, "versi": versi}
+    status = "kosong" if err == "feed kosong" else "error"
+    if time.monotonic() >= deadline and status == "error":
+        status = "timeout"
+    return [], {"status": status, "entries": 0, "elapsed": time.monotonic() - t0, "error": err}
+
+
+def ambil_feeds(
+    sources: Iterable[str],
+    timeout: float = FEED_TIMEOUT,
+    budget: float = FEED_BUDGET,
+    retries: int = 1,
+    sleep: float = 0.6,
+) -> Tuple[List[dict], Dict[str, dict]]:
+    """
+    Ambil banyak RSS secara paralel. Tiap feed punya deadline `timeout`, semua
+    feed bersama punya batas `budget`; feed yang belum selesai ditandai 'timeout'.
+    Return (items, status per URL).
+    """
+    sources = list(dict.fromkeys(sources))
+    futures = {_FEED_POOL.submit(_fetch_feed, url, timeout, retries, sleep): url for url in sources}
+    with span("berita.feeds"):
+        done, pending = wait(futures, timeout=budget)
+
+    items: List[dict] = []
+    status: Dict[str, dict] = {}
+    # urutan hasil mengikuti urutan `sources`, bukan urutan selesai
+    by_url = {futures[f]: f for f in futures}
+    for url in sources:
+        fut = by_url[url]
+        if fut in done:
+            feed_items, st_ = fut.result()
+            items.extend(feed_items)
+            status[url] = st_
+        else:
+            fut.cancel()
+            status[url] = {"status": "timeout", "entries": 0, "elapsed": budget,
+                           "error": f"melewati budget {budget:.1f}s"}
+    return items, status
+
+
+def _parse_feeds(sources: Iterable[str], retries: int = 1, sleep: float = 0.6):
+    """
+    Ambil item dari banyak RSS (paralel, dengan deadline) dengan retry ringan.
+    Return list of dicts: judul, link, summary, pubDate, source
+    """
+    items, _ = ambil_feeds(sources, retries=retries, sleep=sleep)
     return items
 
 # ==========================
@@ -109,11 +329,14 @@ def ambil_berita_dengan_alias(
     alias_map: Dict[str, str],
     sources: Iterable[str] | None = None,
     extra_keywords: Iterable[str] | None = None,
+    feed_status: Dict[str, dict] | None = None,
 ) -> Tuple[str, List[dict]]:
     """
     Ambil berita dari RSS dan filter berdasarkan kode/alias.
     - kode: 'BBCA'
     - alias_map[kode] -> 'Bank Central Asia'
+    - feed_status: kalau diisi dict, akan diisi status per feed (ok/kosong/error/timeout)
+    Return (keyword_cari, items); tiap item wakil satu cluster berita kembar (`duplikat`).
     """
     sources = list(sources) if sources else DEFAULT_SOURCES
     nama = alias_map.get(kode)
@@ -126,15 +349,18 @@ def ambil_berita_dengan_alias(
     # buang duplikat
     aliases = sorted(set(aliases), key=str.lower)
 
-    # parse feeds
-    items = _parse_feeds(sources)
+    # parse feeds (paralel)
+    items, status = ambil_feeds(sources)
+    if feed_status is not None:
+        feed_status.update(status)
 
-    # filter berdasarkan kecocokan judul+ringkasan
-    filtered = []
-    for it in items:
-        blob = f"{it.get('judul','')} {it.get('summary','')}"
-        if _match(blob, aliases):
-            filtered.append(it)
+    # filter berdasarkan kecocokan judul+ringkasan: lookup di inverted index semua kode,
+    # matcher kecil per-panggilan hanya kalau ada keyword tambahan / kode di luar alias
+    with span("berita.index"):
+        if kode in alias_map and not extra_keywords:
+            filtered = index_snapshot(items, status, alias_map).get(kode, [])
+        else:
+            filtered = index_berita(items, build_matcher({kode: aliases})).get(kode, [])
 
     # de-dupe by (title, link) + sort terbaru
     seen, uniq = set(), []
@@ -144,7 +370,11 @@ def ambil_berita_dengan_alias(
             uniq.append(it); seen.add(key)
     uniq.sort(key=lambda x: x.get("pubDate", ""), reverse=True)
 
+    # gabungkan berita kembar lintas sumber (SimHash + LSH): satu wakil per cerita,
+    # sisanya di it["duplikat"]
     keyword_cari = ", ".join(aliases)
+    with span("berita.cluster"):
+        uniq = cluster_berita(uniq)
     return keyword_cari, uniq
 
 __all__ = [
@@ -152,4 +382,11 @@ __all__ = [
     "get_source_labels",
     "load_alias",
     "ambil_berita_dengan_alias",
+    "ambil_feeds",
+    "FEED_OK_STATUS",
+    "TickerMatcher",
+    "build_matcher",
+    "matcher_dari_alias",
+    "index_berita",
+    "index_snapshot",
 ]
@@ -0,0 +1,160 @@
+# berita_dedup.py
+"""
+Deteksi berita kembar (near-duplicate) lintas sumber: Detik, CNBC, Kontan,
+Google News sering memuat cerita IDX yang sama dengan judul/link sedikit beda.
+
+Tiap artikel diberi SimHash 64-bit dari judul+ringkasan (dan dari isi kalau
+ada). Kandidat pasangan dicari lewat LSH banding: 64 bit dipecah jadi
+k+1 band, sehingga dua hash dengan jarak Hamming <= k pasti sama persis di
+minimal satu band (pigeonhole). Kandidat diverifikasi lalu digabung dengan
+union-find, jadi total kerja kira-kira linear terhadap jumlah artikel.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+MAX_HAMMING = 3
+SHINGLE = 4
+_WORD_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+
+
+def _normal(text: str) -> bytes:
+    """Lowercase, buang tanda baca & spasi: "Rp 50," dan "Rp50" jadi sama."""
+    return "".join(_WORD_RE.findall((text or "").lower())).encode("utf-8")
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (vektor) untuk meratakan bit hash shingle."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def simhash64(text: str, n: int = SHINGLE) -> int:
+    """SimHash 64-bit atas shingle byte n-gram (n <= 8) dari teks ternormalisasi."""
+    s = np.frombuffer(_normal(text), dtype=np.uint8).astype(np.uint64)
+    if s.size == 0:
+        return 0
+    n = min(n, s.size)
+    # shingle n byte dipadatkan ke satu uint64, lalu di-hash
+    sh = np.zeros(s.size - n + 1, dtype=np.uint64)
+    for j in range(n):
+        sh = (sh << np.uint64(8)) | s[j:j + sh.size]
+    with np.errstate(over="ignore"):
+        h = _mix64(sh)
+    bits = (h[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > h.size                     # mayoritas bit 1 per posisi
+    return int(np.sum(np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))[votes], dtype=np.uint64))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & _MASK64).count("1")
+
+
+def _bands(h: int, n_bands: int) -> List[Tuple[int, int]]:
+    width = 64 // n_bands
+    mask = (1 << width) - 1
+    return [(i, (h >> (i * width)) & mask) for i in range(n_bands)]
+
+
+def _candidates(hashes: List[int | None], n_bands: int) -> Iterable[Tuple[int, int]]:
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    for idx, h in enumerate(hashes):
+        if not h:
+            continue
+        for key in _bands(h, n_bands):
+            buckets.setdefault(key, []).append(idx)
+    seen = set()
+    for members in buckets.values():
+        for a_pos, a in enumerate(members):
+            for b in members[a_pos + 1:]:
+                if (a, b) not in seen:
+                    seen.add((a, b))
+                    yield a, b
+
+
+def fingerprint(it: dict) -> dict:
+    """Tambahkan `simhash` (judul+ringkasan) dan `simhash_isi` (kalau ada content) ke item."""
+    if "simhash" not in it:
+        it["simhash"] = simhash64(f"{it.get('judul', '')} {it.get('summary', '')}")
+    content = it.get("content") or ""
+    if content and "simhash_isi" not in it:
+        it["simhash_isi"] = simhash64(content)
+    return it
+
+
+def _skor_wakil(it: dict) -> Tuple[int, int, int]:
+    """Pilih wakil cluster: hindari link redirect Google, utamakan isi & ringkasan terpanjang."""
+    return (
+        0 if it.get("source") == "Google News" else 1,
+        len(it.get("content") or ""),
+        len(it.get("summary") or ""),
+    )
+
+
+def cluster_berita(items: List[dict], max_hamming: int = MAX_HAMMING) -> List[dict]:
+    """
+    Kelompokkan berita kembar. Return satu item wakil per cluster (urutan mengikuti
+    kemunculan pertama cluster di `items`), dengan tambahan:
+    - `cluster_id`: id cluster
+    - `duplikat`: list item lain di cluster yang sama
+    """
+    if not items:
+        return []
+    for it in items:
+        fingerprint(it)
+    n_bands = max_hamming + 1
+
+    parent = list(range(len(items)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for key in ("simhash", "simhash_isi"):
+        hashes = [it.get(key) for it in items]
+        for a, b in _candidates(hashes, n_bands):
+            if hamming(hashes[a], hashes[b]) <= max_hamming:  # type: ignore[arg-type]
+                ra, rb = find(a), find(b)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+
+    groups: Dict[int, List[int]] = {}
+    for idx in range(len(items)):
+        groups.setdefault(find(idx), []).append(idx)
+
+    out = []
+    for root in sorted(groups):
+        # item yang sudah jadi wakil cluster sebelumnya (mis. re-cluster setelah isi diunduh)
+        # membawa duplikatnya ikut masuk ke cluster baru
+        members = [m for i in groups[root] for m in anggota(items[i])]
+        wakil = max(members, key=_skor_wakil)
+        rep = {k: v for k, v in wakil.items() if k not in ("cluster_id", "duplikat")}
+        rep["cluster_id"] = root
+        rep["duplikat"] = [
+            {k: v for k, v in m.items() if k not in ("cluster_id", "duplikat")}
+            for m in members if m is not wakil
+        ]
+        out.append(rep)
+    return out
+
+
+def anggota(it: dict) -> List[dict]:
+    """Wakil + semua duplikatnya (untuk disimpan / ditampilkan sebagai satu cerita)."""
+    return [it, *it.get("duplikat", ())]
+
+
+__all__ = [
+    "MAX_HAMMING",
+    "simhash64",
+    "hamming",
+    "fingerprint",
+    "cluster_berita",
+    "anggota",
+]
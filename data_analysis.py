@@ -1,6 +1,12 @@
 import pandas as pd
 import os
-import glob
+import hashlib
+
+from balancepos import baca_banyak
+from ksei_store import sync_store, load_snapshot, dataset_version, store_dir, list_types
+from ksei_cube import CUBE_NAME, build_cube, save_cube, load_cube
+from valuasi import VALUASI_NAME, hitung_valuasi, save_valuasi, load_valuasi
+from profiling import span
 
 investor_mapping = {
     'ID': 'Individual',
@@ -17,22 +23,95 @@ investor_mapping = {
 local_cols = ['Local IS','Local CP','Local PF','Local IB','Local ID','Local MF','Local SC','Local FD','Local OT']
 foreign_cols = ['Foreign IS','Foreign CP','Foreign PF','Foreign IB','Foreign ID','Foreign MF','Foreign SC','Foreign FD','Foreign OT']
 
-def proses_data_ksei(folder='data/'):
-    files = glob.glob(os.path.join(folder, '*.txt'))
-    if not files:
+def proses_data_ksei(folder='data/', types=None):
+    # store hanya mem-parse file .txt yang baru/berubah, sisanya dibaca dari snapshot Parquet.
+    # `types` (mis. ['EQUITY']) membatasi partisi Type yang dibaca.
+    if not os.path.isdir(folder):
+        return None, None, None, None
+    with span("ksei.sync_store"):
+        sync_store(folder, baca_banyak)
+    with span("ksei.load_snapshot"):
+        df = load_snapshot(folder, types=types)
+    if df is None or df.empty:
         return None, None, None, None
 
-    df_list = []
-    for f in files:
-        try:
-            temp_df = pd.read_csv(f, sep='|')
-            temp_df['Bulan'] = pd.to_datetime(temp_df['Date'], dayfirst=True, errors='coerce').dt.to_period('M').astype(str)
-            df_list.append(temp_df)
-        except:
-            continue
-
-    df = pd.concat(df_list, ignore_index=True)
+    df['Type'] = df['Type'].astype('category')
     df['Total Lokal'] = df[local_cols].sum(axis=1)
     df['Total Asing'] = df[foreign_cols].sum(axis=1)
 
-    return df, investor_mapping, local_cols, foreign_cols
\ No newline at end of file
+    return df, investor_mapping, local_cols, foreign_cols
+
+
+def daftar_tipe_efek(folder='data/'):
+    """Sinkronkan store lalu kembalikan daftar Type efek yang tersedia (terurut)."""
+    if not os.path.isdir(folder):
+        return []
+    sync_store(folder, baca_banyak)
+    return sorted(list_types(folder))
+
+
+def _types_key(types):
+    if types is None:
+        return 'all'
+    return hashlib.sha256('|'.join(sorted(set(types))).encode('utf-8')).hexdigest()[:10]
+
+
+def path_cube_ksei(folder='data/', types=None):
+    """Lokasi .npz kubus untuk set Type tsb (dipakai juga worker laporan batch)."""
+    return os.path.join(store_dir(folder), CUBE_NAME.replace('.npz', f'-{_types_key(types)}.npz'))
+
+
+def muat_cube_ksei(folder='data/', df=None, types=None):
+    """
+    Kubus kode × bulan × Lokal/Asing × kategori. Dibangun sekali per versi dataset
+    (dan per set Type) lalu disimpan di store; pemanggilan berikutnya cukup baca .npz.
+    """
+    if df is None:
+        if not os.path.isdir(folder):
+            return None
+        # cek .npz dulu: snapshot hanya dibaca kalau kubus belum ada / basi
+        with span("ksei.sync_store"):
+            sync_store(folder, baca_banyak)
+    dataset = dataset_version(folder)
+    version = f"{dataset}-{_types_key(types)}"
+    path = path_cube_ksei(folder, types)
+    cube = load_cube(path)
+    if dataset and cube is not None and cube.version == version:
+        return cube
+    if df is None:
+        df, _, _, _ = proses_data_ksei(folder, types=types)
+        if df is None:
+            return None
+    with span("ksei.build_cube"):
+        cube = build_cube(df, version=version)
+        save_cube(cube, path)
+    return cube
+
+
+def muat_valuasi_ksei(cube, folder='data/'):
+    """Nilai rupiah / % beredar / arus nilai untuk kubus tsb, disimpan di store per versi kubus."""
+    key = cube.version.rsplit('-', 1)[-1]
+    path = os.path.join(store_dir(folder), VALUASI_NAME.replace('.npz', f'-{key}.npz'))
+    val = load_valuasi(path)
+    if val is None or val.version != cube.version:
+        with span("ksei.hitung_valuasi"):
+            val = hitung_valuasi(cube)
+        save_valuasi(val, path)
+    return val
+
+
+def muat_peristiwa_ksei(cube, folder='data/'):
+    """Indeks peristiwa perubahan signifikan untuk kubus tsb, disimpan di store per versi kubus + ambang."""
+    # impor lokal: screener mengimpor modul ini
+    from screener import hitung_perubahan
+    from peristiwa import PERISTIWA_NAME, Ambang, hitung_peristiwa, save_peristiwa, load_peristiwa
+
+    ambang = Ambang()
+    key = cube.version.rsplit('-', 1)[-1]
+    path = os.path.join(store_dir(folder), PERISTIWA_NAME.replace('.npz', f'-{key}.npz'))
+    ev = load_peristiwa(path)
+    if ev is None or ev.version != f"{cube.version}-{ambang.kunci()}":
+        with span("ksei.peristiwa"):
+            ev = hitung_peristiwa(cube, hitung_perubahan(cube), ambang)
+        save_peristiwa(ev, path)
+    return ev
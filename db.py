@@ -1,8 +1,24 @@
 # db.py
 import os
+import threading
+import time
 import streamlit as st
 from streamlit.runtime.secrets import StreamlitSecretNotFoundError
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+# Engine dibuat sekali per proses lalu dipakai bersama semua sesi/rerun Streamlit.
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+_STATS_LOCK = threading.Lock()
+_STATS = {
+    "connects": 0,        # koneksi DBAPI baru (TCP + auth)
+    "checkouts": 0,
+    "checked_out": 0,     # sedang dipinjam saat ini
+    "wait_total_s": 0.0,  # total waktu menunggu koneksi dari pool
+    "wait_max_s": 0.0,
+}
 
 
 def _get_secret(key: str):
@@ -14,19 +30,67 @@ def _get_secret(key: str):
         return os.getenv(key)
 
 
-def get_engine():
-    """Return a SQLAlchemy engine.
+def _int_secret(key: str, default: int) -> int:
+    val = _get_secret(key)
+    try:
+        return int(val) if val not in (None, "") else default
+    except (TypeError, ValueError):
+        return default
 
-    If SingleStore credentials are available in Streamlit secrets or environment variables,
-    connect to SingleStore. Otherwise fall back to a local SQLite DB for local development.
-    """
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool yang mencatat lama menunggu checkout (untuk sizing pool)."""
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - t0
+            with _STATS_LOCK:
+                _STATS["wait_total_s"] += waited
+                _STATS["wait_max_s"] = max(_STATS["wait_max_s"], waited)
+
+
+def _pool_kwargs() -> dict:
+    """Ukuran pool bisa diatur via secrets/env: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT."""
+    return {
+        "poolclass": _TimedQueuePool,
+        "pool_size": _int_secret("DB_POOL_SIZE", 5),
+        "max_overflow": _int_secret("DB_MAX_OVERFLOW", 10),
+        "pool_recycle": _int_secret("DB_POOL_RECYCLE", 1800),
+        "pool_timeout": _int_secret("DB_POOL_TIMEOUT", 30),
+        "pool_pre_ping": True,
+    }
+
+
+def _attach_stats(engine):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, conn_record):
+        with _STATS_LOCK:
+            _STATS["connects"] += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        with _STATS_LOCK:
+            _STATS["checkouts"] += 1
+            _STATS["checked_out"] += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn, conn_record):
+        with _STATS_LOCK:
+            _STATS["checked_out"] -= 1
+    return engine
+
+
+def _create_engine():
     user = _get_secret('SINGLESTORE_USER')
     password = _get_secret('SINGLESTORE_PASSWORD')
     host = _get_secret('SINGLESTORE_HOST')
     db = _get_secret('SINGLESTORE_DB')
 
     if all([user, password, host, db]):
-        return create_engine(f"mysql+pymysql://{user}:{password}@{host}/{db}")
+        return _attach_stats(create_engine(f"mysql+pymysql://{user}:{password}@{host}/{db}", **_pool_kwargs()))
 
     # Fallback to local SQLite (safe for local dev)
     try:
@@ -38,4 +102,44 @@ def get_engine():
         # If Streamlit UI isn't available (e.g., during unit tests), ignore
         pass
 
-    return create_engine('sqlite:///local_cache.db')
+    return _attach_stats(create_engine('sqlite:///local_cache.db', **_pool_kwargs()))
+
+
+def get_engine():
+    """Return the process-wide SQLAlchemy engine.
+
+    If SingleStore credentials are available in Streamlit secrets or environment variables,
+    connect to SingleStore. Otherwise fall back to a local SQLite DB for local development.
+    The engine (and its connection pool) is created once and reused by every caller.
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = _create_engine()
+    return _ENGINE
+
+
+def pool_stats() -> dict:
+    """Statistik pool: ukuran, koneksi dipinjam, overflow, jumlah connect, waktu tunggu."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    if _ENGINE is not None:
+        pool = _ENGINE.pool
+        stats.update({
+            "pool_size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    if stats["checkouts"]:
+        stats["wait_avg_s"] = stats["wait_total_s"] / stats["checkouts"]
+    return stats
+
+
+def dispose_engine():
+    """Tutup semua koneksi dan buang engine (mis. setelah ganti konfigurasi pool)."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is not None:
+            _ENGINE.dispose()
+            _ENGINE = None
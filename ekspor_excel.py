@@ -0,0 +1,152 @@
+# ekspor_excel.py
+"""
+Ekspor pivot Excel (xlsxwriter, mode constant_memory).
+
+Workbook hanya dibuat saat diminta (tombol download memanggil fungsi ini),
+ditulis baris demi baris ke file sementara lalu disimpan di store dengan kunci
+(versi kubus, kode). Klik berikutnya untuk kode & versi dataset yang sama
+langsung membaca file tersebut. Ekspor multi-kode menulis satu sheet per kode
+secara berurutan, jadi memori hanya sebesar pivot satu kode.
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import os
+import threading
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ksei_cube import OwnershipCube, frame_trend
+from ksei_store import store_dir
+
+EKSPOR_DIRNAME = "ekspor"
+SHEET_PIVOT = "Pivot Multi-Kolom"
+KOLOM_PIVOT = ["Kategori Lengkap", "Bulan Format", "Δ Saham", "Jumlah Saham", "Persentase"]
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _format_bulan(bulan: pd.Series) -> np.ndarray:
+    # strftime hanya untuk bulan unik (tiap bulan muncul 18× per kode)
+    unik, inv = np.unique(bulan.to_numpy(), return_inverse=True)
+    return pd.DatetimeIndex(unik).strftime("%b %Y").to_numpy(dtype=object)[inv]
+
+
+def pivot_dari_tren(df: pd.DataFrame) -> pd.DataFrame:
+    """Kolom pivot dari frame `frame_trend` (satu kode)."""
+    return pd.DataFrame({
+        "Kategori Lengkap": df["Kategori Lengkap"],
+        "Bulan Format": _format_bulan(df["Bulan"]),
+        "Δ Saham": df["Δ Saham"],
+        "Jumlah Saham": df["Jumlah Saham"],
+        "Persentase": df["Persentase"].map(lambda x: f"{x:.2f}%"),
+    })
+
+
+def frame_pivot(cube: OwnershipCube, code: str, investor_mapping: dict) -> pd.DataFrame:
+    """Tabel pivot per kode (dipakai tampilan & ekspor)."""
+    return pivot_dari_tren(frame_trend(cube, code, investor_mapping))
+
+
+def _tulis_sheet(wb, nama: str, df: pd.DataFrame, fmt_header, fmt_angka) -> None:
+    """Header + baris (index di kolom A seperti to_excel(index=True)), berurutan per baris."""
+    ws = wb.add_worksheet(nama[:31])
+    ws.set_column(0, 0, 6)
+    ws.set_column(1, 1, 38)
+    ws.set_column(2, 2, 12)
+    ws.set_column(3, 4, 18, fmt_angka)
+    ws.set_column(5, 5, 11)
+    ws.write_row(0, 0, ["", *df.columns], fmt_header)
+    # tulis per sel dengan fungsi bertipe (lewati dispatch tipe write_row), baris demi baris
+    kolom = [df.index.tolist()] + [df[c].tolist() for c in df.columns]   # tipe Python, bukan numpy
+    penulis = [ws.write_number] + [
+        ws.write_number if pd.api.types.is_numeric_dtype(df[c]) else ws.write_string for c in df.columns
+    ]
+    for r, baris in enumerate(zip(*kolom), start=1):
+        for c, (tulis, nilai) in enumerate(zip(penulis, baris)):
+            tulis(r, c, nilai)
+
+
+def _buka_workbook(path: str):
+    import xlsxwriter
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True})
+    return wb, wb.add_format({"bold": True, "border": 1}), wb.add_format({"num_format": "#,##0"})
+
+
+def _path_cache(cube: OwnershipCube, folder: str, kunci: str) -> str:
+    root = os.path.join(store_dir(folder), EKSPOR_DIRNAME)
+    os.makedirs(root, exist_ok=True)
+    return os.path.join(root, f"{cube.version}-{kunci}.xlsx")
+
+
+def _buang_versi_lama(cube: OwnershipCube, folder: str) -> None:
+    """Hapus ekspor dari versi dataset lama (kubus set Type lain di versi yang sama dibiarkan)."""
+    dataset = cube.version.rsplit("-", 1)[0]
+    for path in glob.glob(os.path.join(store_dir(folder), EKSPOR_DIRNAME, "*.xlsx")):
+        if not os.path.basename(path).startswith(f"{dataset}-"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def tulis_workbook(path: str, sheets: Iterable[Tuple[str, pd.DataFrame]]) -> str:
+    """Tulis (nama sheet, pivot) berurutan ke file sementara lalu rename atomik ke `path`."""
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}.xlsx"
+    wb, fmt_header, fmt_angka = _buka_workbook(tmp)
+    try:
+        for nama, df in sheets:
+            _tulis_sheet(wb, nama, df, fmt_header, fmt_angka)
+    finally:
+        wb.close()
+    os.replace(tmp, path)
+    return path
+
+
+def _tulis(cube: OwnershipCube, codes: List[str], investor_mapping: dict, path: str) -> str:
+    # generator: pivot dibuat per sheet, jadi memori tetap sebesar satu kode
+    return tulis_workbook(path, (
+        (SHEET_PIVOT if len(codes) == 1 else code, frame_pivot(cube, code, investor_mapping))
+        for code in codes
+    ))
+
+
+def ekspor_kode(cube: OwnershipCube, code: str, investor_mapping: dict, folder: str = "data/") -> str:
+    """Path .xlsx pivot satu kode; dibuat sekali per (versi kubus, kode)."""
+    path = _path_cache(cube, folder, code)
+    if not os.path.exists(path):
+        _buang_versi_lama(cube, folder)
+        _tulis(cube, [code], investor_mapping, path)
+    return path
+
+
+def ekspor_multi(cube: OwnershipCube, codes: Iterable[str] | None, investor_mapping: dict,
+                 folder: str = "data/") -> str:
+    """Path .xlsx satu sheet per kode (None = semua kode di kubus), di-cache per set kode."""
+    codes = sorted(set(codes)) if codes is not None else [str(c) for c in cube.codes]
+    kunci = "multi-" + hashlib.sha256("|".join(codes).encode("utf-8")).hexdigest()[:12]
+    path = _path_cache(cube, folder, kunci)
+    if not os.path.exists(path):
+        _buang_versi_lama(cube, folder)
+        _tulis(cube, codes, investor_mapping, path)
+    return path
+
+
+def baca_bytes(path: str) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+__all__ = [
+    "SHEET_PIVOT",
+    "KOLOM_PIVOT",
+    "XLSX_MIME",
+    "pivot_dari_tren",
+    "frame_pivot",
+    "tulis_workbook",
+    "ekspor_kode",
+    "ekspor_multi",
+    "baca_bytes",
+]
@@ -0,0 +1,337 @@
+# ekstrak_html.py
+"""
+Mesin ekstraksi isi artikel dari HTML.
+
+Dokumen di-parse SEKALI dengan lxml, lalu beberapa strategi dicoba di atas
+pohon yang sama (JSON-LD articleBody -> selector khas portal berita -> skor
+kepadatan teks -> gabungan <p>). Hasilnya terstruktur: teks, judul, waktu
+terbit, dan strategi yang menang.
+
+Ekstraksi dijalankan di process pool terbatas (lepas dari thread Streamlit &
+GIL), dengan batas ukuran dokumen dan batas waktu per dokumen.
+
+Benchmark atas korpus HTML tersimpan:
+    python ekstrak_html.py folder_html/ [--workers 4] [--json hasil.json]
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import signal
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from typing import Iterable, List, Tuple
+
+MAX_BYTES = 2_000_000   # dokumen lebih besar dipotong sebelum di-parse
+DOC_TIMEOUT = 3.0       # batas waktu ekstraksi per dokumen (detik)
+MIN_CHARS = 120         # teks lebih pendek dianggap gagal
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+
+# selector lama (_fallback_text_from_html) dalam bentuk XPath, tanpa butuh cssselect
+_SELECTORS = [
+    ("article", "//article"),
+    (".article", "//*[contains(concat(' ', normalize-space(@class), ' '), ' article ')]"),
+    (".post", "//*[contains(concat(' ', normalize-space(@class), ' '), ' post ')]"),
+    (".read__content", "//*[contains(concat(' ', normalize-space(@class), ' '), ' read__content ')]"),
+    (".detail__body", "//*[contains(concat(' ', normalize-space(@class), ' '), ' detail__body ')]"),
+    (".content", "//*[contains(concat(' ', normalize-space(@class), ' '), ' content ')]"),
+]
+_BUANG = ("script", "style", "noscript", "iframe", "form", "nav", "aside", "footer", "header", "figure")
+_BUANG_XPATH = [f"//{tag}" for tag in _BUANG]
+_NEGATIF = re.compile(r"comment|related|share|social|sidebar|promo|banner|advert|iklan|baca-juga|footer|nav", re.I)
+_META_TANGGAL = (
+    "article:published_time", "og:published_time", "pubdate", "publishdate",
+    "dtk:publishdate", "content_PublishedDate", "datePublished", "date",
+)
+_WS = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class HasilEkstraksi:
+    text: str | None          # isi artikel (None = gagal / terlalu pendek)
+    title: str | None
+    published: str | None     # string apa adanya dari meta / JSON-LD / <time>
+    strategi: str             # jsonld / selector:<sel> / kepadatan / paragraf / gagal / timeout / error
+    elapsed: float = 0.0
+    error: str | None = None
+
+
+def _bersih(s: str | None) -> str:
+    return _WS.sub(" ", s or "").strip()
+
+
+def _jsonld(tree) -> List[dict]:
+    out = []
+    for node in tree.xpath("//script[@type='application/ld+json']"):
+        try:
+            data = json.loads(node.text or "")
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            d = stack.pop()
+            if isinstance(d, list):
+                stack.extend(d)
+            elif isinstance(d, dict):
+                out.append(d)
+                if "@graph" in d:
+                    stack.append(d["@graph"])
+    return out
+
+
+def _meta(tree, *names: str) -> str | None:
+    for name in names:
+        for attr in ("property", "name", "itemprop"):
+            vals = tree.xpath(f"//meta[@{attr}=$v]/@content", v=name)
+            if vals and vals[0].strip():
+                return vals[0].strip()
+    return None
+
+
+def _judul(tree, ld: List[dict]) -> str | None:
+    t = _meta(tree, "og:title", "twitter:title")
+    if t:
+        return _bersih(t)
+    for d in ld:
+        if d.get("headline"):
+            return _bersih(str(d["headline"]))
+    for xp in ("//title/text()", "//h1//text()"):
+        vals = tree.xpath(xp)
+        if vals and _bersih("".join(vals)):
+            return _bersih("".join(vals))
+    return None
+
+
+def _terbit(tree, ld: List[dict]) -> str | None:
+    t = _meta(tree, *_META_TANGGAL)
+    if t:
+        return t
+    for d in ld:
+        if d.get("datePublished"):
+            return str(d["datePublished"])
+    vals = tree.xpath("//time/@datetime")
+    return vals[0].strip() if vals else None
+
+
+def _teks(node) -> str:
+    return _bersih(" ".join(node.itertext()))
+
+
+def _teks_paragraf(node) -> str:
+    return _bersih(" ".join(_teks(p) for p in node.iter("p")))
+
+
+def _strategi_kepadatan(tree) -> str:
+    """Skor mirip readability: elemen dengan total teks <p> langsung terbanyak."""
+    skor = {}
+    for p in tree.iter("p"):
+        parent = p.getparent()
+        if parent is None:
+            continue
+        label = f"{parent.get('class', '')} {parent.get('id', '')}"
+        if _NEGATIF.search(label):
+            continue
+        t = _teks(p)
+        if len(t) < 25:
+            continue
+        skor[parent] = skor.get(parent, 0) + len(t) + 10 * t.count(",")
+    if not skor:
+        return ""
+    return _teks_paragraf(max(skor, key=skor.get))
+
+
+def _parse(data: bytes | str):
+    import lxml.html
+    return lxml.html.document_fromstring(data)
+
+
+def ekstrak(data: bytes | str, url: str = "") -> HasilEkstraksi:
+    """Ekstraksi di proses ini (dipakai worker pool & benchmark)."""
+    t0 = time.perf_counter()
+    if isinstance(data, str):
+        data = data.encode("utf-8", "replace")
+    data = data[:MAX_BYTES]
+    try:
+        tree = _parse(data)
+    except Exception as e:   # dokumen kosong / rusak
+        return HasilEkstraksi(None, None, None, "error", time.perf_counter() - t0, repr(e))
+
+    ld = _jsonld(tree)
+    title, published = _judul(tree, ld), _terbit(tree, ld)
+
+    def hasil(text, strategi):
+        return HasilEkstraksi(text, title, published, strategi, time.perf_counter() - t0)
+
+    for d in ld:
+        body = _bersih(str(d.get("articleBody") or ""))
+        if len(body) > MIN_CHARS:
+            return hasil(body, "jsonld")
+
+    for node in tree.xpath("|".join(_BUANG_XPATH)):
+        node.drop_tree()
+
+    for label, xp in _SELECTORS:
+        nodes = tree.xpath(xp)
+        if nodes:
+            txt = _teks(nodes[0])
+            if len(txt) > MIN_CHARS:
+                return hasil(txt, f"selector:{label}")
+
+    txt = _strategi_kepadatan(tree)
+    if len(txt) > MIN_CHARS:
+        return hasil(txt, "kepadatan")
+
+    txt = _teks_paragraf(tree)
+    if len(txt) > MIN_CHARS:
+        return hasil(txt, "paragraf")
+    return hasil(None, "gagal")
+
+
+# ==========================
+# Process pool terbatas
+# ==========================
+class _Waktu(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise _Waktu()
+
+
+def _ekstrak_terbatas(data: bytes, url: str, limit: float) -> HasilEkstraksi:
+    """Jalan di worker: batas waktu ditegakkan lewat SIGALRM (kalau OS mendukung)."""
+    pakai_alarm = hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if pakai_alarm:
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, limit)
+    try:
+        return ekstrak(data, url)
+    except _Waktu:
+        return HasilEkstraksi(None, None, None, "timeout", limit, "batas waktu terlampaui")
+    except Exception as e:
+        return HasilEkstraksi(None, None, None, "error", 0.0, repr(e))
+    finally:
+        if pakai_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+        return _POOL
+
+
+def _reset_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+def ekstrak_di_pool(data: bytes | str, url: str = "", timeout: float = DOC_TIMEOUT) -> HasilEkstraksi:
+    """
+    Ekstraksi di process pool. Aman dipanggil dari banyak thread sekaligus;
+    jumlah dokumen yang diproses bersamaan dibatasi EXTRACT_WORKERS.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8", "replace")
+    data = data[:MAX_BYTES]
+    try:
+        fut = _pool().submit(_ekstrak_terbatas, data, url, timeout)
+        # tunggu lebih lama dari batas worker: antrean pool ikut dihitung
+        return fut.result(timeout=timeout * 4)
+    except FutureTimeout:
+        return HasilEkstraksi(None, None, None, "timeout", timeout * 4, "antrean pool penuh")
+    except BrokenProcessPool as e:
+        _reset_pool()   # worker mati (mis. OOM); pool baru dibuat di panggilan berikutnya
+        return HasilEkstraksi(None, None, None, "error", 0.0, repr(e))
+
+
+# ==========================
+# Benchmark korpus HTML tersimpan
+# ==========================
+def benchmark(paths: Iterable[str], workers: int = EXTRACT_WORKERS) -> Tuple[List[dict], dict]:
+    """Jalankan ekstraksi atas file HTML. Return (hasil per file, ringkasan)."""
+    paths = sorted(paths)
+    blobs = []
+    for p in paths:
+        with open(p, "rb") as f:
+            blobs.append(f.read())
+
+    t0 = time.perf_counter()
+    if workers <= 1:
+        results = [_ekstrak_terbatas(b, p, DOC_TIMEOUT) for b, p in zip(blobs, paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_ekstrak_terbatas, blobs, paths, [DOC_TIMEOUT] * len(paths)))
+    wall = time.perf_counter() - t0
+
+    rows = [
+        {"file": os.path.basename(p), "bytes": len(b), "chars": len(r.text or ""), **asdict(r)}
+        for p, b, r in zip(paths, blobs, results)
+    ]
+    for row in rows:
+        row.pop("text")
+    per_doc = sorted(r.elapsed for r in results) or [0.0]
+    strategi = {}
+    for r in results:
+        key = r.strategi.split(":")[0]
+        strategi[key] = strategi.get(key, 0) + 1
+    ringkasan = {
+        "dokumen": len(paths),
+        "workers": workers,
+        "wall_s": round(wall, 4),
+        "dok_per_s": round(len(paths) / wall, 1) if wall else None,
+        "mb": round(sum(map(len, blobs)) / 1e6, 2),
+        "p50_ms": round(statistics.median(per_doc) * 1000, 2),
+        "p95_ms": round(per_doc[int(0.95 * (len(per_doc) - 1))] * 1000, 2),
+        "max_ms": round(per_doc[-1] * 1000, 2),
+        "berhasil": sum(r.text is not None for r in results),
+        "strategi": strategi,
+    }
+    return rows, ringkasan
+
+
+def _main(argv: List[str] | None = None) -> None:
+    import argparse
+    import glob
+
+    ap = argparse.ArgumentParser(description="Benchmark ekstraksi isi artikel atas folder HTML.")
+    ap.add_argument("folder")
+    ap.add_argument("--workers", type=int, default=EXTRACT_WORKERS)
+    ap.add_argument("--json", help="tulis hasil per file + ringkasan ke file JSON")
+    args = ap.parse_args(argv)
+
+    paths = glob.glob(os.path.join(args.folder, "*.htm*"))
+    rows, ringkasan = benchmark(paths, workers=args.workers)
+    print(json.dumps(ringkasan, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"ringkasan": ringkasan, "dokumen": rows}, f, indent=2, ensure_ascii=False)
+
+
+__all__ = [
+    "HasilEkstraksi",
+    "MAX_BYTES",
+    "DOC_TIMEOUT",
+    "ekstrak",
+    "ekstrak_di_pool",
+    "benchmark",
+]
+
+
+if __name__ == "__main__":
+    _main()
+
@@ -0,0 +1,244 @@
+# grafik.py
+"""
+Spesifikasi figur Plotly per kode langsung dari kubus, dengan payload ringkas.
+
+- Sumbu x memakai string 'YYYY-MM' dari kubus (bukan timestamp ISO penuh).
+- Nilai dibulatkan lalu dikirim sebagai typed array (base64) Plotly:
+  int32 kalau muat, selain itu float64 (jumlah saham > 2^31 umum di big cap;
+  float32 akan menggeser angkanya). int64 tidak didukung typed array.
+- Hovertemplate pendek per trace (bukan template panjang px); warna dari
+  colorway, kecuali facet yang butuh warna seragam antar subplot.
+- Seri panjang (total titik >= WEBGL_MIN_TITIK) memakai Scattergl tanpa marker.
+
+Modul ini tidak bergantung pada Streamlit; cache spesifikasi figur (hasil
+`spesifikasi`, dirender lewat `FigurSiap`) ada di visualization.py.
+"""
+from __future__ import annotations
+
+import json
+from typing import List
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from ksei_cube import JENIS, KATEGORI_KODE, OwnershipCube
+
+WEBGL_MIN_TITIK = 2000
+_INT32_MAX = 2**31 - 1
+
+
+def _ringkas(a: np.ndarray, kolom: str) -> np.ndarray:
+    """Bulatkan sesuai satuan lalu pilih dtype terkecil yang jadi typed array."""
+    if kolom.startswith("%"):
+        return np.round(a, 2).astype(np.float32)
+    a = np.round(np.asarray(a, dtype=np.float64))
+    if np.isfinite(a).all() and (np.abs(a).max(initial=0) <= _INT32_MAX):
+        return a.astype(np.int32)
+    return a   # float64: bilangan bulat sampai 2^53 tetap persis
+
+
+def _label(investor_mapping: dict) -> List[str]:
+    return [investor_mapping[k] for k in KATEGORI_KODE]
+
+
+def _warna(n: int) -> str:
+    # warna eksplisit supaya seri yang sama di tiap subplot facet berwarna sama
+    colorway = pio.templates[pio.templates.default].layout.colorway or pio.templates["plotly"].layout.colorway
+    return colorway[n % len(colorway)]
+
+
+def _hover(kolom: str) -> str:
+    # SI 4 digit (mis. 4.489G); persen 2 desimal
+    return "%{y:.2f}%" if kolom.startswith("%") else "%{y:.4s}"
+
+
+def _garis(x: List[str], y: np.ndarray, nama: str, kolom: str, gl: bool) -> dict:
+    return {
+        "type": "scattergl" if gl else "scatter",
+        "mode": "lines" if gl else "lines+markers",
+        "x": x,
+        "y": y,
+        "name": nama,
+        "hovertemplate": f"{nama}<br>%{{x|%b %Y}}: {_hover(kolom)}<extra></extra>",
+    }
+
+
+def _bulan(cube: OwnershipCube, code: str):
+    i = cube.idx(code)
+    m = np.flatnonzero(cube.present[i])
+    return i, m, [str(b) for b in cube.months[m]]
+
+
+def _sumber(cube: OwnershipCube, data: np.ndarray | None) -> np.ndarray:
+    return cube.shares if data is None else data
+
+
+def tren_filter(cube: OwnershipCube, code: str, investor_mapping: dict, jenis: str, kategori: str,
+                data: np.ndarray | None = None, kolom: str = "Jumlah Saham") -> go.Figure:
+    """Satu seri: jenis (Lokal/Asing) × kategori investor (label lengkap)."""
+    i, m, x = _bulan(cube, code)
+    j, k = JENIS.index(jenis), _label(investor_mapping).index(kategori)
+    y = _ringkas(_sumber(cube, data)[i, m, j, k], kolom)
+    return go.Figure({
+        "data": [_garis(x, y, kategori, kolom, len(x) >= WEBGL_MIN_TITIK)],
+        "layout": {
+            "title": {"text": f"Tren Bulanan {kategori} – {jenis} ({code})"},
+            "xaxis": {"title": {"text": "Bulan"}, "dtick": "M1", "tickformat": "%b\n%Y"},
+            "yaxis": {"title": {"text": kolom}},
+        },
+    })
+
+
+def ringkasan(cube: OwnershipCube, code: str, data: np.ndarray | None = None,
+              kolom: str = "Jumlah Saham") -> go.Figure:
+    """Total Lokal, Total Asing dan Total per bulan."""
+    i, m, x = _bulan(cube, code)
+    tot = _sumber(cube, data)[i, m].sum(axis=2)                # (m, 2)
+    seri = {"Total Lokal": tot[:, 0], "Total Asing": tot[:, 1], "Total": tot.sum(axis=1)}
+    gl = len(x) * len(seri) >= WEBGL_MIN_TITIK
+    return go.Figure({
+        "data": [_garis(x, _ringkas(v, kolom), nama, kolom, gl) for nama, v in seri.items()],
+        "layout": {"yaxis": {"title": {"text": kolom}}, "margin": {"t": 30}},
+    })
+
+
+def per_kategori(cube: OwnershipCube, code: str, investor_mapping: dict,
+                 data: np.ndarray | None = None, kolom: str = "Jumlah Saham") -> go.Figure:
+    """18 seri (Lokal/Asing × 9 kategori)."""
+    i, m, x = _bulan(cube, code)
+    blok = _sumber(cube, data)[i, m]                           # (m, 2, 9)
+    gl = blok.size >= WEBGL_MIN_TITIK
+    traces = [
+        _garis(x, _ringkas(blok[:, j, k], kolom), f"{jenis} - {label}", kolom, gl)
+        for k, label in enumerate(_label(investor_mapping))
+        for j, jenis in enumerate(JENIS)
+    ]
+    return go.Figure({
+        "data": traces,
+        "layout": {
+            "title": {"text": f"📈 Tren Bulanan Kategori Investor - {code}"},
+            "xaxis": {"title": {"text": "Bulan"}},
+            "yaxis": {"title": {"text": kolom}},
+            "legend": {"title": {"text": "Kategori Investor"}},
+        },
+    })
+
+
+def bar_terakhir(cube: OwnershipCube, code: str, investor_mapping: dict,
+                 data: np.ndarray | None = None, kolom: str = "Jumlah Saham") -> go.Figure:
+    """Komposisi bulan terakhir per kategori, Lokal vs Asing berdampingan."""
+    i, m, x = _bulan(cube, code)
+    labels = _label(investor_mapping)
+    blok = _ringkas(_sumber(cube, data)[i, m[-1]], kolom) if len(m) else np.zeros((2, len(labels)))
+    return go.Figure({
+        "data": [
+            {"type": "bar", "x": labels, "y": blok[j], "name": jenis,
+             "hovertemplate": f"{jenis}<br>%{{x}}: {_hover(kolom)}<extra></extra>"}
+            for j, jenis in enumerate(JENIS)
+        ],
+        "layout": {
+            "title": {"text": f"📊 Komposisi Kepemilikan Terakhir ({x[-1] if x else '-'}) - {code}"},
+            "barmode": "group",
+            "yaxis": {"title": {"text": kolom}},
+        },
+    })
+
+
+def pie_terakhir(cube: OwnershipCube, code: str, data: np.ndarray | None = None,
+                 kolom: str = "Jumlah Saham") -> go.Figure | None:
+    """Total Lokal vs Asing bulan terakhir (None kalau kode belum punya data)."""
+    i, m, x = _bulan(cube, code)
+    if not len(m):
+        return None
+    tot = _ringkas(_sumber(cube, data)[i, m[-1]].sum(axis=1), kolom)   # (2,)
+    return go.Figure({
+        "data": [{"type": "pie", "labels": ["Total Lokal", "Total Asing"], "values": tot}],
+        "layout": {"title": {"text": f"Komposisi Kepemilikan ({x[-1]})"}},
+    })
+
+
+def perbandingan(cube: OwnershipCube, code: str, investor_mapping: dict,
+                 data: np.ndarray | None = None, kolom: str = "Jumlah Saham") -> go.Figure:
+    """Facet 3×3 per kategori: bar Lokal vs Asing per bulan."""
+    i, m, x = _bulan(cube, code)
+    blok = _sumber(cube, data)[i, m]                           # (m, 2, 9)
+    labels = _label(investor_mapping)
+    fig = make_subplots(rows=3, cols=3, subplot_titles=labels, shared_xaxes=True,
+                        vertical_spacing=0.08, horizontal_spacing=0.05)
+    for k in range(len(labels)):
+        for j, jenis in enumerate(JENIS):
+            fig.add_trace(
+                go.Bar(x=x, y=_ringkas(blok[:, j, k], kolom), name=jenis, legendgroup=jenis, showlegend=k == 0,
+                       marker_color=_warna(j),
+                       hovertemplate=f"{jenis}<br>%{{x|%b %Y}}: {_hover(kolom)}<extra></extra>"),
+                row=k // 3 + 1, col=k % 3 + 1,
+            )
+    fig.update_layout(title_text="Perbandingan Kepemilikan per Bulan: Lokal vs Asing", height=800)
+    return fig
+
+
+def arus_nilai(cube: OwnershipCube, code: str, valuasi) -> go.Figure:
+    """Efek harga vs efek jumlah per bulan, satu baris facet per Lokal/Asing."""
+    i, m, x = _bulan(cube, code)
+    komponen = {
+        "Efek Harga": valuasi.efek_harga[i, m].sum(axis=2),     # (m, 2)
+        "Efek Jumlah": valuasi.efek_jumlah[i, m].sum(axis=2),
+    }
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_titles=list(JENIS), vertical_spacing=0.06)
+    for n, (nama, arr) in enumerate(komponen.items()):
+        y = _ringkas(arr, "Rupiah")
+        for j in range(len(JENIS)):
+            fig.add_trace(
+                go.Bar(x=x, y=y[:, j], name=nama, legendgroup=nama, showlegend=j == 0,
+                       marker_color=_warna(n),
+                       hovertemplate=f"{nama}<br>%{{x|%b %Y}}: {_hover('Rupiah')}<extra></extra>"),
+                row=j + 1, col=1,
+            )
+    fig.update_layout(barmode="relative")
+    fig.update_yaxes(title_text="Rupiah")
+    return fig
+
+
+def spesifikasi(fig: go.Figure | None) -> dict | None:
+    """Spesifikasi JSON figur (typed array sudah base64) sebagai dict biasa, siap di-cache."""
+    return None if fig is None else json.loads(pio.to_json(fig, validate=False))
+
+
+class FigurSiap(go.Figure):
+    """
+    Figur dari spesifikasi yang sudah diserialkan: `to_dict()` mengembalikan spec
+    apa adanya, jadi st.plotly_chart tidak menyalin/menyerialkan ulang tiap trace
+    (tinggal json.dumps dict biasa).
+    """
+
+    def __init__(self, spec: dict):
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self) -> dict:
+        return self._spec
+
+    def to_plotly_json(self) -> dict:
+        return self._spec
+
+
+def ukuran_payload(fig: go.Figure) -> int:
+    """Byte JSON yang dikirim ke browser untuk figur ini."""
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+__all__ = [
+    "WEBGL_MIN_TITIK",
+    "tren_filter",
+    "ringkasan",
+    "per_kategori",
+    "bar_terakhir",
+    "pie_terakhir",
+    "perbandingan",
+    "arus_nilai",
+    "spesifikasi",
+    "FigurSiap",
+    "ukuran_payload",
+]
@@ -0,0 +1,216 @@
+# http_cache.py
+"""
+Cache HTTP di disk, dipakai bersama oleh semua rerun, sesi, dan worker Streamlit.
+
+- Kunci: sha256 dari URL yang dinormalisasi (host lowercase, tanpa fragment,
+  tanpa parameter tracking, query terurut) -> .cache/http/<2 hex>/<kunci>.bin
+- Isi file: satu baris JSON metadata + body terkompresi zlib
+- TTL per kelas URL (feed pendek, artikel panjang), lihat TTL & KELAS_URL
+- LRU: mtime file = terakhir dipakai; kalau total melewati HTTP_CACHE_MAX_BYTES,
+  file paling lama tidak dipakai dihapus sampai ~90% anggaran
+- Tulis atomik (tmp + os.replace), jadi aman dipakai banyak proses sekaligus
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+HTTP_CACHE_DIR = os.path.join(".cache", "http")
+HTTP_CACHE_MAX_BYTES = int(float(os.getenv("HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024)
+
+# detik; kelas dipilih dari pola pertama yang cocok di KELAS_URL, default "artikel"
+TTL = {
+    "feed": 15 * 60,
+    "artikel": 7 * 24 * 3600,
+}
+KELAS_URL: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"news\.google\.com/rss"), "feed"),
+    (re.compile(r"/(rss|feed|atom)(/|\.xml|$|\?)|\.(rss|xml)($|\?)", re.I), "feed"),
+]
+_TRACKING = re.compile(r"^(utm_\w+|fbclid|gclid|_ga|mc_cid|mc_eid)$", re.I)
+
+_USAGE_LOCK = threading.Lock()
+_USAGE: int | None = None    # perkiraan total byte di cache (dihitung ulang saat evict)
+
+
+@dataclass(frozen=True)
+class Entri:
+    url: str
+    content: bytes
+    content_type: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    kelas: str
+
+    @property
+    def umur(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def segar(self) -> bool:
+        return self.umur < TTL.get(self.kelas, TTL["artikel"])
+
+
+def normalisasi_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING.match(k))
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def kelas_url(url: str) -> str:
+    for pola, kelas in KELAS_URL:
+        if pola.search(url):
+            return kelas
+    return "artikel"
+
+
+def _path(url: str) -> str:
+    key = hashlib.sha256(normalisasi_url(url).encode("utf-8")).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, key[:2], key + ".bin")
+
+
+def baca(url: str) -> Entri | None:
+    """Entri cache (segar atau basi) untuk url, None kalau belum ada / rusak."""
+    path = _path(url)
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        meta_raw, _, body = raw.partition(b"\n")
+        meta = json.loads(meta_raw)
+        content = zlib.decompress(body)
+    except (OSError, ValueError, zlib.error):
+        return None
+    try:
+        os.utime(path)   # tandai baru dipakai (LRU)
+    except OSError:
+        pass
+    return Entri(
+        url=meta["url"],
+        content=content,
+        content_type=meta.get("content_type", ""),
+        etag=meta.get("etag"),
+        last_modified=meta.get("last_modified"),
+        fetched_at=meta["fetched_at"],
+        kelas=meta.get("kelas") or kelas_url(url),
+    )
+
+
+def simpan(
+    url: str,
+    content: bytes,
+    content_type: str = "",
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> Entri:
+    """Tulis/timpa entri secara atomik, lalu evict kalau melewati anggaran."""
+    path = _path(url)
+    meta = {
+        "url": normalisasi_url(url),
+        "content_type": content_type,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": time.time(),
+        "kelas": kelas_url(url),
+    }
+    entri = Entri(content=content, **meta)
+    blob = json.dumps(meta).encode("utf-8") + b"\n" + zlib.compress(content, 6)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp, "wb") as fh:
+            fh.write(blob)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Gagal simpan cache HTTP {url}: {e}")
+        return entri
+    _tambah_usage(len(blob))
+    return entri
+
+
+def segarkan(entri: Entri) -> Entri:
+    """Respons 304: body lama masih berlaku, reset umurnya."""
+    return simpan(entri.url, entri.content, entri.content_type, entri.etag, entri.last_modified)
+
+
+def _scan() -> List[Tuple[float, int, str]]:
+    out = []
+    for root, _, files in os.walk(HTTP_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue   # dihapus proses lain
+            out.append((st.st_mtime, st.st_size, path))
+    return out
+
+
+def _tambah_usage(n: int) -> None:
+    global _USAGE
+    with _USAGE_LOCK:
+        if _USAGE is None:
+            _USAGE = sum(size for _, size, _ in _scan())
+        else:
+            _USAGE += n
+        over = _USAGE > HTTP_CACHE_MAX_BYTES
+    if over:
+        evict()
+
+
+def evict(max_bytes: int | None = None) -> int:
+    """Hapus entri paling lama tidak dipakai sampai total <= 90% anggaran. Return byte yang dibuang."""
+    global _USAGE
+    budget = HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    files = _scan()   # scan ulang: proses lain mungkin ikut menulis
+    total = sum(size for _, size, _ in files)
+    target = int(budget * 0.9)
+    dibuang = 0
+    for _, size, path in sorted(files):
+        if total - dibuang <= target:
+            break
+        try:
+            os.remove(path)
+            dibuang += size
+        except OSError:
+            pass
+    with _USAGE_LOCK:
+        _USAGE = total - dibuang
+    return dibuang
+
+
+def statistik() -> dict:
+    files = _scan()
+    return {
+        "entri": len(files),
+        "bytes": sum(size for _, size, _ in files),
+        "max_bytes": HTTP_CACHE_MAX_BYTES,
+    }
+
+
+__all__ = [
+    "HTTP_CACHE_DIR",
+    "HTTP_CACHE_MAX_BYTES",
+    "TTL",
+    "KELAS_URL",
+    "Entri",
+    "normalisasi_url",
+    "kelas_url",
+    "baca",
+    "simpan",
+    "segarkan",
+    "evict",
+    "statistik",
+]
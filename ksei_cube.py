@@ -0,0 +1,258 @@
+# ksei_cube.py
+"""
+Kubus kepemilikan padat: kode × bulan × jenis (Lokal/Asing) × kategori investor.
+
+Dibangun sekali saat ingest dari frame `proses_data_ksei`, disimpan sebagai
+.npz di store, lalu semua tabel/grafik per kode tinggal slicing array.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+JENIS = ("Lokal", "Asing")
+KATEGORI_KODE = ("ID", "CP", "MF", "IB", "IS", "SC", "PF", "FD", "OT")
+CUBE_NAME = "cube.npz"
+
+
+@dataclass(frozen=True)
+class OwnershipCube:
+    codes: np.ndarray            # (C,) kode saham, terurut
+    months: np.ndarray           # (M,) 'YYYY-MM', terurut
+    shares: np.ndarray           # (C, M, 2, 9) int64 jumlah saham
+    present: np.ndarray          # (C, M) bool, kode ada di bulan tsb
+    price: np.ndarray            # (C, M) float64 harga penutupan (kolom Price)
+    sec_num: np.ndarray          # (C, M) int64 jumlah efek beredar (Sec. Num), 0 = tidak ada
+    kategori: tuple = tuple(KATEGORI_KODE)
+    version: str = ""
+    code_index: Dict[str, int] = field(default_factory=dict, compare=False)
+    bulan: pd.DatetimeIndex = field(default=None, compare=False)  # type: ignore[assignment]
+
+    def __post_init__(self):
+        if not self.code_index:
+            object.__setattr__(self, "code_index", {str(c): i for i, c in enumerate(self.codes)})
+        if self.bulan is None:
+            object.__setattr__(self, "bulan", pd.to_datetime(pd.Index(self.months), format="%Y-%m"))
+
+    def idx(self, code: str) -> int:
+        return self.code_index[code]
+
+
+def _side_cols(prefix: str) -> List[str]:
+    return [f"{prefix} {k}" for k in KATEGORI_KODE]
+
+
+def build_cube(df: pd.DataFrame, version: str = "") -> OwnershipCube:
+    """Akumulasi frame mentah (baris per kode/bulan/tipe) ke kubus padat."""
+    df = df[df["Bulan"].notna() & (df["Bulan"] != "NaT")]
+    ci, codes = pd.factorize(df["Code"].astype(str), sort=True)
+    mi, months = pd.factorize(df["Bulan"].astype(str), sort=True)
+
+    vals = np.stack(
+        [df[_side_cols("Local")].to_numpy(dtype=np.int64),
+         df[_side_cols("Foreign")].to_numpy(dtype=np.int64)],
+        axis=1,
+    )  # (N, 2, 9)
+    shares = np.zeros((len(codes), len(months), 2, len(KATEGORI_KODE)), dtype=np.int64)
+    np.add.at(shares, (ci, mi), vals)
+    present = np.zeros((len(codes), len(months)), dtype=bool)
+    present[ci, mi] = True
+    price = np.zeros((len(codes), len(months)), dtype=np.float64)
+    price[ci, mi] = df["Price"].to_numpy(dtype=np.float64)
+    sec_num = np.zeros((len(codes), len(months)), dtype=np.int64)
+    sec_num[ci, mi] = pd.to_numeric(df["Sec. Num"]).fillna(0).to_numpy(dtype=np.int64)
+
+    return OwnershipCube(
+        codes=np.asarray(codes, dtype=object),
+        months=np.asarray(months, dtype=object),
+        shares=shares,
+        present=present,
+        price=price,
+        sec_num=sec_num,
+        version=version,
+    )
+
+
+def save_cube(cube: OwnershipCube, path: str) -> None:
+    # unik per thread: sesi Streamlit berbagi satu proses
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}.npz"
+    np.savez(
+        tmp,
+        codes=cube.codes.astype(str),
+        months=cube.months.astype(str),
+        shares=cube.shares,
+        present=cube.present,
+        price=cube.price,
+        sec_num=cube.sec_num,
+        version=np.array(cube.version),
+    )
+    os.replace(tmp, path)
+
+
+def load_cube(path: str) -> OwnershipCube | None:
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        if "price" not in z.files:
+            return None  # format lama, bangun ulang
+        return OwnershipCube(
+            codes=z["codes"].astype(object),
+            months=z["months"].astype(object),
+            shares=z["shares"],
+            present=z["present"],
+            price=z["price"],
+            sec_num=z["sec_num"],
+            version=str(z["version"]),
+        )
+
+
+# ==========================
+# Slicing per kode -> frame siap plot
+# ==========================
+def _labels(investor_mapping: dict) -> List[str]:
+    return [investor_mapping[k] for k in KATEGORI_KODE]
+
+
+def frame_melt(
+    cube: OwnershipCube,
+    code: str,
+    investor_mapping: dict,
+    data: np.ndarray | None = None,
+    kolom: str = "Jumlah Saham",
+) -> pd.DataFrame:
+    """
+    Long format: Bulan, Jenis, Kategori Lengkap, <kolom> (bulan yang ada datanya saja).
+    `data` bisa diganti array (C, M, 2, 9) lain selain jumlah saham, mis. nilai rupiah.
+    """
+    i = cube.idx(code)
+    m = np.flatnonzero(cube.present[i])
+    block = (cube.shares if data is None else data)[i, m]   # (m, 2, 9)
+    n_m, n_k = len(m), len(KATEGORI_KODE)
+    # urutan baris: kategori -> jenis -> bulan (sama seperti melt lama)
+    vals = block.transpose(2, 1, 0).reshape(-1)
+    return pd.DataFrame({
+        "Bulan": np.tile(cube.bulan[m], 2 * n_k),
+        "Jenis": np.tile(np.repeat(np.array(JENIS, dtype=object), n_m), n_k),
+        "Kategori Lengkap": np.repeat(np.array(_labels(investor_mapping), dtype=object), 2 * n_m),
+        kolom: vals,
+    })
+
+
+def frame_summary(cube: OwnershipCube, code: str, data: np.ndarray | None = None) -> pd.DataFrame:
+    i = cube.idx(code)
+    m = np.flatnonzero(cube.present[i])
+    tot = (cube.shares if data is None else data)[i, m].sum(axis=2)   # (m, 2)
+    return pd.DataFrame({
+        "Bulan": cube.bulan[m],
+        "Total Lokal": tot[:, 0],
+        "Total Asing": tot[:, 1],
+        "Total": tot.sum(axis=1),
+    })
+
+
+def frame_latest(
+    cube: OwnershipCube,
+    code: str,
+    investor_mapping: dict,
+    data: np.ndarray | None = None,
+    kolom: str = "Jumlah Saham",
+):
+    """Komposisi bulan terakhir kode tsb. Return (frame, bulan_terakhir)."""
+    i = cube.idx(code)
+    m = np.flatnonzero(cube.present[i])
+    if len(m) == 0:
+        return pd.DataFrame(columns=["Bulan", "Jenis", "Kategori Lengkap", kolom, "Total", "Persentase"]), None
+    last = m[-1]
+    block = (cube.shares if data is None else data)[i, last]   # (2, 9)
+    total = block.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = block / total * 100
+    n_k = len(KATEGORI_KODE)
+    latest_month = cube.bulan[last]
+    return pd.DataFrame({
+        "Bulan": latest_month,
+        "Jenis": np.repeat(np.array(JENIS, dtype=object), n_k),
+        "Kategori Lengkap": np.tile(np.array(_labels(investor_mapping), dtype=object), 2),
+        kolom: block.reshape(-1),
+        "Total": np.repeat(total[:, 0], n_k),
+        "Persentase": pct.reshape(-1),
+    }), latest_month
+
+
+def frame_per_label(
+    cube: OwnershipCube,
+    code: str,
+    investor_mapping: dict,
+    data: np.ndarray | None = None,
+    kolom: str = "Jumlah Saham",
+) -> pd.DataFrame:
+    """Bulan, Label ('Lokal - Individual', ...), <kolom> untuk grafik 18 seri."""
+    df = frame_melt(cube, code, investor_mapping, data=data, kolom=kolom)
+    return pd.DataFrame({
+        "Bulan": df["Bulan"],
+        "Label": df["Jenis"] + " - " + df["Kategori Lengkap"],
+        kolom: df[kolom],
+    })
+
+
+def frame_trend(cube: OwnershipCube, code: str, investor_mapping: dict) -> pd.DataFrame:
+    """Long format + Δ Saham, Total, Persentase, Status per jenis/kategori."""
+    i = cube.idx(code)
+    m = np.flatnonzero(cube.present[i])
+    block = cube.shares[i, m]                     # (m, 2, 9)
+    delta = np.zeros_like(block)
+    delta[1:] = np.diff(block, axis=0)
+    total = np.broadcast_to(block.sum(axis=2, keepdims=True), block.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = block / total * 100
+
+    df = frame_melt(cube, code, investor_mapping)
+    flat = lambda a: a.transpose(2, 1, 0).reshape(-1)
+    df["Δ Saham"] = flat(delta)
+    df["Total"] = flat(total)
+    df["Persentase"] = flat(pct)
+    df["Status"] = np.select(
+        [df["Δ Saham"].to_numpy() > 0, df["Δ Saham"].to_numpy() < 0],
+        ["⬆️ Naik", "⬇️ Turun"],
+        default="⏸️ Stabil",
+    )
+    return df
+
+
+def frame_arus_nilai(cube: OwnershipCube, code: str, valuasi) -> pd.DataFrame:
+    """Bulan, Jenis, Arus Nilai, Efek Harga, Efek Jumlah (dijumlah semua kategori)."""
+    i = cube.idx(code)
+    m = np.flatnonzero(cube.present[i])
+    parts = {
+        "Arus Nilai": valuasi.arus_nilai[i, m].sum(axis=2),   # (m, 2)
+        "Efek Harga": valuasi.efek_harga[i, m].sum(axis=2),
+        "Efek Jumlah": valuasi.efek_jumlah[i, m].sum(axis=2),
+    }
+    n_m = len(m)
+    return pd.DataFrame({
+        "Bulan": np.tile(cube.bulan[m], 2),
+        "Jenis": np.repeat(np.array(JENIS, dtype=object), n_m),
+        **{k: v.T.reshape(-1) for k, v in parts.items()},
+    })
+
+
+__all__ = [
+    "OwnershipCube",
+    "JENIS",
+    "KATEGORI_KODE",
+    "CUBE_NAME",
+    "build_cube",
+    "save_cube",
+    "load_cube",
+    "frame_melt",
+    "frame_summary",
+    "frame_latest",
+    "frame_per_label",
+    "frame_trend",
+    "frame_arus_nilai",
+]
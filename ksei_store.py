@@ -0,0 +1,301 @@
+# ksei_store.py
+"""
+Snapshot kolumnar (Parquet) untuk file KSEI `Balancepos*.txt`.
+
+Setiap file sumber di-parse sekali lalu disimpan sebagai satu "part" Parquet.
+Manifest mencatat nama, ukuran, mtime dan sha256 tiap file; file baru/berubah
+saja yang di-parse ulang, sisanya langsung dibaca dari snapshot gabungan.
+Snapshot dipecah per kolom `Type` (EQUITY, CORPORATE BOND, ...) supaya
+pemanggil bisa membaca partisi yang dibutuhkan saja.
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: cukup kunci per proses
+    fcntl = None
+
+STORE_DIRNAME = ".store"
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_DIRNAME = "snapshot"
+LOCK_NAME = "rebuild.lock"
+STORE_FORMAT = 3
+_LEGACY = ("snapshot.parquet",)   # layout format 1, tidak dipakai lagi
+
+_REBUILD_LOCK = threading.Lock()
+
+
+def _sha256_file(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _tmp_name(path: str) -> str:
+    # unik per proses *dan* thread: sesi Streamlit adalah thread di proses yang sama
+    return f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+
+
+def _atomic_write_bytes(path: str, data: bytes) -> None:
+    tmp = _tmp_name(path)
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _atomic_to_parquet(df: pd.DataFrame, path: str) -> None:
+    tmp = _tmp_name(path)
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _kunci_rebuild(root: str):
+    """Serialkan rebuild snapshot antar thread (Lock) dan antar proses (flock)."""
+    with _REBUILD_LOCK:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(root, LOCK_NAME), "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def store_dir(folder: str) -> str:
+    return os.path.join(folder, STORE_DIRNAME)
+
+
+def _load_manifest(root: str) -> dict:
+    path = os.path.join(root, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if manifest.get("format") == STORE_FORMAT:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"format": STORE_FORMAT, "files": {}, "version": "", "errors": {}}
+
+
+def _save_manifest(root: str, manifest: dict) -> None:
+    data = json.dumps(manifest, indent=1, sort_keys=True).encode("utf-8")
+    _atomic_write_bytes(os.path.join(root, MANIFEST_NAME), data)
+
+
+def _version_of(files: Dict[str, dict]) -> str:
+    """Versi dataset = hash dari (nama, sha256) seluruh file sumber."""
+    h = hashlib.sha256()
+    for name in sorted(files):
+        h.update(name.encode("utf-8"))
+        h.update(files[name]["sha256"].encode("ascii"))
+    return h.hexdigest()[:16]
+
+
+def _type_slug(tipe: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", tipe).strip("_").lower() or "lainnya"
+
+
+def _part_name(name: str, sha: str) -> str:
+    stem = os.path.splitext(name)[0]
+    return f"{stem}-{sha[:12]}.parquet"
+
+
+def sync_store(
+    folder: str,
+    parse_files: Callable[[List[str]], Tuple[Dict[str, pd.DataFrame], Dict[str, str]]],
+    pattern: str = "*.txt",
+) -> tuple[dict, List[str]]:
+    """
+    Samakan isi store dengan file di `folder`.
+    `parse_files(paths)` mem-parse semua file baru sekaligus dan mengembalikan
+    (path -> frame, path -> error). File yang gagal dicatat di manifest["errors"].
+    Return (manifest, daftar nama file yang baru di-parse).
+    """
+    root = store_dir(folder)
+    os.makedirs(root, exist_ok=True)
+    manifest = _load_manifest(root)
+    old_files: Dict[str, dict] = manifest["files"]
+
+    old_errors: Dict[str, dict] = manifest.get("errors", {})
+
+    new_files: Dict[str, dict] = {}
+    errors: Dict[str, dict] = {}
+    pending: Dict[str, tuple] = {}
+    for path in sorted(glob.glob(os.path.join(folder, pattern))):
+        name = os.path.basename(path)
+        st_ = os.stat(path)
+        prev = old_files.get(name)
+
+        # jalur cepat: ukuran & mtime sama -> anggap isi sama, tanpa hashing
+        if prev and prev["size"] == st_.st_size and prev["mtime_ns"] == st_.st_mtime_ns \
+                and os.path.exists(os.path.join(root, prev["part"])):
+            new_files[name] = prev
+            continue
+        failed = old_errors.get(name)
+        if failed and failed["size"] == st_.st_size and failed["mtime_ns"] == st_.st_mtime_ns:
+            # file rusak yang sama: laporkan lagi tanpa parse ulang
+            errors[name] = failed
+            continue
+
+        sha = _sha256_file(path)
+        if prev and prev["sha256"] == sha and os.path.exists(os.path.join(root, prev["part"])):
+            # cuma di-touch, isi tidak berubah
+            new_files[name] = dict(prev, size=st_.st_size, mtime_ns=st_.st_mtime_ns)
+            continue
+        pending[path] = (name, st_, sha)
+
+    parsed: List[str] = []
+    if pending:
+        frames, failures = parse_files(list(pending))
+        for path, msg in failures.items():
+            name, st_, _ = pending[path]
+            errors[name] = {"size": st_.st_size, "mtime_ns": st_.st_mtime_ns, "error": msg}
+            print(f"⚠️ Gagal parse {name}: {msg}")
+        for path, part_df in frames.items():
+            name, st_, sha = pending[path]
+            part = _part_name(name, sha)
+            _atomic_to_parquet(part_df, os.path.join(root, part))
+            new_files[name] = {
+                "size": st_.st_size,
+                "mtime_ns": st_.st_mtime_ns,
+                "sha256": sha,
+                "part": part,
+                "rows": int(len(part_df)),
+            }
+            parsed.append(name)
+
+    # buang part milik file yang sudah dihapus/berubah
+    keep = {meta["part"] for meta in new_files.values()}
+    for meta in old_files.values():
+        if meta["part"] not in keep:
+            try:
+                os.remove(os.path.join(root, meta["part"]))
+            except OSError:
+                pass
+
+    for nama in _LEGACY:
+        try:
+            os.remove(os.path.join(root, nama))
+        except FileNotFoundError:
+            pass
+
+    version = _version_of(new_files)
+    snapdir = os.path.join(root, SNAPSHOT_DIRNAME)
+    baru = {
+        "format": STORE_FORMAT,
+        "files": new_files,
+        "version": version,
+        "errors": errors,
+        "types": manifest.get("types", {}),
+    }
+    if version != manifest.get("version") or not os.path.isdir(snapdir):
+        with _kunci_rebuild(root):
+            # thread/proses lain mungkin sudah membangun versi ini selagi kita menunggu
+            terkini = _load_manifest(root)
+            if terkini.get("version") == version and os.path.isdir(snapdir):
+                baru["types"] = terkini.get("types", {})
+            else:
+                baru["types"] = _write_partitions(root, [new_files[n]["part"] for n in sorted(new_files)])
+            _save_manifest(root, baru)
+    elif baru != manifest:
+        # rerun tanpa perubahan tidak perlu menulis manifest lagi
+        _save_manifest(root, baru)
+    return baru, parsed
+
+
+def _write_partitions(root: str, parts: List[str]) -> Dict[str, dict]:
+    """
+    Tulis ulang snapshot/<type>.parquet dari semua part. Return Type -> meta.
+    Dipanggil di bawah `_kunci_rebuild`; folder sementara tetap unik per panggilan.
+    """
+    snapdir = os.path.join(root, SNAPSHOT_DIRNAME)
+    tmpdir = _tmp_name(snapdir)
+    shutil.rmtree(tmpdir, ignore_errors=True)
+    os.makedirs(tmpdir)
+
+    types: Dict[str, dict] = {}
+    if parts:
+        df = pd.concat([pd.read_parquet(os.path.join(root, p)) for p in parts], ignore_index=True)
+        df["Type"] = df["Type"].astype(str)
+        for tipe, part_df in df.groupby("Type", sort=True):
+            fname = f"{_type_slug(str(tipe))}.parquet"
+            part_df.to_parquet(os.path.join(tmpdir, fname), index=False)
+            types[str(tipe)] = {"file": fname, "rows": int(len(part_df))}
+
+    old = f"{snapdir}.old{os.getpid()}.{threading.get_ident()}"
+    if os.path.isdir(snapdir):
+        os.replace(snapdir, old)
+    os.replace(tmpdir, snapdir)
+    shutil.rmtree(old, ignore_errors=True)
+    return types
+
+
+def list_types(folder: str = "data/") -> Dict[str, int]:
+    """Type efek yang tersedia di snapshot -> jumlah baris."""
+    types = _load_manifest(store_dir(folder)).get("types", {})
+    return {tipe: meta["rows"] for tipe, meta in types.items()}
+
+
+def load_snapshot(folder: str, types: Iterable[str] | None = None) -> pd.DataFrame | None:
+    """
+    Baca snapshot; kalau `types` diisi hanya partisi Type tsb yang dibaca.
+    None kalau store belum pernah dibangun atau tidak ada partisi yang cocok.
+    """
+    root = store_dir(folder)
+    types = None if types is None else list(types)
+    try:
+        return _baca_partisi(root, types)
+    except FileNotFoundError:
+        # kena jeda saat snapshot/ sedang ditukar: tunggu rebuild selesai lalu baca ulang
+        with _kunci_rebuild(root):
+            return _baca_partisi(root, types)
+
+
+def _baca_partisi(root: str, types: Iterable[str] | None) -> pd.DataFrame | None:
+    available: Dict[str, dict] = _load_manifest(root).get("types", {})
+    wanted = sorted(available) if types is None else [t for t in sorted(set(types)) if t in available]
+    if not wanted:
+        return None
+    frames = [
+        pd.read_parquet(os.path.join(root, SNAPSHOT_DIRNAME, available[t]["file"]))
+        for t in wanted
+    ]
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def load_errors(folder: str = "data/") -> Dict[str, str]:
+    """File sumber yang gagal di-parse pada sync terakhir (nama -> pesan)."""
+    errors = _load_manifest(store_dir(folder)).get("errors", {})
+    return {name: meta["error"] for name, meta in errors.items()}
+
+
+def dataset_version(folder: str = "data/") -> str:
+    """Versi dataset terakhir yang tercatat di manifest ('' kalau belum ada)."""
+    return _load_manifest(store_dir(folder)).get("version", "")
+
+
+__all__ = [
+    "sync_store",
+    "load_snapshot",
+    "dataset_version",
+    "load_errors",
+    "list_types",
+    "store_dir",
+]
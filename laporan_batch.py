@@ -0,0 +1,238 @@
+# laporan_batch.py
+"""
+Laporan kepemilikan tanpa UI: tabel tren (Δ Saham / Persentase per jenis &
+kategori investor) untuk semua kode atau daftar kode, dihitung paralel di
+process pool lalu ditulis sekaligus ke Parquet / CSV / XLSX.
+
+    python laporan_batch.py --out laporan/                        # semua kode EQUITY
+    python laporan_batch.py --codes BBCA,TLKM --format csv,xlsx --out laporan/
+    python laporan_batch.py --types all --sejak 2024-01 --workers 8 --out laporan/
+
+Isi folder --out (keluaran di bawah ini diganti utuh tiap run lewat folder
+sementara; yang tidak dihasilkan run ini dihapus, file lain dibiarkan):
+    tren.parquet/part-NNNNN.parquet   satu file per potongan kode (baca: pd.read_parquet(dir))
+    tren.csv                          semua potongan digabung, satu header
+    xlsx/<KODE>.xlsx                  pivot per kode (format sama dengan tombol unduh di app)
+    laporan.json                      versi dataset, jumlah kode/baris, durasi
+
+Kubus dibangun/dibaca sekali lewat `muat_cube_ksei` (yang memanggil
+`proses_data_ksei`); tiap worker memuat .npz kubus yang sama dari store.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Sequence
+
+import pandas as pd
+
+from data_analysis import investor_mapping, muat_cube_ksei, path_cube_ksei
+from ekspor_excel import SHEET_PIVOT, pivot_dari_tren, tulis_workbook
+from ksei_cube import OwnershipCube, frame_trend, load_cube
+
+FORMAT = ("parquet", "csv", "xlsx")
+KODE_PER_POTONGAN = 250     # batas atas; potongan lebih kecil kalau kode sedikit
+_KATEGORIKAL = ("Kode", "Jenis", "Kategori Lengkap", "Status")
+_KELUARAN = ("tren.parquet", "tren.csv", "xlsx", "laporan.json")   # isi --out yang dikelola modul ini
+
+_CUBE: OwnershipCube | None = None
+
+
+def _init_worker(path: str) -> None:
+    global _CUBE
+    _CUBE = load_cube(path)
+
+
+def _nama_file(code: str) -> str:
+    return re.sub(r"[^\w.-]", "_", code)
+
+
+def _potongan(nomor: int, codes: Sequence[str], formats: Sequence[str], stage: str,
+              sejak: str | None) -> Dict[str, int]:
+    """Hitung tren untuk satu potongan kode dan tulis bagiannya ke folder `stage`."""
+    cube = _CUBE
+    batas = pd.Timestamp(f"{sejak}-01") if sejak else None
+    frames: List[pd.DataFrame] = []
+    for code in codes:
+        df = frame_trend(cube, code, investor_mapping)
+        if batas is not None:
+            # Δ bulan pertama tetap relatif ke bulan sebelumnya (dihitung sebelum dipotong)
+            df = df[df["Bulan"] >= batas].reset_index(drop=True)
+        if "xlsx" in formats:
+            tulis_workbook(os.path.join(stage, "xlsx", f"{_nama_file(code)}.xlsx"),
+                           [(SHEET_PIVOT, pivot_dari_tren(df))])
+        df.insert(0, "Kode", code)
+        frames.append(df)
+
+    tren = pd.concat(frames, ignore_index=True)
+    if "parquet" in formats:
+        for c in _KATEGORIKAL:
+            tren[c] = tren[c].astype("category")
+        tren.to_parquet(os.path.join(stage, "tren.parquet", f"part-{nomor:05d}.parquet"), index=False)
+    if "csv" in formats:
+        tren.to_csv(os.path.join(stage, f"tren.csv.part-{nomor:05d}"), index=False, header=False,
+                    float_format="%.4f")
+    return {"kode": len(codes), "baris": len(tren)}
+
+
+def _gabung_csv(stage: str, n: int, kolom: List[str]) -> None:
+    with open(os.path.join(stage, "tren.csv"), "w", encoding="utf-8", newline="") as out:
+        out.write(",".join(kolom) + "\n")
+        for i in range(n):
+            part = os.path.join(stage, f"tren.csv.part-{i:05d}")
+            with open(part, encoding="utf-8", newline="") as fh:
+                shutil.copyfileobj(fh, out, 1 << 20)
+            os.remove(part)
+
+
+def _pindahkan(stage: str, out: str) -> None:
+    """
+    Ganti hasil lama di `out` dengan isi `stage` per entri (tiap entri utuh atau
+    tidak sama sekali). Keluaran laporan lama yang tidak dihasilkan run ini
+    (mis. xlsx/ setelah --format csv) dihapus; file lain di `out` tidak disentuh.
+    """
+    baru = set(os.listdir(stage))
+    for nama in _KELUARAN:
+        tujuan = os.path.join(out, nama)
+        if nama in baru or not os.path.lexists(tujuan):
+            continue
+        if os.path.isdir(tujuan):
+            shutil.rmtree(tujuan)
+        else:
+            os.remove(tujuan)
+    # laporan.json terakhir: tidak pernah ada ringkasan baru di samping hasil lama
+    for nama in sorted(baru, key=lambda n: n == "laporan.json"):
+        tujuan = os.path.join(out, nama)
+        if os.path.isdir(tujuan):
+            shutil.rmtree(tujuan)
+        os.replace(os.path.join(stage, nama), tujuan)
+    os.rmdir(stage)
+
+
+def buat_laporan(
+    out: str,
+    folder: str = "data/",
+    types: Sequence[str] | None = ("EQUITY",),
+    codes: Sequence[str] | None = None,
+    formats: Sequence[str] = FORMAT,
+    workers: int | None = None,
+    sejak: str | None = None,
+) -> dict:
+    """
+    Tulis laporan tren untuk `codes` (None = semua kode di kubus) ke folder `out`.
+    Return ringkasan (juga disimpan sebagai laporan.json).
+    """
+    global _CUBE
+    t0 = time.perf_counter()
+    formats = [f for f in FORMAT if f in set(formats)]
+    types = list(types) if types is not None else None
+    cube = muat_cube_ksei(folder, types=types)
+    if cube is None:
+        raise SystemExit(f"Tidak ada data KSEI di {folder}")
+    t_cube = time.perf_counter() - t0
+
+    if codes is None:
+        pilih = [str(c) for c in cube.codes]
+        hilang: List[str] = []
+    else:
+        pilih = sorted({c for c in codes if c in cube.code_index})
+        hilang = sorted({c for c in codes if c not in cube.code_index})
+    if not pilih:
+        raise SystemExit("Tidak ada kode yang cocok dengan data.")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pilih)))
+    ukuran = max(1, min(KODE_PER_POTONGAN, -(-len(pilih) // (workers * 4))))
+    potongan = [pilih[i:i + ukuran] for i in range(0, len(pilih), ukuran)]
+
+    os.makedirs(out, exist_ok=True)
+    stage = os.path.join(out, f".tmp-{os.getpid()}")
+    os.makedirs(stage)
+    if "parquet" in formats:
+        os.makedirs(os.path.join(stage, "tren.parquet"))
+    if "xlsx" in formats:
+        os.makedirs(os.path.join(stage, "xlsx"))
+
+    baris = 0
+    try:
+        if workers == 1:
+            _CUBE = cube
+            for i, p in enumerate(potongan):
+                baris += _potongan(i, p, formats, stage, sejak)["baris"]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(path_cube_ksei(folder, types),)) as ex:
+                futs = [ex.submit(_potongan, i, p, formats, stage, sejak) for i, p in enumerate(potongan)]
+                for fut in as_completed(futs):
+                    baris += fut.result()["baris"]
+        if "csv" in formats:
+            kolom = ["Kode", *frame_trend(cube, pilih[0], investor_mapping).columns]
+            _gabung_csv(stage, len(potongan), kolom)
+        ringkasan = {
+            "dataset": cube.version,
+            "types": types or "all",
+            "bulan": [str(cube.months[0]), str(cube.months[-1])] if len(cube.months) else [],
+            "sejak": sejak,
+            "kode": len(pilih),
+            "kode_tidak_ada": hilang,
+            "baris": baris,
+            "format": formats,
+            "workers": workers,
+            "potongan": len(potongan),
+            "detik_kubus": round(t_cube, 3),
+            "detik_total": round(time.perf_counter() - t0, 3),
+        }
+        with open(os.path.join(stage, "laporan.json"), "w", encoding="utf-8") as fh:
+            json.dump(ringkasan, fh, ensure_ascii=False, indent=2)
+        _pindahkan(stage, out)
+    except BaseException:
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+    return ringkasan
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Laporan tren kepemilikan KSEI tanpa UI (paralel).")
+    ap.add_argument("--data", default="data/", help="folder Balancepos*.txt")
+    ap.add_argument("--out", required=True, help="folder hasil")
+    ap.add_argument("--codes", help="daftar kode dipisah koma, atau @file (satu kode per baris); default semua")
+    ap.add_argument("--types", default="EQUITY", help="Type efek dipisah koma, atau 'all'")
+    ap.add_argument("--format", default=",".join(FORMAT), help="kombinasi parquet,csv,xlsx")
+    ap.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah CPU)")
+    ap.add_argument("--sejak", help="hanya bulan >= YYYY-MM")
+    args = ap.parse_args(argv)
+
+    formats = [f.strip().lower() for f in args.format.split(",") if f.strip()]
+    salah = sorted(set(formats) - set(FORMAT))
+    if salah or not formats:
+        ap.error(f"format tidak dikenal: {', '.join(salah) or '(kosong)'}")
+    if args.sejak and not re.fullmatch(r"\d{4}-\d{2}", args.sejak):
+        ap.error("--sejak harus berformat YYYY-MM")
+    codes = None
+    if args.codes:
+        if args.codes.startswith("@"):
+            with open(args.codes[1:], encoding="utf-8") as fh:
+                codes = [ln.strip().upper() for ln in fh if ln.strip()]
+        else:
+            codes = [c.strip().upper() for c in args.codes.split(",") if c.strip()]
+    types = None if args.types.lower() == "all" else [t.strip() for t in args.types.split(",") if t.strip()]
+
+    ringkasan = buat_laporan(args.out, args.data, types, codes, formats, args.workers, args.sejak)
+    if ringkasan["kode_tidak_ada"]:
+        print(f"⚠️ Kode tidak ditemukan: {', '.join(ringkasan['kode_tidak_ada'])}", file=sys.stderr)
+    print(f"✅ {ringkasan['kode']} kode, {ringkasan['baris']:,} baris "
+          f"({', '.join(ringkasan['format'])}) -> {args.out} dalam {ringkasan['detik_total']:.1f} s "
+          f"[{ringkasan['workers']} proses]")
+    return 0
+
+
+__all__ = ["FORMAT", "buat_laporan", "main"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,343 @@
 # news_cache.py
 from db import get_engine  # ← tambahkan ini
+import datetime as dt
+import re
+import threading
 import pandas as pd
 import hashlib
-from sqlalchemy.dialects.mysql import insert
-
-
-UPSERT_SQL = """
-INSERT INTO sahamiawa
-(kode, judul, link, link_hash, summary, content, source, pub_date, cached_at, keywords)
-VALUES
-(:kode,:judul,:link,:link_hash,:summary,:content,:source,:pub_date,:cached_at,:keywords)
-ON DUPLICATE KEY UPDATE
-  judul=VALUES(judul),
-  summary=VALUES(summary),
-  content=VALUES(content),
-  source=VALUES(source),
-  pub_date=COALESCE(VALUES(pub_date), pub_date),
-  cached_at=VALUES(cached_at),
-  keywords=VALUES(keywords);
-"""
+from dateutil import parser as dtparser
+from sqlalchemy import bindparam, inspect, text
+
+
+BATCH_SIZE = 500
+
+# ==========================
+# Skema (versioned, idempotent) untuk SingleStore & SQLite
+# ==========================
+# berita_artikel : satu baris per artikel (unik per link_hash)
+# berita_kode    : relasi many-to-many kode <-> artikel, dengan sort_ts tersimpan
+#                  (= pub_date, atau cached_at kalau pub_date kosong) supaya
+#                  "30 terbaru per kode" jadi range scan di index (kode, sort_ts).
+ARTICLE_TABLE = "berita_artikel"
+KODE_TABLE = "berita_kode"
+VERSION_TABLE = "berita_schema_version"
+LEGACY_TABLES = ("sahamiawa", "sahamiwa")
+
+_DDL = {
+    "mysql": [
+        f"""CREATE TABLE IF NOT EXISTS {ARTICLE_TABLE} (
+            link_hash CHAR(64) NOT NULL,
+            link TEXT,
+            judul TEXT,
+            summary LONGTEXT,
+            content LONGTEXT,
+            source VARCHAR(255),
+            pub_date DATETIME NULL,
+            cached_at DATETIME NOT NULL,
+            PRIMARY KEY (link_hash),
+            SHARD KEY (link_hash)
+        )""",
+        f"""CREATE TABLE IF NOT EXISTS {KODE_TABLE} (
+            kode VARCHAR(32) NOT NULL,
+            link_hash CHAR(64) NOT NULL,
+            sort_ts DATETIME NOT NULL,
+            cached_at DATETIME NOT NULL,
+            keywords TEXT,
+            PRIMARY KEY (kode, link_hash),
+            SHARD KEY (kode),
+            KEY idx_kode_sort (kode, sort_ts)   -- hash index di columnstore; lihat migrasi v5
+        )""",
+    ],
+    "sqlite": [
+        f"""CREATE TABLE IF NOT EXISTS {ARTICLE_TABLE} (
+            link_hash TEXT PRIMARY KEY,
+            link TEXT,
+            judul TEXT,
+            summary TEXT,
+            content TEXT,
+            source TEXT,
+            pub_date TIMESTAMP NULL,
+            cached_at TIMESTAMP NOT NULL
+        )""",
+        f"""CREATE TABLE IF NOT EXISTS {KODE_TABLE} (
+            kode TEXT NOT NULL,
+            link_hash TEXT NOT NULL,
+            sort_ts TIMESTAMP NOT NULL,
+            cached_at TIMESTAMP NOT NULL,
+            keywords TEXT,
+            PRIMARY KEY (kode, link_hash)
+        )""",
+        f"CREATE INDEX IF NOT EXISTS idx_kode_sort ON {KODE_TABLE} (kode, sort_ts)",
+    ],
+}
+
+_SCHEMA_LOCK = threading.Lock()
+_SCHEMA_READY = set()
+
+
+def _dialect(engine) -> str:
+    name = engine.dialect.name
+    return "mysql" if name in ("mysql", "mariadb", "singlestoredb") else "sqlite"
+
+
+def _migrate_v1(conn, dialect):
+    for ddl in _DDL[dialect]:
+        conn.execute(text(ddl))
+
+
+def _migrate_v2(conn, dialect):
+    """Salin isi tabel lama (sahamiawa / sahamiwa, satu baris per kode) bila ada."""
+    insp = inspect(conn)
+    for legacy in LEGACY_TABLES:
+        if not insp.has_table(legacy):
+            continue
+        cols = {c["name"] for c in insp.get_columns(legacy)}
+        if not {"kode", "link"} <= cols:
+            continue
+        pick = [c for c in ("kode", "judul", "link", "summary", "content", "source", "pub_date", "keywords") if c in cols]
+        df = pd.read_sql(text(f"SELECT {', '.join(pick)} FROM {legacy}"), conn)
+        for kode, grp in df.groupby("kode"):
+            items = grp.rename(columns={"pub_date": "pubDate"}).to_dict("records")
+            for it in items:
+                if it.get("pubDate") is not None and not isinstance(it["pubDate"], str):
+                    it["pubDate"] = str(it["pubDate"])
+            keywords = str(grp["keywords"].iloc[0]) if "keywords" in grp else ""
+            _write(conn, dialect, _rows(str(kode), keywords, items), BATCH_SIZE)
+
+
+FTS_TABLE = "berita_fts"
+
+_FTS_DDL = {
+    "mysql": [
+        f"ALTER TABLE {ARTICLE_TABLE} ADD FULLTEXT ft_berita (judul, summary, content)",
+    ],
+    "sqlite": [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            judul, summary, content,
+            content='{ARTICLE_TABLE}', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {ARTICLE_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, judul, summary, content)
+            VALUES (new.rowid, new.judul, new.summary, new.content);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {ARTICLE_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, judul, summary, content)
+            VALUES ('delete', old.rowid, old.judul, old.summary, old.content);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {ARTICLE_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, judul, summary, content)
+            VALUES ('delete', old.rowid, old.judul, old.summary, old.content);
+            INSERT INTO {FTS_TABLE}(rowid, judul, summary, content)
+            VALUES (new.rowid, new.judul, new.summary, new.content);
+        END""",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ],
+}
+
+
+def _migrate_v3(conn, dialect):
+    """Index full-text atas judul/summary/content (FTS5 di SQLite, FULLTEXT di SingleStore)."""
+    for ddl in _FTS_DDL[dialect]:
+        conn.execute(text(ddl))
+
+
+# v4: rowid implisit tabel ber-PRIMARY KEY TEXT bisa dinomori ulang oleh VACUUM,
+# jadi FTS5 external-content harus menunjuk kolom INTEGER PRIMARY KEY eksplisit.
+_ARTICLE_V4_SQLITE = f"""CREATE TABLE {ARTICLE_TABLE}_v4 (
+    id INTEGER PRIMARY KEY,
+    link_hash TEXT NOT NULL UNIQUE,
+    link TEXT,
+    judul TEXT,
+    summary TEXT,
+    content TEXT,
+    source TEXT,
+    pub_date TIMESTAMP NULL,
+    cached_at TIMESTAMP NOT NULL
+)"""
+
+_FTS_V4_SQLITE = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        judul, summary, content,
+        content='{ARTICLE_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {ARTICLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, judul, summary, content)
+        VALUES (new.id, new.judul, new.summary, new.content);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {ARTICLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, judul, summary, content)
+        VALUES ('delete', old.id, old.judul, old.summary, old.content);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {ARTICLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, judul, summary, content)
+        VALUES ('delete', old.id, old.judul, old.summary, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, judul, summary, content)
+        VALUES (new.id, new.judul, new.summary, new.content);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def _migrate_v4(conn, dialect):
+    """SQLite: tambah `id INTEGER PRIMARY KEY` ke berita_artikel dan jadikan content_rowid FTS5."""
+    if dialect != "sqlite":
+        return  # FULLTEXT SingleStore tidak bergantung pada rowid
+    for trig in ("ai", "ad", "au"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trig}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    conn.execute(text(_ARTICLE_V4_SQLITE))
+    cols = ", ".join(_ARTICLE_COLS)
+    # id = rowid lama supaya urutan sisip tetap terjaga
+    conn.execute(text(
+        f"INSERT INTO {ARTICLE_TABLE}_v4 (id, {cols}) SELECT rowid, {cols} FROM {ARTICLE_TABLE}"
+    ))
+    conn.execute(text(f"DROP TABLE {ARTICLE_TABLE}"))
+    conn.execute(text(f"ALTER TABLE {ARTICLE_TABLE}_v4 RENAME TO {ARTICLE_TABLE}"))
+    for ddl in _FTS_V4_SQLITE:
+        conn.execute(text(ddl))
+
+
+# v5 (SingleStore): di tabel columnstore default, KEY (kode, sort_ts) adalah hash index
+# yang hanya menjawab equality dua kolom, jadi "30 terbaru per kode" tetap scan + sort.
+# Migrasi ini mengasumsikan berita_kode sebagai ROWSTORE dengan index terurut
+# (BTREE = skiplist di SingleStore) atas (kode, sort_ts): range scan per kode, sudah
+# terurut sort_ts. Tabelnya kecil dan sering di-upsert, cocok untuk rowstore.
+_KODE_V5_MYSQL = f"""CREATE ROWSTORE TABLE {KODE_TABLE}_v5 (
+    kode VARCHAR(32) NOT NULL,
+    link_hash CHAR(64) NOT NULL,
+    sort_ts DATETIME NOT NULL,
+    cached_at DATETIME NOT NULL,
+    keywords TEXT,
+    PRIMARY KEY (kode, link_hash),
+    SHARD KEY (kode),
+    KEY idx_kode_sort (kode, sort_ts) USING BTREE
+)"""
+
+
+def _migrate_v5(conn, dialect):
+    """SingleStore: berita_kode jadi rowstore dengan index BTREE (kode, sort_ts)."""
+    if dialect != "mysql":
+        return  # index SQLite sudah B-tree
+    conn.execute(text(f"DROP TABLE IF EXISTS {KODE_TABLE}_v5"))
+    conn.execute(text(_KODE_V5_MYSQL))
+    cols = "kode, link_hash, sort_ts, cached_at, keywords"
+    conn.execute(text(f"INSERT INTO {KODE_TABLE}_v5 ({cols}) SELECT {cols} FROM {KODE_TABLE}"))
+    conn.execute(text(f"DROP TABLE {KODE_TABLE}"))
+    conn.execute(text(f"ALTER TABLE {KODE_TABLE}_v5 RENAME TO {KODE_TABLE}"))
+
+
+# (versi, fungsi migrasi) — tambahkan di akhir, jangan ubah yang sudah ada
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+    (3, _migrate_v3),
+    (4, _migrate_v4),
+    (5, _migrate_v5),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def ensure_schema(engine=None) -> int:
+    """Buat/migrasikan skema sampai SCHEMA_VERSION. Aman dipanggil berulang. Return versi."""
+    engine = engine or get_engine()
+    key = id(engine)
+    if key in _SCHEMA_READY:
+        return SCHEMA_VERSION
+    with _SCHEMA_LOCK:
+        if key in _SCHEMA_READY:
+            return SCHEMA_VERSION
+        dialect = _dialect(engine)
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (version INT NOT NULL PRIMARY KEY)"))
+            current = conn.execute(text(f"SELECT MAX(version) FROM {VERSION_TABLE}")).scalar() or 0
+        for version, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            with engine.begin() as conn:
+                migrate(conn, dialect)
+                conn.execute(text(f"INSERT INTO {VERSION_TABLE} (version) VALUES (:v)"), {"v": version})
+        _SCHEMA_READY.add(key)
+    return SCHEMA_VERSION
+
+
+# ==========================
+# Upsert batch
+# ==========================
+def _upsert_sql(table: str, cols: list[str], key: list[str], updates: dict[str, str], dialect: str) -> str:
+    """
+    INSERT ... upsert sesuai dialek: MySQL/SingleStore vs SQLite.
+    `updates` memetakan kolom -> ekspresi; `{new}` diganti nilai baru, `{old}` nilai lama.
+    """
+    col_list = ", ".join(cols)
+    vals = ", ".join(f":{c}" for c in cols)
+    if dialect == "mysql":
+        sets = ",\n  ".join(
+            f"{c}=" + expr.format(new=f"VALUES({c})", old=c) for c, expr in updates.items()
+        )
+        return f"INSERT INTO {table}\n({col_list})\nVALUES\n({vals})\nON DUPLICATE KEY UPDATE\n  {sets}"
+    if not updates:
+        return f"INSERT INTO {table}\n({col_list})\nVALUES\n({vals})\nON CONFLICT({', '.join(key)}) DO NOTHING"
+    sets = ",\n  ".join(
+        f"{c}=" + expr.format(new=f"excluded.{c}", old=f"{table}.{c}") for c, expr in updates.items()
+    )
+    return f"INSERT INTO {table}\n({col_list})\nVALUES\n({vals})\nON CONFLICT({', '.join(key)}) DO UPDATE SET\n  {sets}"
+
+
+_ARTICLE_COLS = ["link_hash", "link", "judul", "summary", "content", "source", "pub_date", "cached_at"]
+_ARTICLE_UPDATES = {
+    "judul": "{new}",
+    "summary": "COALESCE(NULLIF({new}, ''), {old})",
+    "content": "COALESCE(NULLIF({new}, ''), {old})",   # jangan timpa isi yang sudah diekstrak
+    "source": "{new}",
+    "pub_date": "COALESCE({new}, {old})",
+    "cached_at": "{new}",
+}
+_KODE_COLS = ["kode", "link_hash", "sort_ts", "cached_at", "keywords"]
+_KODE_UPDATES = {"cached_at": "{new}", "keywords": "{new}"}
+
+
+def _batched(conn, sql: str, rows: list[dict], batch_size: int):
+    for i in range(0, len(rows), batch_size):
+        conn.execute(text(sql), rows[i:i + batch_size])
+
+
+def _write(conn, dialect: str, rows: list[dict], batch_size: int) -> int:
+    if not rows:
+        return 0
+    art = [{c: r[c] for c in _ARTICLE_COLS} for r in rows]
+    _batched(conn, _upsert_sql(ARTICLE_TABLE, _ARTICLE_COLS, ["link_hash"], _ARTICLE_UPDATES, dialect), art, batch_size)
+
+    # sort_ts hanya diperbarui kalau baris baru membawa pub_date; tanpa pub_date posisi lama dipertahankan
+    kode_rows = [{c: r[c] for c in _KODE_COLS} for r in rows]
+    with_pub = [k for k, r in zip(kode_rows, rows) if r["pub_date"] is not None]
+    no_pub = [k for k, r in zip(kode_rows, rows) if r["pub_date"] is None]
+    _batched(conn, _upsert_sql(KODE_TABLE, _KODE_COLS, ["kode", "link_hash"],
+                               dict(_KODE_UPDATES, sort_ts="{new}"), dialect), with_pub, batch_size)
+    _batched(conn, _upsert_sql(KODE_TABLE, _KODE_COLS, ["kode", "link_hash"],
+                               _KODE_UPDATES, dialect), no_pub, batch_size)
+    return len(rows)
+
+
+def exec_many(rows: list[dict], batch_size: int = BATCH_SIZE) -> int:
+    """
+    Upsert baris hasil `_rows` ke tabel artikel + relasi kode dalam batch
+    (executemany per batch, satu transaksi). Return jumlah baris yang dikirim.
+    """
+    if not rows:
+        return 0
+    engine = get_engine()
+    ensure_schema(engine)
+    with engine.begin() as conn:
+        return _write(conn, _dialect(engine), rows, batch_size)
+
+
+def fetch_df(q: str, **params) -> pd.DataFrame:
+    engine = get_engine()
+    ensure_schema(engine)
+    with engine.connect() as conn:
+        return pd.read_sql(text(q), conn, params=params)
 
 def _sha256(s:str)->str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
@@ -26,84 +345,154 @@ def _sha256(s:str)->str:
 def _norm_dt(s):
     if not s: return None
     try:
-        return dtparser.parse(s)
+        d = dtparser.parse(s)
     except Exception:
         return None
+    # simpan sebagai UTC naive supaya seragam di SQLite & SingleStore
+    if d.tzinfo is not None:
+        d = d.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return d
 
-def save_articles(kode:str, keyword_cari:str, items:list[dict]):
+def _rows(kode:str, keyword_cari:str, items:list[dict]) -> list[dict]:
     now = dt.datetime.utcnow()
     rows = []
+    seen = set()
     for it in items:
+        link = it.get("link","") or ""
+        if not link or link in seen:
+            continue  # satu batch tidak boleh berisi link_hash ganda
+        seen.add(link)
+        pub = _norm_dt(it.get("pubDate"))
         rows.append({
             "kode": kode,
-            "judul": it.get("judul","")[:10240],
-            "link": it.get("link",""),
-            "link_hash": _sha256(it.get("link","")),
-            "summary": it.get("summary",""),
-            "content": it.get("content",""),   # bisa kosong; isi setelah readability
-            "source": it.get("source",""),
-            "pub_date": _norm_dt(it.get("pubDate")),
+            "judul": (it.get("judul","") or "")[:10240],
+            "link": link,
+            "link_hash": _sha256(link),
+            "summary": it.get("summary","") or "",
+            "content": it.get("content","") or "",   # bisa kosong; isi setelah ekstraksi
+            "source": it.get("source","") or "",
+            "pub_date": pub,
+            "sort_ts": pub or now,
             "cached_at": now,
             "keywords": keyword_cari,
         })
-    return exec_many(UPSERT_SQL, rows)
+    return rows
+
+def save_articles(kode:str, keyword_cari:str, items:list[dict], batch_size:int=BATCH_SIZE):
+    return exec_many(_rows(kode, keyword_cari, items), batch_size=batch_size)
+
+def upsert_news(kode, news_list, keyword_cari:str="", batch_size:int=BATCH_SIZE):
+    """
+    Simpan atau update berita hasil scraping (bulk, per batch).
+    Artikel yang sama untuk beberapa kode disimpan sekali, relasinya per kode.
+    """
+    if not news_list:
+        return 0
+    return save_articles(kode, keyword_cari, news_list, batch_size=batch_size)
+
+_SELECT_BY_KODE = f"""
+    SELECT a.link_hash AS id, k.kode, a.judul, a.link, a.summary, a.content, a.source,
+           a.pub_date, k.cached_at, k.keywords, k.sort_ts
+    FROM {KODE_TABLE} k
+    JOIN {ARTICLE_TABLE} a ON a.link_hash = k.link_hash
+    WHERE k.kode = :kode
+    ORDER BY k.sort_ts DESC
+"""
 
 def load_cached(kode:str, max_age_hours:int=12):
-    q = """
-    SELECT id,kode,judul,link,summary,content,source,pub_date,cached_at,keywords
-    FROM sahamiawa
-    WHERE kode = :kode
-    ORDER BY COALESCE(pub_date, cached_at) DESC
     """
-    df = fetch_df(q, kode=kode)
+    Return (fresh, df): df semua artikel untuk kode (terbaru dulu), fresh=True kalau
+    cache kode tsb terakhir diperbarui <= max_age_hours lalu.
+    """
+    df = fetch_df(_SELECT_BY_KODE, kode=kode)
     if df.empty:
         return False, df
-    latest = df["cached_at"].max()
-    age = (dt.datetime.utcnow() - latest.replace(tzinfo=None)).total_seconds()/3600
+    latest = pd.to_datetime(df["cached_at"]).max()
+    age = (dt.datetime.utcnow() - latest.to_pydatetime().replace(tzinfo=None)).total_seconds()/3600
     return age <= max_age_hours, df
 
 def query_cached(kode:str, limit:int=30):
-    q = """
-    SELECT id, judul, link, source, pub_date, summary, content
-    FROM sahamiawa
-    WHERE kode=:kode
-    ORDER BY COALESCE(pub_date, cached_at) DESC
-    LIMIT :lim
-    """
-    return fetch_df(q, kode=kode, lim=limit)
+    return fetch_df(_SELECT_BY_KODE + "\n    LIMIT :lim", kode=kode, lim=int(limit))
+
+# ==========================
+# Pencarian full-text
+# ==========================
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(query: str) -> list[str]:
+    return _TERM_RE.findall((query or "").lower())
+
+
+def _snippet(txt: str, terms: list[str], width: int = 160) -> str:
+    """Potongan teks di sekitar kemunculan pertama salah satu term (untuk SingleStore)."""
+    txt = re.sub(r"\s+", " ", txt or "").strip()
+    low = txt.lower()
+    pos = min((p for p in (low.find(t) for t in terms) if p >= 0), default=0)
+    start = max(0, pos - width // 3)
+    out = txt[start:start + width]
+    for t in terms:
+        out = re.sub(rf"(?i)\b({re.escape(t)})", r"**\1**", out)
+    return ("… " if start else "") + out + (" …" if start + width < len(txt) else "")
 
-def upsert_news(kode, news_list):
+
+def search_articles(query: str, kodes=None, since=None, limit: int = 20) -> pd.DataFrame:
     """
-    Simpan atau update berita hasil scraping ke tabel sahamiwa.
+    Cari artikel di cache lewat index full-text, hasil diurutkan relevansi.
+    - kodes: batasi ke artikel yang terkait kode-kode ini (None = semua)
+    - since: datetime/str; hanya artikel dengan COALESCE(pub_date, cached_at) >= since
+    Return kolom: id, judul, link, source, pub_date, score, snippet, kode.
     """
-    if not news_list:
-        return
-
-    df = pd.DataFrame(news_list)
-    df["kode"] = kode
-    df["link_hash"] = df["link"].apply(lambda x: hashlib.sha256(x.encode()).hexdigest())
-    df["cached_at"] = pd.Timestamp.utcnow()
+    terms = _terms(query)
+    cols = ["id", "judul", "link", "source", "pub_date", "score", "snippet", "kode"]
+    if not terms:
+        return pd.DataFrame(columns=cols)
 
     engine = get_engine()
-    with engine.begin() as conn:
-        for _, row in df.iterrows():
-            stmt = insert(st.table("sahamiwa")).values(**row.to_dict())
-            stmt = stmt.on_duplicate_key_update(
-                summary=stmt.inserted.summary,
-                content=stmt.inserted.content,
-                pub_date=stmt.inserted.pub_date,
-                cached_at=stmt.inserted.cached_at,
-                keywords=stmt.inserted.keywords
-            )
-            conn.execute(stmt)
-
-def load_cached(kode, max_age_hours=24):
-    q = f"""
-    SELECT * FROM sahamiwa
-    WHERE kode = %s
-      AND cached_at >= NOW() - INTERVAL {max_age_hours} HOUR
-    ORDER BY pub_date DESC
-    """
-    with get_engine().begin() as conn:
-        df = pd.read_sql(q, conn, params=[kode])
-    return not df.empty, df
+    ensure_schema(engine)
+    dialect = _dialect(engine)
+    params: dict = {"lim": int(limit)}
+    where, binds = [], []
+
+    if dialect == "sqlite":
+        params["q"] = " ".join(f'"{t}"' for t in terms)   # AND antar term, aman dari sintaks FTS5
+        select = f"""
+            SELECT a.link_hash AS id, a.judul, a.link, a.source, a.pub_date,
+                   -bm25({FTS_TABLE}) AS score,
+                   snippet({FTS_TABLE}, -1, '**', '**', ' … ', 24) AS snippet
+            FROM {FTS_TABLE} JOIN {ARTICLE_TABLE} a ON a.id = {FTS_TABLE}.rowid
+        """
+        where.append(f"{FTS_TABLE} MATCH :q")
+    else:
+        params["q"] = " ".join(terms)
+        select = f"""
+            SELECT a.link_hash AS id, a.judul, a.link, a.source, a.pub_date,
+                   MATCH(a.judul, a.summary, a.content) AGAINST (:q) AS score,
+                   COALESCE(NULLIF(a.content, ''), a.summary) AS snippet
+            FROM {ARTICLE_TABLE} a
+        """
+        where.append("MATCH(a.judul, a.summary, a.content) AGAINST (:q)")
+
+    if kodes:
+        where.append(f"a.link_hash IN (SELECT link_hash FROM {KODE_TABLE} WHERE kode IN :kodes)")
+        params["kodes"] = list(kodes)
+        binds.append(bindparam("kodes", expanding=True))
+    if since is not None:
+        where.append("COALESCE(a.pub_date, a.cached_at) >= :since")
+        params["since"] = pd.Timestamp(since).to_pydatetime()
+
+    q = text(f"{select} WHERE {' AND '.join(where)} ORDER BY score DESC LIMIT :lim")
+    if binds:
+        q = q.bindparams(*binds)
+    with engine.connect() as conn:
+        df = pd.read_sql(q, conn, params=params)
+        if df.empty:
+            return pd.DataFrame(columns=cols)
+        kode_q = text(f"SELECT link_hash, kode FROM {KODE_TABLE} WHERE link_hash IN :ids").bindparams(
+            bindparam("ids", expanding=True))
+        rel = pd.read_sql(kode_q, conn, params={"ids": df["id"].tolist()})
+
+    if dialect != "sqlite":
+        df["snippet"] = df["snippet"].map(lambda t: _snippet(t, terms))
+    df["kode"] = df["id"].map(rel.groupby("link_hash")["kode"].agg(lambda s: ", ".join(sorted(s)))).fillna("")
+    return df[cols]
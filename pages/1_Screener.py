@@ -0,0 +1,72 @@
+import streamlit as st
+
+from data_analysis import investor_mapping, muat_cube_ksei, muat_peristiwa_ksei, daftar_tipe_efek
+from ksei_store import dataset_version
+from peristiwa import Ambang, peristiwa_bulan
+from screener import hitung_perubahan, peringkat, opsi_kategori
+
+st.title("🔎 Screener Akumulasi / Distribusi")
+
+tipe_tersedia = daftar_tipe_efek()
+if not tipe_tersedia:
+    st.warning("Tidak ada data saham ditemukan.")
+    st.stop()
+
+@st.cache_resource(show_spinner=False)
+def _muat_screener(version, types):
+    # kubus + semua Δ + indeks peristiwa dihitung sekali per versi dataset, lalu dipakai semua sesi
+    cube = muat_cube_ksei(types=list(types))
+    return cube, hitung_perubahan(cube), muat_peristiwa_ksei(cube)
+
+st.sidebar.header("Filter Screener")
+tipe_pilih = st.sidebar.multiselect(
+    "🏷️ Jenis Efek",
+    tipe_tersedia,
+    default=["EQUITY"] if "EQUITY" in tipe_tersedia else tipe_tersedia[:1],
+    key="scr_tipe",
+)
+if not tipe_pilih:
+    st.info("Pilih minimal satu jenis efek.")
+    st.stop()
+
+cube, perubahan, peristiwa = _muat_screener(dataset_version(), tuple(sorted(tipe_pilih)))
+if len(cube.months) < 2:
+    st.info("Butuh minimal dua bulan data untuk menghitung perubahan.")
+    st.stop()
+
+bulan = st.sidebar.selectbox("Bulan", list(cube.months[1:])[::-1], key="scr_bulan")
+jenis = st.sidebar.radio("Jenis Investor", ["Asing", "Lokal"], horizontal=True, key="scr_jenis")
+kategori_opsi = opsi_kategori()
+kategori = st.sidebar.selectbox(
+    "Kategori Investor", list(kategori_opsi), format_func=kategori_opsi.get, key="scr_kategori"
+)
+ukuran = st.sidebar.radio(
+    "Ukuran", ["saham", "persen"],
+    format_func={"saham": "Δ Lembar saham", "persen": "Δ % kepemilikan"}.get,
+    horizontal=True, key="scr_ukuran",
+)
+top_n = st.sidebar.slider("Top N", 5, 100, 20, key="scr_topn")
+
+akumulasi, distribusi = peringkat(cube, perubahan, bulan, jenis=jenis, kategori=kategori, ukuran=ukuran, top_n=top_n)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader(f"⬆️ Akumulasi {jenis} – {bulan}")
+    st.dataframe(akumulasi, use_container_width=True, hide_index=True)
+with col2:
+    st.subheader(f"⬇️ Distribusi {jenis} – {bulan}")
+    st.dataframe(distribusi, use_container_width=True, hide_index=True)
+
+ambang = Ambang()
+st.subheader(f"⚡ Peristiwa Signifikan {jenis} – {bulan}")
+st.caption(
+    f"|Δ| ≥ {ambang.lembar:,} lembar, atau ≥ {ambang.relatif:.0%} dari posisi bulan sebelumnya "
+    f"(minimal {ambang.debu:,} lembar). Z-skor terhadap riwayat Δ seri itu sendiri "
+    f"(≥ {ambang.riwayat} bulan), diurutkan |z| terbesar; |z| dipotong di {ambang.z_maks:g}. "
+    f"'Z Lantai' = seri hampir diam, penyebut z memakai lantai (≥ {ambang.relatif:.0%} posisi / "
+    f"{ambang.debu:,} lembar), bukan std riwayat."
+)
+st.dataframe(
+    peristiwa_bulan(cube, peristiwa, bulan, investor_mapping, jenis=jenis, kategori=kategori),
+    use_container_width=True, hide_index=True,
+)
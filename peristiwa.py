@@ -0,0 +1,203 @@
+# peristiwa.py
+"""
+Indeks peristiwa perubahan kepemilikan lintas pasar.
+
+Satu baris per (kode, bulan, Lokal/Asing, kategori) yang Δ saham-nya melewati
+ambang absolut atau relatif, lengkap dengan Δ share-of-total dan z-skor
+terhadap riwayat seri itu sendiri. Dibangun sekali per versi kubus lalu
+disimpan di store; baris terurut (kode, bulan, jenis, kategori) plus
+permutasi terurut (bulan, jenis, kode, kategori), keduanya dengan offset,
+sehingga "semua peristiwa BBCA" atau "semua peristiwa Asing 2025-10"
+cukup slicing.
+
+Z-skor memakai riwayat *sebelum* bulan tsb (Welford per seri), jadi nilai
+lama tidak berubah saat bulan baru masuk dan tidak ada look-ahead. Penyebutnya
+diberi lantai dan |z| dipotong di `Ambang.z_maks`, supaya seri yang lama diam
+tidak memenuhi puncak urutan dengan z jutaan.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from ksei_cube import JENIS, KATEGORI_KODE, OwnershipCube
+from screener import Perubahan
+
+PERISTIWA_NAME = "peristiwa.npz"
+
+
+@dataclass(frozen=True)
+class Ambang:
+    lembar: int = int(os.getenv("PERISTIWA_MIN_LEMBAR_ABS", 50_000_000))   # |Δ| >= ini selalu dicatat
+    relatif: float = float(os.getenv("PERISTIWA_MIN_RELATIF", 0.10))       # atau |Δ| / posisi sebelumnya >= ini
+    debu: int = int(os.getenv("PERISTIWA_MIN_LEMBAR", 100_000))            # ...asal |Δ| >= ini (buang recehan)
+    riwayat: int = 6                                                        # bulan sebelumnya minimal untuk z-skor
+    z_maks: float = 50.0                                                    # |z| dipotong di sini
+
+    def kunci(self) -> str:
+        return f"{self.lembar}_{self.relatif:g}_{self.debu}_{self.riwayat}_{self.z_maks:g}"
+
+
+@dataclass(frozen=True)
+class Peristiwa:
+    code: np.ndarray          # (N,) int32 indeks kode di kubus     } baris terurut
+    month: np.ndarray         # (N,) int16 indeks bulan              } (kode, bulan,
+    side: np.ndarray          # (N,) int8 0=Lokal, 1=Asing           }  jenis, kategori)
+    kategori: np.ndarray      # (N,) int8 indeks KATEGORI_KODE
+    delta: np.ndarray         # (N,) int64 Δ saham
+    relatif: np.ndarray       # (N,) float32 Δ / posisi bulan sebelumnya (inf = posisi baru)
+    share: np.ndarray         # (N,) float32 % dari total kode (Lokal+Asing) bulan ini
+    delta_share: np.ndarray   # (N,) float32 Δ share dalam poin persen
+    z: np.ndarray             # (N,) float32 z-skor Δ vs riwayat seri (NaN = riwayat kurang)
+    z_lantai: np.ndarray      # (N,) bool penyebut z = lantai (seri hampir diam), bukan std riwayat
+    off_kode: np.ndarray      # (C+1,) offset baris per kode
+    urut_bulan: np.ndarray    # (N,) permutasi terurut (bulan, jenis, kode, kategori)
+    off_bulan: np.ndarray     # (M*2+1,) offset di urut_bulan per (bulan, jenis)
+    version: str = ""
+
+
+def _z_skor(delta: np.ndarray, prev: np.ndarray, valid: np.ndarray, ambang: Ambang) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Z-skor Δ tiap bulan terhadap Δ bulan-bulan valid sebelumnya di seri yang sama.
+    Penyebut diberi lantai max(std, ambang.relatif × posisi sebelumnya, ambang.debu)
+    supaya seri yang nyaris diam tidak menghasilkan z jutaan; return (z, lantai)
+    dengan `lantai` True kalau penyebutnya lantai, bukan std riwayat.
+    """
+    C, M = valid.shape
+    n = np.zeros((C, 1, 1))
+    mean = np.zeros(delta.shape[:1] + delta.shape[2:])
+    m2 = np.zeros_like(mean)
+    z = np.full(delta.shape, np.nan, dtype=np.float32)
+    lantai = np.zeros(delta.shape, dtype=bool)
+    for m in range(M):
+        x = delta[:, m].astype(np.float64)
+        v = valid[:, m][:, None, None]
+        siap = v & (n >= ambang.riwayat)
+        std = np.sqrt(m2 / np.maximum(n - 1, 1))
+        bawah = np.maximum(ambang.relatif * prev[:, m], ambang.debu)
+        z[:, m] = np.where(siap, (x - mean) / np.maximum(std, bawah), np.nan)
+        lantai[:, m] = siap & (bawah > std)
+        # update Welford hanya untuk bulan valid
+        n1 = n + v
+        d = np.where(v, x - mean, 0.0)
+        mean = mean + np.where(v, d / np.maximum(n1, 1), 0.0)
+        m2 = m2 + np.where(v, d * (x - mean), 0.0)
+        n = n1
+    return np.clip(z, -ambang.z_maks, ambang.z_maks), lantai
+
+
+def hitung_peristiwa(cube: OwnershipCube, perubahan: Perubahan, ambang: Ambang = Ambang()) -> Peristiwa:
+    delta = perubahan.delta
+    prev = np.zeros_like(cube.shares)
+    prev[:, 1:] = cube.shares[:, :-1]
+    besar = np.abs(delta)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relatif = np.where(prev > 0, delta / prev, np.copysign(np.inf, delta))
+    valid = perubahan.valid[:, :, None, None]
+    mask = valid & (delta != 0) & (
+        (besar >= ambang.lembar) | ((np.abs(relatif) >= ambang.relatif) & (besar >= ambang.debu))
+    )
+    z, lantai = _z_skor(delta, prev, perubahan.valid, ambang)
+
+    ci, mi, si, ki = np.nonzero(mask)          # urutan C: (kode, bulan, jenis, kategori)
+    C, M = perubahan.valid.shape
+    urut_bulan = np.lexsort((ki, ci, si, mi))
+    kunci_bulan = mi[urut_bulan].astype(np.int64) * 2 + si[urut_bulan]
+    return Peristiwa(
+        code=ci.astype(np.int32),
+        month=mi.astype(np.int16),
+        side=si.astype(np.int8),
+        kategori=ki.astype(np.int8),
+        delta=delta[mask],
+        relatif=relatif[mask].astype(np.float32),
+        share=perubahan.share[mask].astype(np.float32),
+        delta_share=perubahan.delta_share[mask].astype(np.float32),
+        z=z[mask],
+        z_lantai=lantai[mask],
+        off_kode=np.searchsorted(ci, np.arange(C + 1)).astype(np.int64),
+        urut_bulan=urut_bulan.astype(np.int64),
+        off_bulan=np.searchsorted(kunci_bulan, np.arange(M * 2 + 1)).astype(np.int64),
+        version=f"{cube.version}-{ambang.kunci()}",
+    )
+
+
+def frame_peristiwa(cube: OwnershipCube, ev: Peristiwa, rows: np.ndarray, investor_mapping: dict) -> pd.DataFrame:
+    labels = np.array([investor_mapping[k] for k in KATEGORI_KODE], dtype=object)
+    return pd.DataFrame({
+        "Kode": cube.codes[ev.code[rows]],
+        "Bulan": cube.months[ev.month[rows]],
+        "Jenis": np.array(JENIS, dtype=object)[ev.side[rows]],
+        "Kategori Lengkap": labels[ev.kategori[rows]],
+        "Δ Saham": ev.delta[rows],
+        "Δ Relatif (%)": ev.relatif[rows] * 100,
+        "Share (%)": ev.share[rows],
+        "Δ Share (pp)": ev.delta_share[rows],
+        "Z-Skor": ev.z[rows],
+        "Z Lantai": ev.z_lantai[rows],
+    })
+
+
+def peristiwa_kode(cube: OwnershipCube, ev: Peristiwa, code: str, investor_mapping: dict) -> pd.DataFrame:
+    """Semua peristiwa satu kode, terurut bulan."""
+    i = cube.idx(code)
+    return frame_peristiwa(cube, ev, np.arange(ev.off_kode[i], ev.off_kode[i + 1]), investor_mapping)
+
+
+def peristiwa_bulan(
+    cube: OwnershipCube,
+    ev: Peristiwa,
+    bulan: str,
+    investor_mapping: dict,
+    jenis: str | None = None,
+    kategori: str | None = None,
+) -> pd.DataFrame:
+    """
+    Peristiwa satu bulan ('YYYY-MM'), opsional satu jenis dan/atau kategori
+    (kode investor_mapping), terurut |z-skor| terbesar (riwayat kurang di akhir);
+    z yang sama (mis. sama-sama terpotong di z_maks) diurutkan |Δ share| terbesar.
+    """
+    m = int(np.searchsorted(cube.months, bulan))
+    if m >= len(cube.months) or cube.months[m] != bulan:
+        raise KeyError(f"bulan {bulan} tidak ada di data")
+    sisi = range(len(JENIS)) if jenis is None else [JENIS.index(jenis)]
+    rows = np.concatenate([
+        ev.urut_bulan[ev.off_bulan[m * 2 + s]:ev.off_bulan[m * 2 + s + 1]] for s in sisi
+    ])
+    if kategori is not None:
+        rows = rows[ev.kategori[rows] == KATEGORI_KODE.index(kategori)]
+    skor = np.abs(ev.z[rows])
+    rows = rows[np.lexsort((-np.abs(ev.delta_share[rows]), np.where(np.isnan(skor), 1.0, -skor)))]
+    return frame_peristiwa(cube, ev, rows, investor_mapping)
+
+
+def save_peristiwa(ev: Peristiwa, path: str) -> None:
+    # unik per thread: sesi Streamlit berbagi satu proses
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}.npz"
+    np.savez(tmp, **{k: v for k, v in vars(ev).items() if k != "version"}, version=np.array(ev.version))
+    os.replace(tmp, path)
+
+
+def load_peristiwa(path: str) -> Peristiwa | None:
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        if set(z.files) != {f.name for f in fields(Peristiwa)}:
+            return None   # format lama: bangun ulang
+        return Peristiwa(**{k: z[k] for k in z.files if k != "version"}, version=str(z["version"]))
+
+
+__all__ = [
+    "PERISTIWA_NAME",
+    "Ambang",
+    "Peristiwa",
+    "hitung_peristiwa",
+    "frame_peristiwa",
+    "peristiwa_kode",
+    "peristiwa_bulan",
+    "save_peristiwa",
+    "load_peristiwa",
+]
@@ -0,0 +1,183 @@
+# profiling.py
+"""
+Instrumentasi ringan per rerun: `span("nama")` mencatat durasi tiap tahap.
+
+- Span rerun berjalan disimpan per thread (tiap sesi Streamlit punya thread
+  skripnya sendiri), histogram per tahap dibagi semua sesi di proses ini
+  untuk p50/p95.
+- Opsional: cProfile untuk satu rerun (`mulai_rerun(profil=True)`).
+- Ekspor: JSON lines per rerun (env PROFILE_JSONL=path) dan teks gaya
+  Prometheus (env PROFILE_PROM=path, format textfile collector).
+
+Modul ini tidak bergantung pada Streamlit, jadi aman dipakai di modul data.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+HIST_MAX = 2000           # sampel terakhir per tahap yang disimpan untuk kuantil
+PROFILE_JSONL = os.getenv("PROFILE_JSONL")
+PROFILE_PROM = os.getenv("PROFILE_PROM")
+PROFILE_TOP = 40         # baris pstats yang ditampilkan
+
+_LOCAL = threading.local()
+_HIST: Dict[str, deque] = {}
+_TOTAL: Dict[str, Tuple[int, float]] = {}   # tahap -> (count, sum) sejak proses mulai
+_LOCK = threading.Lock()
+
+
+def _spans() -> List[dict] | None:
+    return getattr(_LOCAL, "spans", None)
+
+
+def mulai_rerun(profil: bool = False) -> None:
+    """Mulai rerun baru di thread ini (span rerun sebelumnya dibuang); `profil` = cProfile rerun ini."""
+    _LOCAL.spans = []
+    _LOCAL.t0 = time.perf_counter()
+    _LOCAL.depth = 0
+    _LOCAL.prof = None
+    if profil:
+        _LOCAL.prof = cProfile.Profile()
+        _LOCAL.prof.enable()
+
+
+def _teks_profil(prof: cProfile.Profile, top: int = PROFILE_TOP) -> str:
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+    return buf.getvalue()
+
+
+def _catat(nama: str, detik: float) -> None:
+    with _LOCK:
+        hist = _HIST.get(nama)
+        if hist is None:
+            hist = _HIST[nama] = deque(maxlen=HIST_MAX)
+        hist.append(detik)
+        n, s = _TOTAL.get(nama, (0, 0.0))
+        _TOTAL[nama] = (n + 1, s + detik)
+
+
+@contextmanager
+def span(nama: str) -> Iterator[None]:
+    """Ukur satu tahap. Span bersarang dicatat dengan `depth` supaya panel bisa meng-indent."""
+    spans = _spans()
+    depth = getattr(_LOCAL, "depth", 0)
+    _LOCAL.depth = depth + 1
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        _LOCAL.depth = depth
+        _catat(nama, dt)
+        if spans is not None:
+            spans.append({"nama": nama, "s": dt, "depth": depth,
+                          "mulai": t0 - getattr(_LOCAL, "t0", t0)})
+
+
+def selesai_rerun(session: str | None = None) -> dict:
+    """
+    Tutup rerun di thread ini; tulis ke PROFILE_JSONL / PROFILE_PROM kalau diset.
+    Kalau rerun diprofil, teks pstats (top cumulative) ada di rekaman["profil"].
+    """
+    prof = getattr(_LOCAL, "prof", None)
+    if prof is not None:
+        prof.disable()
+        _LOCAL.prof = None
+    spans = _spans() or []
+    total = time.perf_counter() - getattr(_LOCAL, "t0", time.perf_counter())
+    _catat("rerun", total)
+    rekaman = {
+        "ts": time.time(),
+        "session": session,
+        "total_s": total,
+        "spans": sorted(spans, key=lambda s: s["mulai"]),
+    }
+    _LOCAL.spans = None
+    if PROFILE_JSONL:
+        tulis_jsonl(rekaman, PROFILE_JSONL)
+    if prof is not None:
+        rekaman["profil"] = _teks_profil(prof)
+    if PROFILE_PROM:
+        _tulis_atomik(PROFILE_PROM, prometheus_text())
+    return rekaman
+
+
+def _kuantil(urut: List[float], q: float) -> float:
+    return urut[min(len(urut) - 1, int(q * len(urut)))]
+
+
+def statistik() -> Dict[str, dict]:
+    """Per tahap: count (sejak start), p50/p95/max atas HIST_MAX sampel terakhir (detik)."""
+    with _LOCK:
+        snap = {k: sorted(v) for k, v in _HIST.items()}
+        total = dict(_TOTAL)
+    return {
+        k: {"count": total[k][0], "sum_s": total[k][1], "p50_s": _kuantil(v, 0.5),
+            "p95_s": _kuantil(v, 0.95), "max_s": v[-1]}
+        for k, v in sorted(snap.items()) if v
+    }
+
+
+def jsonl(rekaman: dict) -> str:
+    return json.dumps(rekaman, ensure_ascii=False)
+
+
+def tulis_jsonl(rekaman: dict, path: str) -> None:
+    try:
+        with _LOCK, open(path, "a", encoding="utf-8") as fh:
+            fh.write(jsonl(rekaman) + "\n")
+    except OSError as e:
+        print(f"⚠️ Gagal tulis profil {path}: {e}")
+
+
+def prometheus_text(prefix: str = "ksei_stage_seconds") -> str:
+    """Summary per tahap (kuantil 0.5/0.95, _sum, _count) dalam format eksposisi Prometheus."""
+    lines = [
+        f"# HELP {prefix} Durasi tahap per rerun Streamlit.",
+        f"# TYPE {prefix} summary",
+    ]
+    for nama, st in statistik().items():
+        label = nama.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'{prefix}{{stage="{label}",quantile="0.5"}} {st["p50_s"]:.6f}')
+        lines.append(f'{prefix}{{stage="{label}",quantile="0.95"}} {st["p95_s"]:.6f}')
+        lines.append(f'{prefix}_sum{{stage="{label}"}} {st["sum_s"]:.6f}')
+        lines.append(f'{prefix}_count{{stage="{label}"}} {st["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def _tulis_atomik(path: str, teks: str) -> None:
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(teks)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️ Gagal tulis metrik {path}: {e}")
+
+
+def reset() -> None:
+    with _LOCK:
+        _HIST.clear()
+        _TOTAL.clear()
+
+
+__all__ = [
+    "span",
+    "mulai_rerun",
+    "selesai_rerun",
+    "statistik",
+    "jsonl",
+    "tulis_jsonl",
+    "prometheus_text",
+    "reset",
+]
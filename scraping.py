@@ -1,15 +1,16 @@
 # scraping.py
-import re
-import html
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Tuple
+from urllib.parse import quote_plus, urlsplit
+
 import requests
-from urllib.parse import quote_plus
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 
-# Coba import Document dari readability-lxml (opsional)
-try:
-    from readability import Document
-except Exception:
-    Document = None
+import http_cache
+from ekstrak_html import MAX_BYTES, HasilEkstraksi, ekstrak_di_pool
 
 UA = {
     "User-Agent": (
@@ -24,11 +25,12 @@ def ambil_berita_google(keyword: str, limit: int = 10):
     """Ambil berita dari Google News RSS (fallback cepat)."""
     url = f"https://news.google.com/rss/search?q={quote_plus(keyword)}"
     try:
-        r = requests.get(url, headers=UA, timeout=TIMEOUT)
-        r.raise_for_status()
+        resp = _get_cached(url)
     except Exception:
         return []
-    soup = BeautifulSoup(r.content, features="xml")
+    if resp is None:
+        return []
+    soup = BeautifulSoup(resp.content, features="xml")
     items = soup.find_all("item")
     out = []
     for it in items[:limit]:
@@ -41,47 +43,178 @@ def ambil_berita_google(keyword: str, limit: int = 10):
         })
     return out
 
-def _strip_html(s: str) -> str:
-    s = re.sub(r"<[^>]+>", " ", s or "")
-    s = re.sub(r"\s+", " ", s).strip()
-    return html.unescape(s)
-
-def _fallback_text_from_html(html_text: str) -> str | None:
-    """Kalau readability nggak ada/mentok, ambil <article>, <p> dkk."""
-    soup = BeautifulSoup(html_text, "html.parser")
-    # prioritas node artikel
-    for sel in ["article", ".article", ".post", ".read__content", ".detail__body", ".content"]:
-        node = soup.select_one(sel)
-        if node:
-            txt = _strip_html(str(node))
-            if len(txt) > 120:
-                return txt
-    # fallback: gabung <p>
-    ps = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-    txt = " ".join(ps).strip()
-    return txt if len(txt) > 120 else None
+# ==========================
+# Session ber-pool + cache isi artikel
+# ==========================
+PER_HOST = 4            # koneksi paralel maksimum per host
+BATCH_DEADLINE = 15.0   # batas total (detik) untuk satu batch prefetch
+CONTENT_CACHE_MAX = 512
 
-def ambil_isi_berita(url: str) -> str | None:
-    """Ambil isi utama artikel. Kembalikan None bila gagal (biar UI pake ringkasan)."""
-    if not url:
+_SESSION = requests.Session()
+_SESSION.headers.update(UA)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=PER_HOST))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=PER_HOST))
+
+_FETCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="artikel")
+_HOST_SEM: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_LOCK = threading.Lock()
+
+_CONTENT_CACHE: "OrderedDict[str, str | None]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+# unduhan yang masih jalan (mis. lewat deadline rerun sebelumnya): url -> Future
+_IN_FLIGHT: Dict[str, Future] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc.lower()
+    with _HOST_LOCK:
+        sem = _HOST_SEM.get(host)
+        if sem is None:
+            sem = _HOST_SEM[host] = threading.BoundedSemaphore(PER_HOST)
+        return sem
+
+
+def isi_dari_cache(url: str) -> Tuple[bool, str | None]:
+    """(ada_di_cache, isi). Isi None berarti sudah dicoba tapi gagal diekstrak."""
+    with _CACHE_LOCK:
+        if url in _CONTENT_CACHE:
+            _CONTENT_CACHE.move_to_end(url)
+            return True, _CONTENT_CACHE[url]
+    return False, None
+
+
+def _simpan_cache(url: str, txt: str | None) -> None:
+    with _CACHE_LOCK:
+        _CONTENT_CACHE[url] = txt
+        _CONTENT_CACHE.move_to_end(url)
+        while len(_CONTENT_CACHE) > CONTENT_CACHE_MAX:
+            _CONTENT_CACHE.popitem(last=False)
+
+
+def _get_cached(url: str, max_bytes: int = MAX_BYTES) -> http_cache.Entri | None:
+    """
+    GET lewat cache disk bersama (http_cache). Entri segar dilayani dari disk tanpa
+    request; entri basi direvalidasi (If-None-Match / If-Modified-Since) dan tetap
+    dipakai kalau jaringan gagal. Body dibaca stream, maksimal `max_bytes`.
+    None kalau server menjawab non-2xx.
+    """
+    lama = http_cache.baca(url)
+    if lama is not None and lama.segar:
+        return lama
+
+    headers = {}
+    if lama is not None:
+        if lama.etag:
+            headers["If-None-Match"] = lama.etag
+        if lama.last_modified:
+            headers["If-Modified-Since"] = lama.last_modified
+    try:
+        with _host_semaphore(url):
+            with _SESSION.get(url, timeout=TIMEOUT, stream=True, headers=headers) as r:
+                if r.status_code == 304 and lama is not None:
+                    return http_cache.segarkan(lama)
+                if not r.ok:
+                    return None
+                buf = bytearray()
+                for chunk in r.iter_content(64 * 1024):
+                    buf += chunk
+                    if len(buf) >= max_bytes:
+                        break
+                rh = r.headers
+    except requests.RequestException:
+        if lama is not None:
+            return lama   # basi lebih baik daripada kosong
+        raise
+    return http_cache.simpan(
+        url, bytes(buf[:max_bytes]),
+        content_type=rh.get("Content-Type") or "",
+        etag=rh.get("ETag"),
+        last_modified=rh.get("Last-Modified"),
+    )
+
+
+def _unduh_html(url: str) -> bytes | None:
+    """HTML halaman (lewat cache disk), None kalau gagal / bukan HTML."""
+    resp = _get_cached(url)
+    if resp is None or "text/html" not in resp.content_type:
         return None
+    return resp.content
+
+
+def ekstrak_url(url: str) -> HasilEkstraksi | None:
+    """Unduh + ekstraksi terstruktur (teks, judul, waktu terbit, strategi). None kalau bukan HTML."""
+    data = _unduh_html(url)
+    if data is None:
+        return None
+    # parsing lxml jalan di process pool, thread ini cuma menunggu (GIL bebas)
+    return ekstrak_di_pool(data, url)
+
+
+def _unduh_isi(url: str) -> str | None:
+    hasil = ekstrak_url(url)
+    return hasil.text if hasil else None
+
+
+def _ambil_dan_cache(url: str) -> str | None:
     try:
-        r = requests.get(url, headers=UA, timeout=TIMEOUT)
-        if not r.ok or "text/html" not in (r.headers.get("Content-Type") or ""):
-            return None
-
-        # 1) readability kalau tersedia
-        if Document is not None:
-            try:
-                doc = Document(r.text)
-                summary_html = doc.summary()
-                txt = _strip_html(summary_html)
-                if len(txt) > 120:
-                    return txt
-            except Exception:
-                pass
-
-        # 2) fallback manual
-        return _fallback_text_from_html(r.text)
+        txt = _unduh_isi(url)
     except Exception:
+        return None  # error jaringan tidak di-cache, biar dicoba lagi nanti
+    _simpan_cache(url, txt)
+    return txt
+
+
+def ambil_isi_berita(url: str) -> str | None:
+    """Ambil isi utama artikel. Kembalikan None bila gagal (biar UI pake ringkasan)."""
+    if not url:
         return None
+    hit, txt = isi_dari_cache(url)
+    if hit:
+        return txt
+    return _ambil_dan_cache(url)
+
+
+def _ambil_bersama(url: str) -> Future:
+    """Future unduhan `url`; kalau sudah ada yang jalan, pakai itu (tidak request dua kali)."""
+    with _IN_FLIGHT_LOCK:
+        fut = _IN_FLIGHT.get(url)
+        if fut is not None:
+            return fut
+        fut = _FETCH_POOL.submit(_ambil_dan_cache, url)
+        _IN_FLIGHT[url] = fut
+    # di luar lock: callback langsung jalan di thread ini kalau future sudah selesai
+    fut.add_done_callback(lambda f, u=url: _selesai(u, f))
+    return fut
+
+
+def _selesai(url: str, fut: Future) -> None:
+    with _IN_FLIGHT_LOCK:
+        if _IN_FLIGHT.get(url) is fut:
+            del _IN_FLIGHT[url]
+
+
+def ambil_isi_berita_batch(
+    urls: Iterable[str],
+    deadline: float = BATCH_DEADLINE,
+) -> Dict[str, str | None]:
+    """
+    Prefetch banyak artikel paralel lewat session ber-pool (keep-alive, maks
+    PER_HOST koneksi per host). Return url -> isi untuk yang selesai sebelum
+    `deadline`; sisanya tetap jalan di background dan mengisi cache untuk rerun berikutnya.
+    URL yang unduhannya masih jalan dari panggilan sebelumnya menunggu Future yang sama.
+    """
+    out: Dict[str, str | None] = {}
+    futures = {}
+    for url in dict.fromkeys(u for u in urls if u):
+        hit, txt = isi_dari_cache(url)
+        if hit:
+            out[url] = txt
+        else:
+            futures[_ambil_bersama(url)] = url
+    if futures:
+        done, _ = wait(futures, timeout=deadline)
+        for fut in done:
+            out[futures[fut]] = fut.result()
+    return out
@@ -0,0 +1,131 @@
+# screener.py
+"""
+Screener lintas kode: perubahan kepemilikan Lokal/Asing per kategori untuk
+semua kode dan semua bulan sekaligus (vektor NumPy di atas kubus, tanpa loop
+per kode), lalu peringkat akumulasi/distribusi untuk satu bulan.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_analysis import investor_mapping, local_cols, foreign_cols
+from ksei_cube import JENIS, KATEGORI_KODE, OwnershipCube
+
+UKURAN = ("saham", "persen")
+
+
+@dataclass(frozen=True)
+class Perubahan:
+    delta: np.ndarray        # (C, M, 2, 9) Δ saham vs bulan sebelumnya
+    share: np.ndarray        # (C, M, 2, 9) % dari total (Lokal+Asing) kode tsb
+    delta_share: np.ndarray  # (C, M, 2, 9) Δ share dalam poin persen
+    valid: np.ndarray        # (C, M) bulan ini & bulan sebelumnya sama-sama ada
+
+
+def _kolom(jenis: str, kategori: str) -> str:
+    """Nama kolom asli (mis. 'Foreign MF') sesuai local_cols/foreign_cols."""
+    cols = local_cols if jenis == JENIS[0] else foreign_cols
+    return next(c for c in cols if c.endswith(f" {kategori}"))
+
+
+def hitung_perubahan(cube: OwnershipCube) -> Perubahan:
+    """Δ saham dan Δ share-of-total untuk seluruh kode × bulan dalam satu pass."""
+    shares = cube.shares.astype(np.float64)
+    total = shares.sum(axis=(2, 3), keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(total > 0, shares / total * 100, 0.0)
+
+    delta = np.zeros_like(cube.shares)
+    delta[:, 1:] = cube.shares[:, 1:] - cube.shares[:, :-1]
+    delta_share = np.zeros_like(share)
+    delta_share[:, 1:] = share[:, 1:] - share[:, :-1]
+
+    valid = np.zeros_like(cube.present)
+    valid[:, 1:] = cube.present[:, 1:] & cube.present[:, :-1]
+    delta[~valid] = 0
+    delta_share[~valid] = 0.0
+    return Perubahan(delta=delta, share=share, delta_share=delta_share, valid=valid)
+
+
+def peringkat(
+    cube: OwnershipCube,
+    perubahan: Perubahan,
+    bulan: str,
+    jenis: str = "Asing",
+    kategori: str | None = None,
+    ukuran: str = "saham",
+    top_n: int = 20,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Top-N akumulator & distributor untuk `bulan` ('YYYY-MM').
+    - jenis: 'Lokal' / 'Asing'
+    - kategori: kode investor_mapping ('MF', 'IS', ...) atau None = total jenis tsb
+    - ukuran: 'saham' (Δ lembar) atau 'persen' (Δ poin persen share-of-total)
+    """
+    if ukuran not in UKURAN:
+        raise ValueError(f"ukuran harus salah satu dari {UKURAN}")
+    m = int(np.searchsorted(cube.months, bulan))
+    if m >= len(cube.months) or cube.months[m] != bulan:
+        raise KeyError(f"bulan {bulan} tidak ada di data")
+    s = JENIS.index(jenis)
+
+    src = perubahan.delta if ukuran == "saham" else perubahan.delta_share
+    if kategori is None:
+        score = src[:, m, s].sum(axis=-1)
+        pos = perubahan.share[:, m, s].sum(axis=-1)
+        label_kolom = f"Total {jenis}"
+    else:
+        k = KATEGORI_KODE.index(kategori)
+        score = src[:, m, s, k]
+        pos = perubahan.share[:, m, s, k]
+        label_kolom = _kolom(jenis, kategori)
+    score = score.astype(np.float64)
+
+    idx = np.flatnonzero(perubahan.valid[:, m])
+    n = min(top_n, len(idx))
+    if n == 0:
+        empty = _frame(cube, perubahan, np.array([], dtype=int), m, s, score, pos, label_kolom, ukuran)
+        return empty, empty.copy()
+
+    sc = score[idx]
+    top = idx[np.argpartition(-sc, n - 1)[:n]]
+    top = top[np.argsort(-score[top], kind="stable")]
+    bot = idx[np.argpartition(sc, n - 1)[:n]]
+    bot = bot[np.argsort(score[bot], kind="stable")]
+    return (
+        _frame(cube, perubahan, top, m, s, score, pos, label_kolom, ukuran),
+        _frame(cube, perubahan, bot, m, s, score, pos, label_kolom, ukuran),
+    )
+
+
+def _frame(cube, perubahan, rows, m, s, score, pos, label_kolom, ukuran) -> pd.DataFrame:
+    total_saham = cube.shares[rows, m].sum(axis=(1, 2))
+    if ukuran == "saham":
+        delta_label, nilai = "Δ Saham", score[rows].astype(np.int64)
+    else:
+        delta_label, nilai = "Δ Persen (pp)", score[rows]
+    return pd.DataFrame({
+        "Kode": cube.codes[rows],
+        "Kolom": label_kolom,
+        delta_label: nilai,
+        "Persentase": pos[rows],
+        f"Δ Saham {JENIS[s]}": perubahan.delta[rows, m, s].sum(axis=-1),
+        "Total Saham": total_saham,
+    })
+
+
+def opsi_kategori() -> dict:
+    """Label untuk selectbox: None -> total, kode -> nama lengkap investor_mapping."""
+    return {None: "Semua Kategori", **{k: investor_mapping[k] for k in KATEGORI_KODE}}
+
+
+__all__ = [
+    "Perubahan",
+    "hitung_perubahan",
+    "peringkat",
+    "opsi_kategori",
+]
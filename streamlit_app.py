@@ -1,125 +1,256 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import streamlit as st
-from scraping import ambil_isi_berita, ambil_berita_google
-from berita_analysis import load_alias, ambil_berita_dengan_alias, get_source_labels # type: ignore
-from news_cache import load_cached, upsert_news # type: ignore
+# berita_analysis ringan saat diimpor; scraping/news_cache (requests, bs4, lxml, sqlalchemy)
+# diimpor di dalam bagian berita
+from berita_analysis import load_alias, ambil_berita_dengan_alias, get_source_labels, FEED_OK_STATUS, FEED_TTL # type: ignore
+import profiling
+from profiling import span
 
 
-from data_analysis import proses_data_ksei
-from scraping import ambil_isi_berita
+from data_analysis import investor_mapping, muat_cube_ksei, muat_valuasi_ksei, muat_peristiwa_ksei, daftar_tipe_efek
+from peristiwa import peristiwa_kode
+from valuasi import SATUAN, pilih_satuan
+from ekspor_excel import XLSX_MIME, baca_bytes, ekspor_kode, ekspor_multi, frame_pivot
+from ksei_store import dataset_version, load_errors
+from ksei_cube import frame_trend
 from visualization import (
     plot_line_trend_summary, # type: ignore
     tampilkan_pie_terakhir, # type: ignore
     plot_bar_per_kategori_terakhir, # type: ignore
     plot_line_per_kategori, # type: ignore
     tampilkan_tabel_trend_kategori, # type: ignore # type: ignore # type: ignore # type: ignore # type: ignore # type: ignore # type: ignore
-    tampilkan_pivot_excel
+    tampilkan_pivot_excel,
+    tampilkan_arus_nilai,
+    plot_tren_filter,
 )
 
+# waktu per tahap rerun ini (panel debug tersembunyi: ?debug=1)
+profiling.mulai_rerun(profil=st.session_state.pop("_profil_rerun", False))
+
 # === Load & proses data ===
-df, investor_mapping, local_cols, foreign_cols = proses_data_ksei()
-if df is None:
+with span("ksei.daftar_tipe"):
+    tipe_tersedia = daftar_tipe_efek()
+if not tipe_tersedia:
     st.warning("Tidak ada data saham ditemukan.")
     st.stop()
 
-# Pastikan kolom Bulan jadi datetime
-df["Bulan"] = pd.to_datetime(df["Bulan"], errors="coerce")
-
-# === FILTER di SIDEBAR ===
-st.sidebar.header("Filter Data")
-selected_code = st.sidebar.selectbox("📌 Pilih Kode Saham", sorted(df['Code'].unique()))
-jenis_pilih = st.sidebar.radio("Jenis Investor", ["Lokal", "Asing"], horizontal=True)
-kategori_pilih = st.sidebar.selectbox("Kategori Investor", list(investor_mapping.values()))
+for nama_file, pesan in load_errors().items():
+    st.warning(f"⚠️ File `{nama_file}` gagal dibaca dan dilewati: {pesan}")
 
-# Filter sesuai kode saham
-df_code = df[df['Code'] == selected_code].copy()
+@st.cache_resource(show_spinner=False)
+def _muat_cube(version, types):
+    # satu kubus per (versi dataset, set Type), dipakai bersama oleh semua sesi;
+    # hanya partisi Type yang dipilih yang dibaca dari store
+    return muat_cube_ksei(types=list(types))
 
-# === Ringkasan lokal vs asing ===
-df_lokal = df_code.groupby('Bulan')[local_cols].sum().reset_index()
-df_asing = df_code.groupby('Bulan')[foreign_cols].sum().reset_index()
-df_lokal['Jenis'] = 'Lokal'
-df_asing['Jenis'] = 'Asing'
+@st.cache_resource(show_spinner=False)
+def _muat_valuasi(cube_version, _cube):
+    # argumen berawalan '_' tidak di-hash oleh Streamlit; kunci cache = versi kubus
+    return muat_valuasi_ksei(_cube)
 
-df_lokal.columns = ['Bulan'] + list(investor_mapping.values()) + ['Jenis']
-df_asing.columns = ['Bulan'] + list(investor_mapping.values()) + ['Jenis']
+@st.cache_resource(show_spinner=False)
+def _muat_peristiwa(cube_version, _cube):
+    return muat_peristiwa_ksei(_cube)
 
-df_all_raw = pd.concat([df_lokal, df_asing])
-df_melt = df_all_raw.melt(
-    id_vars=['Bulan', 'Jenis'],
-    var_name='Kategori Lengkap',
-    value_name='Jumlah Saham'
+# === FILTER di SIDEBAR ===
+st.sidebar.header("Filter Data")
+tipe_pilih = st.sidebar.multiselect(
+    "🏷️ Jenis Efek",
+    tipe_tersedia,
+    default=["EQUITY"] if "EQUITY" in tipe_tersedia else tipe_tersedia[:1],
 )
+if not tipe_pilih:
+    st.info("Pilih minimal satu jenis efek.")
+    st.stop()
+
+with span("ksei.cube"):
+    cube = _muat_cube(dataset_version(), tuple(sorted(tipe_pilih)))
+with span("ksei.valuasi"):
+    valuasi = _muat_valuasi(cube.version, cube)
+selected_code = st.sidebar.selectbox("📌 Pilih Kode Saham", list(cube.codes))
+jenis_pilih = st.sidebar.radio("Jenis Investor", ["Lokal", "Asing"], horizontal=True)
+kategori_pilih = st.sidebar.selectbox("Kategori Investor", list(investor_mapping.values()))
+satuan_pilih = st.sidebar.radio("Satuan", list(SATUAN), horizontal=True)
+data_satuan, kolom_satuan = pilih_satuan(cube, valuasi, satuan_pilih)
 
 # === Plot tren bulanan sesuai filter ===
-df_filtered = df_melt[
-    (df_melt["Jenis"] == jenis_pilih) &
-    (df_melt["Kategori Lengkap"] == kategori_pilih)
-].copy()
-
-if not df_filtered.empty:
-    fig = px.line(
-        df_filtered.sort_values("Bulan"),
-        x="Bulan", y="Jumlah Saham",
-        markers=True,
-        title=f"Tren Bulanan {kategori_pilih} – {jenis_pilih} ({selected_code})",
-        labels={"Jumlah Saham": "Jumlah Saham", "Bulan": "Bulan"}
-    )
-    fig.update_xaxes(dtick="M1", tickformat="%b\n%Y")
-    st.plotly_chart(fig, use_container_width=True)
-else:
-    st.warning("Tidak ada data untuk filter yang dipilih.")
+# figur di-cache lintas sesi per (versi kubus, kode, grafik, satuan/filter): pindah kode bolak-balik
+# tidak membangun ulang figur sama sekali
+with span("plot.tren_filter"):
+    plot_tren_filter(cube, selected_code, investor_mapping, jenis_pilih, kategori_pilih,
+                     data=data_satuan, kolom=kolom_satuan)
 
 # === Visualisasi tambahan ===
 # Total summary lokal vs asing
-df_code['Total Lokal'] = df_code[local_cols].sum(axis=1)
-df_code['Total Asing'] = df_code[foreign_cols].sum(axis=1)
-df_summary = df_code.groupby('Bulan')[['Total Lokal', 'Total Asing']].sum().reset_index()
-df_summary['Total'] = df_summary['Total Lokal'] + df_summary['Total Asing']
-plot_line_trend_summary(df_summary, selected_code)
-tampilkan_pie_terakhir(df_summary, selected_code)
-
-# Pie & bar chart bulan terakhir
-latest_month = df_melt['Bulan'].max()
-df_all_latest = df_melt[df_melt['Bulan'] == latest_month].copy()
-df_all_latest['Total'] = df_all_latest.groupby('Jenis')['Jumlah Saham'].transform('sum')
-df_all_latest['Persentase'] = (df_all_latest['Jumlah Saham'] / df_all_latest['Total']) * 100
-plot_bar_per_kategori_terakhir(df_all_latest, selected_code, latest_month)
+with span("plot.summary"):
+    plot_line_trend_summary(cube, selected_code, data=data_satuan, kolom=kolom_satuan)
+    tampilkan_pie_terakhir(cube, selected_code, data=data_satuan, kolom=kolom_satuan)
+
+# Bar chart bulan terakhir
+with span("plot.bar_terakhir"):
+    plot_bar_per_kategori_terakhir(cube, selected_code, investor_mapping, data=data_satuan, kolom=kolom_satuan)
 
 # Grafik tren semua kategori
-df_plot = df_melt.copy()
-df_plot['Label'] = df_plot['Jenis'] + ' - ' + df_plot['Kategori Lengkap']
-df_plot_grouped = df_plot.groupby(['Bulan', 'Label'])['Jumlah Saham'].sum().reset_index()
-plot_line_per_kategori(df_plot_grouped, selected_code)
+with span("plot.per_kategori"):
+    plot_line_per_kategori(cube, selected_code, investor_mapping, data=data_satuan, kolom=kolom_satuan)
+
+# Arus nilai: pisahkan efek harga vs efek perubahan jumlah saham
+if satuan_pilih == "Nilai (Rp)":
+    with span("plot.arus_nilai"):
+        tampilkan_arus_nilai(cube, valuasi, selected_code)
 
 # Tabel perubahan
-df_trend = df_melt.copy()
-df_trend['Δ Saham'] = df_trend.groupby(['Jenis', 'Kategori Lengkap'])['Jumlah Saham'].diff().fillna(0).astype(int)
-df_trend['Total'] = df_trend.groupby(['Bulan', 'Jenis'])['Jumlah Saham'].transform('sum')
-df_trend['Persentase'] = (df_trend['Jumlah Saham'] / df_trend['Total']) * 100
-df_trend['Status'] = df_trend['Δ Saham'].apply(lambda x: '⬆️ Naik' if x > 0 else ('⬇️ Turun' if x < 0 else '⏸️ Stabil'))
+with span("agregasi.trend"):
+    df_trend = frame_trend(cube, selected_code, investor_mapping)
 df_trend_display = df_trend.copy()
 df_trend_display['Jumlah Saham'] = df_trend_display['Jumlah Saham'].map('{:,.0f}'.format)
 df_trend_display['Δ Saham'] = df_trend_display['Δ Saham'].map('{:,.0f}'.format)
 df_trend_display['Persentase'] = df_trend_display['Persentase'].map('{:.2f}%'.format)
-tampilkan_tabel_trend_kategori(df_trend_display)
+with span("tabel.trend"):
+    tampilkan_tabel_trend_kategori(df_trend_display)
+
+# Peristiwa signifikan kode ini (indeks dibangun sekali per versi kubus, di sini cukup slicing)
+with st.expander(f"⚡ Peristiwa signifikan {selected_code}"):
+    with span("peristiwa.kode"):
+        df_peristiwa = peristiwa_kode(cube, _muat_peristiwa(cube.version, cube), selected_code, investor_mapping)
+    st.dataframe(df_peristiwa.iloc[::-1], use_container_width=True, hide_index=True)
+
+# Pivot Excel: workbook baru dibuat saat tombol diklik, di-cache per (versi kubus, kode)
+df_pivot_table = frame_pivot(cube, selected_code, investor_mapping)
+with span("tabel.pivot_excel"):
+    tampilkan_pivot_excel(
+        df_pivot_table, selected_code,
+        lambda: baca_bytes(ekspor_kode(cube, selected_code, investor_mapping)),
+    )
+
+# Ekspor multi-kode (satu sheet per kode)
+with st.expander("📦 Ekspor Excel multi-kode"):
+    semua_kode = st.checkbox("Semua kode", value=False, key="ekspor_semua")
+    watchlist = st.multiselect("Watchlist", list(cube.codes), default=[selected_code],
+                               key="ekspor_watchlist", disabled=semua_kode)
+    kode_ekspor = None if semua_kode else list(watchlist)
+    if semua_kode or watchlist:
+        st.download_button(
+            label=f"📥 Download {len(cube.codes) if semua_kode else len(watchlist)} kode (Excel)",
+            data=lambda: baca_bytes(ekspor_multi(cube, kode_ekspor, investor_mapping)),
+            file_name="Rekap_MultiKode.xlsx",
+            mime=XLSX_MIME,
+            key="download_excel_multi",
+        )
 
-# Pivot Excel
-df_pivot_table = df_trend.copy()
-df_pivot_table['Bulan Format'] = pd.to_datetime(df_pivot_table['Bulan'], errors='coerce').dt.strftime('%b %Y')
-df_pivot_table['Δ Saham'] = df_pivot_table['Δ Saham'].astype(int)
-df_pivot_table['Jumlah Saham'] = df_pivot_table['Jumlah Saham'].astype(int)
-df_pivot_table['Persentase'] = df_pivot_table['Persentase'].map(lambda x: f"{x:.2f}%")
-df_pivot_table = df_pivot_table[['Kategori Lengkap', 'Bulan Format', 'Δ Saham', 'Jumlah Saham', 'Persentase']]
-tampilkan_pivot_excel(df_pivot_table, selected_code)
 
+# === Berita ===
+# Bagian berita berjalan sebagai fragment: widget di dalamnya (cari arsip) hanya me-rerun
+# bagian ini. Hasil RSS/Google di-cache per (kode, sumber, kata kunci), jadi klik grafik
+# (Jenis/Kategori/Satuan) tidak memicu fetch ulang. Modul scraping/DB diimpor saat dipakai.
+@st.cache_data(show_spinner=False)
+def _alias_saham():
+    return load_alias()  # kalau gagal, fungsi sudah return {}
+
+@st.cache_data(ttl=FEED_TTL, show_spinner=False)
+def _cari_berita(kode, sources, extra_keywords):
+    """(keyword_cari, berita ter-cluster, feed gagal) untuk satu kombinasi input."""
+    from berita_dedup import cluster_berita
+    from scraping import ambil_berita_google
+
+    saham_alias = _alias_saham()
+    # Ambil dari RSS dgn filter longgar (semua feed paralel, tiap feed ada deadline)
+    feed_status = {}
+    with span("berita.rss"):
+        keyword_cari, berita = ambil_berita_dengan_alias(
+            kode,
+            saham_alias,
+            sources=list(sources) or None,
+            extra_keywords=list(extra_keywords),
+            feed_status=feed_status
+        )
+    feed_gagal = {url: s for url, s in feed_status.items() if s["status"] not in FEED_OK_STATUS}
+
+    # Fallback: kalau tetap kosong, ambil dari Google News berdasarkan kode+alias
+    if not berita:
+        alias_txt = saham_alias.get(kode, "")
+        with span("berita.google"):
+            berita = cluster_berita(ambil_berita_google(f"{kode} {alias_txt}".strip()))
+    return keyword_cari, berita, feed_gagal
+
+@st.fragment
+def bagian_berita(selected_code, chosen_sources, extra_kw_list):
+    from berita_dedup import anggota, cluster_berita
+    from scraping import ambil_isi_berita_batch
+
+    saham_alias = _alias_saham()
+    label_to_url = get_source_labels()
+    keyword_cari, berita, feed_gagal = _cari_berita(
+        selected_code, tuple(label_to_url[l] for l in chosen_sources), tuple(extra_kw_list)
+    )
+
+    st.subheader(f"🗞️ Berita Terkait Saham `{selected_code}`")
+    st.caption(f"🔎 Pencarian: `{selected_code}, {saham_alias.get(selected_code,'')}` • Sumber: {', '.join(chosen_sources) or 'Default'}")
+    if feed_gagal:
+        url_to_label = {u: l for l, u in label_to_url.items()}
+        st.caption("⚠️ Feed tidak tersedia: " + ", ".join(
+            f"{url_to_label.get(u, u)} ({s['status']})" for u, s in feed_gagal.items()
+        ))
+
+    if not berita:
+        st.info("Belum ada berita yang cocok. Coba ubah sumber RSS atau tambah kata kunci.")
+    else:
+        # prefetch isi artikel paralel (session ber-pool), cukup satu link wakil per cluster;
+        # yang belum selesai pakai ringkasan dulu (rerun berikutnya kena cache isi di memori)
+        with span("berita.isi_batch"):
+            isi_berita = ambil_isi_berita_batch([it.get("link") or "" for it in berita[:25]])
+        # isi lengkap bisa menyatukan cluster yang judulnya beda jauh
+        berita = cluster_berita([dict(it, content=isi_berita.get(it.get("link") or "") or "") for it in berita[:25]])
+        for it in berita:
+            title = it.get("judul") or "(tanpa judul)"
+            link  = it.get("link") or ""
+            pub   = it.get("pubDate","")
+            src   = it.get("source","")
+            st.markdown(f"**[{title}]({link})**  \n<small>{src} • {pub}</small>", unsafe_allow_html=True)
+            if it["duplikat"]:
+                st.caption("Juga diberitakan: " + " • ".join(
+                    f"[{d.get('source') or 'sumber lain'}]({d.get('link') or ''})" for d in it["duplikat"]
+                ))
+            with st.expander("Lihat isi"):
+                teks = it.get("content")
+                st.write(teks or ("> " + (it.get("summary") or "Ringkasan tidak tersedia.")))
+            st.divider()
+
+        # simpan ke cache DB (bulk upsert) supaya bisa dicari lewat index full-text;
+        # anggota cluster ikut disimpan (tanpa isi) agar link-nya tetap ada di arsip.
+        # Hanya kalau ada yang baru (link / isi) sejak simpan terakhir di sesi ini.
+        semua = [m for it in berita for m in anggota(it)]
+        jejak = (selected_code, keyword_cari, tuple((m.get("link"), bool(m.get("content"))) for m in semua))
+        if st.session_state.get("_berita_tersimpan") != jejak:
+            try:
+                from news_cache import upsert_news
+                with span("berita.simpan_db"):
+                    upsert_news(selected_code, semua, keyword_cari)
+                st.session_state["_berita_tersimpan"] = jejak
+            except Exception as e:
+                st.caption(f"⚠️ Gagal menyimpan cache berita: {e}")
+
+    # --- Cari arsip berita (full-text) ---
+    st.subheader("🔍 Cari Arsip Berita")
+    cari = st.text_input("Kata kunci (mis. right issue, buyback)", "", key="fts_query")
+    hanya_kode = st.checkbox(f"Hanya berita terkait {selected_code}", value=False, key="fts_only_code")
+    if cari.strip():
+        try:
+            from news_cache import search_articles
+            with span("berita.cari"):
+                hasil = search_articles(cari, kodes=[selected_code] if hanya_kode else None, limit=20)
+        except Exception as e:
+            hasil = None
+            st.warning(f"Pencarian tidak tersedia: {e}")
+        if hasil is not None and hasil.empty:
+            st.info("Tidak ada artikel di arsip yang cocok.")
+        elif hasil is not None:
+            for _, row in hasil.iterrows():
+                st.markdown(f"**[{row['judul']}]({row['link']})**  \n<small>{row['source'] or ''} • {row['pub_date'] or ''} • {row['kode']}</small>", unsafe_allow_html=True)
+                st.markdown(row["snippet"] or "")
 
-# asumsi: selected_code & saham_alias sudah ada di atas
-# --- Pastikan df sudah ada & kolom Code tersedia ---
-# df = ...  # <- data utama kamu
 # --- ALIAS & SUMBER RSS ---
-saham_alias = load_alias()  # kalau gagal, fungsi sudah return {}
 label_to_url = get_source_labels()
 
 chosen_sources = st.sidebar.multiselect(
@@ -131,38 +262,11 @@ chosen_sources = st.sidebar.multiselect(
 extra_kw = st.sidebar.text_input("Kata kunci tambahan (opsional, pisahkan koma)", "", key="extra_kw_sidebar")
 extra_kw_list = [x.strip() for x in extra_kw.split(",") if x.strip()]
 
-# Ambil dari RSS dgn filter longgar
-keyword_cari, berita = ambil_berita_dengan_alias(
-    selected_code,
-    saham_alias,
-    sources=[label_to_url[l] for l in chosen_sources] if chosen_sources else None,
-    extra_keywords=extra_kw_list
-)
-
-# Fallback: kalau tetap kosong, ambil dari Google News berdasarkan kode+alias
-if not berita:
-    alias_txt = saham_alias.get(selected_code, "")
-    berita = ambil_berita_google(f"{selected_code} {alias_txt}".strip())
-
-st.subheader(f"🗞️ Berita Terkait Saham `{selected_code}`")
-st.caption(f"🔎 Pencarian: `{selected_code}, {saham_alias.get(selected_code,'')}` • Sumber: {', '.join(chosen_sources) or 'Default'}")
-
-if not berita:
-    st.info("Belum ada berita yang cocok. Coba ubah sumber RSS atau tambah kata kunci.")
-else:
-    for it in berita[:25]:
-        title = it.get("judul") or "(tanpa judul)"
-        link  = it.get("link") or ""
-        pub   = it.get("pubDate","")
-        src   = it.get("source","")
-        st.markdown(f"**[{title}]({link})**  \n<small>{src} • {pub}</small>", unsafe_allow_html=True)
-        with st.expander("Lihat isi"):
-            teks = ambil_isi_berita(link)
-            st.write(teks or ("> " + (it.get("summary") or "Ringkasan tidak tersedia.")))
-        st.divider()
+with span("berita"):
+    bagian_berita(selected_code, chosen_sources, extra_kw_list)
 
 # --- Sidebar: pilih saham & sumber ---
-kode_list = sorted(df["Code"].unique())
+kode_list = list(cube.codes)
 selected_code = st.sidebar.selectbox("📌 Pilih Kode Saham", kode_list, key="sb_kode")
 
 label_to_url = get_source_labels()
@@ -213,3 +317,53 @@ max_age = st.sidebar.slider("Maks umur cache (jam)", 1, 48, 12, key="sb_cache_ag
 
 # keyword_cari, berita = ambil_berita_dengan_alias(selected_code, saham_alias, ...)
 # upsert_news(selected_code, berita)
+
+
+# === Panel debug (tersembunyi): buka app dengan ?debug=1 ===
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    _ctx = get_script_run_ctx()
+    _session_id = _ctx.session_id if _ctx else None
+except Exception:
+    _session_id = None
+rekaman_rerun = profiling.selesai_rerun(session=_session_id)
+
+if st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🛠️ Debug: waktu per tahap", expanded=True):
+        st.caption(f"Rerun ini: {rekaman_rerun['total_s'] * 1000:,.0f} ms")
+        st.dataframe(pd.DataFrame([
+            {"Tahap": "\u00a0\u00a0" * sp["depth"] + sp["nama"], "ms": round(sp["s"] * 1000, 1)}
+            for sp in rekaman_rerun["spans"]
+        ]), hide_index=True, use_container_width=True)
+
+        # impor lokal: db menarik sqlalchemy, cukup dibayar saat panel debug dibuka
+        from db import pool_stats
+        st.caption("Pool koneksi DB (proses ini)")
+        st.dataframe(pd.DataFrame([
+            {"Metrik": k[:-2] + "_ms", "Nilai": round(v * 1000, 1)} if k.endswith("_s") else {"Metrik": k, "Nilai": v}
+            for k, v in pool_stats().items()
+        ]), hide_index=True, use_container_width=True)
+
+        st.caption("Semua sesi di proses ini (p50/p95, ms)")
+        stat = profiling.statistik()
+        st.dataframe(pd.DataFrame([
+            {"Tahap": k, "n": v["count"], "p50": round(v["p50_s"] * 1000, 1),
+             "p95": round(v["p95_s"] * 1000, 1), "max": round(v["max_s"] * 1000, 1)}
+            for k, v in stat.items()
+        ]), hide_index=True, use_container_width=True)
+
+        if st.button("🔬 Profil rerun berikutnya (cProfile)", key="dbg_profil"):
+            st.session_state["_profil_rerun"] = True
+            st.rerun()
+        if "profil" in rekaman_rerun:
+            st.code(rekaman_rerun["profil"], language=None)
+
+        st.download_button(
+            "⬇️ Rerun ini (JSONL)",
+            profiling.jsonl({k: v for k, v in rekaman_rerun.items() if k != "profil"}) + "\n",
+            file_name="rerun.jsonl", key="dbg_jsonl",
+        )
+        st.download_button(
+            "⬇️ Metrik (Prometheus)", profiling.prometheus_text(),
+            file_name="metrics.prom", key="dbg_prom",
+        )
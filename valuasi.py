@@ -0,0 +1,111 @@
+# valuasi.py
+"""
+Valuasi kepemilikan: jumlah saham per kategori -> nilai pasar rupiah (× Price)
+dan % dari efek beredar (÷ Sec. Num), untuk semua kode × bulan sekaligus.
+
+Arus nilai bulanan dipecah jadi efek harga dan efek jumlah:
+    ΔV = (P_t - P_{t-1}) · Q_{t-1}  +  P_t · (Q_t - Q_{t-1})
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from ksei_cube import OwnershipCube
+
+VALUASI_NAME = "valuasi.npz"
+
+# label sidebar -> (atribut, nama kolom di frame)
+SATUAN: Dict[str, Tuple[str, str]] = {
+    "Lembar Saham": ("shares", "Jumlah Saham"),
+    "Nilai (Rp)": ("nilai", "Nilai (Rp)"),
+    "% Saham Beredar": ("persen_beredar", "% Saham Beredar"),
+}
+
+
+@dataclass(frozen=True)
+class Valuasi:
+    nilai: np.ndarray           # (C, M, 2, 9) rupiah
+    persen_beredar: np.ndarray  # (C, M, 2, 9) % dari Sec. Num, NaN kalau Sec. Num kosong
+    arus_nilai: np.ndarray      # (C, M, 2, 9) ΔV vs bulan sebelumnya
+    efek_harga: np.ndarray      # (C, M, 2, 9) (P_t - P_{t-1}) · Q_{t-1}
+    efek_jumlah: np.ndarray     # (C, M, 2, 9) P_t · ΔQ
+    version: str = ""
+
+
+def hitung_valuasi(cube: OwnershipCube) -> Valuasi:
+    q = cube.shares.astype(np.float64)
+    p = cube.price[:, :, None, None]
+    nilai = q * p
+
+    so = cube.sec_num.astype(np.float64)[:, :, None, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        persen = np.where(so > 0, q / so * 100, np.nan)
+
+    valid = np.zeros_like(cube.present)
+    valid[:, 1:] = cube.present[:, 1:] & cube.present[:, :-1]
+    efek_harga = np.zeros_like(nilai)
+    efek_jumlah = np.zeros_like(nilai)
+    efek_harga[:, 1:] = (p[:, 1:] - p[:, :-1]) * q[:, :-1]
+    efek_jumlah[:, 1:] = p[:, 1:] * (q[:, 1:] - q[:, :-1])
+    efek_harga[~valid] = 0.0
+    efek_jumlah[~valid] = 0.0
+
+    return Valuasi(
+        nilai=nilai,
+        persen_beredar=persen,
+        arus_nilai=efek_harga + efek_jumlah,
+        efek_harga=efek_harga,
+        efek_jumlah=efek_jumlah,
+        version=cube.version,
+    )
+
+
+def pilih_satuan(cube: OwnershipCube, valuasi: Valuasi, satuan: str) -> Tuple[np.ndarray, str]:
+    """Array (C, M, 2, 9) + nama kolom untuk satuan yang dipilih di sidebar."""
+    attr, kolom = SATUAN[satuan]
+    src = cube if attr == "shares" else valuasi
+    return getattr(src, attr), kolom
+
+
+def save_valuasi(val: Valuasi, path: str) -> None:
+    # unik per thread: sesi Streamlit berbagi satu proses
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}.npz"
+    np.savez(
+        tmp,
+        nilai=val.nilai,
+        persen_beredar=val.persen_beredar,
+        efek_harga=val.efek_harga,
+        efek_jumlah=val.efek_jumlah,
+        version=np.array(val.version),
+    )
+    os.replace(tmp, path)
+
+
+def load_valuasi(path: str) -> Valuasi | None:
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as z:
+        return Valuasi(
+            nilai=z["nilai"],
+            persen_beredar=z["persen_beredar"],
+            arus_nilai=z["efek_harga"] + z["efek_jumlah"],
+            efek_harga=z["efek_harga"],
+            efek_jumlah=z["efek_jumlah"],
+            version=str(z["version"]),
+        )
+
+
+__all__ = [
+    "SATUAN",
+    "VALUASI_NAME",
+    "Valuasi",
+    "hitung_valuasi",
+    "pilih_satuan",
+    "save_valuasi",
+    "load_valuasi",
+]
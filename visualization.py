@@ -1,62 +1,79 @@
 import streamlit as st
-import plotly.express as px
-import io
-import pandas as pd
-import plotly.graph_objects as go
-
- 
-def plot_bar_perbandingan(df_melt):
-    fig = px.bar(df_melt, 
-                 x='Bulan', 
-                 y='Jumlah Saham', 
-                 color='Jenis', 
-                 facet_col='Kategori Lengkap', 
-                 facet_col_wrap=3, 
-                 title="Perbandingan Kepemilikan per Bulan: Lokal vs Asing",
-                 height=800)
-    st.plotly_chart(fig, use_container_width=True, key="bar_perbandingan")
-
-
-def plot_line_trend_summary(df_summary, selected_code):
-    st.subheader(f"📈 Tren Kepemilikan Saham - {selected_code}")
-    st.line_chart(df_summary.set_index('Bulan'), use_container_width=True)
+
+import grafik
+
+GRAFIK_CACHE_MAX = 256   # figur (kode × grafik × satuan) yang disimpan lintas sesi
 
 
+@st.cache_resource(max_entries=GRAFIK_CACHE_MAX, show_spinner=False)
+def _spec(versi, code, nama, params, _bangun):
+    # spesifikasi JSON figur dibangun & diserialkan sekali per (versi kubus, kode, grafik,
+    # parameter) untuk semua sesi; `_bangun` tidak di-hash, kunci cukup dari argumen lain
+    return grafik.spesifikasi(_bangun())
 
 
-def tampilkan_pie_terakhir(df_summary, selected_code):
-    latest_month = df_summary['Bulan'].max()
-    latest_data = df_summary[df_summary['Bulan'] == latest_month]
+def _tampilkan(cube, code, nama, params, bangun, key):
+    spec = _spec(cube.version, code, nama, params, bangun)
+    if spec is not None:
+        st.plotly_chart(grafik.FigurSiap(spec), use_container_width=True, key=key)
 
-    if not latest_data.empty:
-        df_pie = latest_data.melt(id_vars='Bulan', value_vars=['Total Lokal', 'Total Asing'])
-        fig = px.pie(df_pie, names='variable', values='value', title=f"Komposisi Kepemilikan ({latest_month})")
-        st.plotly_chart(fig, use_container_width=True, key=f"pie_komposisi_{selected_code}")
+
+def plot_tren_filter(cube, selected_code, investor_mapping, jenis, kategori, data=None, kolom='Jumlah Saham'):
+    _tampilkan(
+        cube, selected_code, "tren_filter", (kolom, jenis, kategori),
+        lambda: grafik.tren_filter(cube, selected_code, investor_mapping, jenis, kategori, data, kolom),
+        key=f"tren-filter-{selected_code}",
+    )
 
 
-def plot_line_per_kategori(df_plot_grouped, selected_code):
-    fig = px.line(
-        df_plot_grouped,
-        x='Bulan',
-        y='Jumlah Saham',
-        color='Label',
-        title=f"📈 Tren Bulanan Kategori Investor - {selected_code}",
-        markers=True
+def plot_bar_perbandingan(cube, selected_code, investor_mapping, data=None, kolom='Jumlah Saham'):
+    _tampilkan(
+        cube, selected_code, "perbandingan", (kolom,),
+        lambda: grafik.perbandingan(cube, selected_code, investor_mapping, data, kolom),
+        key="bar_perbandingan",
     )
-    fig.update_layout(xaxis_title="Bulan", yaxis_title="Jumlah Saham", legend_title="Kategori Investor")
-    st.plotly_chart(fig, use_container_width=True, key=f"line-per-kategori-{selected_code}")
-
-
-def plot_bar_per_kategori_terakhir(df_all_latest, selected_code, latest_month):
-    fig = px.bar(
-        df_all_latest,
-        x='Kategori Lengkap',
-        y='Jumlah Saham',
-        color='Jenis',
-        barmode='group',
-        title=f"📊 Komposisi Kepemilikan Terakhir ({latest_month}) - {selected_code}"
+
+
+def plot_line_trend_summary(cube, selected_code, data=None, kolom='Jumlah Saham'):
+    st.subheader(f"📈 Tren Kepemilikan Saham - {selected_code}")
+    _tampilkan(
+        cube, selected_code, "ringkasan", (kolom,),
+        lambda: grafik.ringkasan(cube, selected_code, data, kolom),
+        key=f"ringkasan-{selected_code}",
+    )
+
+
+def tampilkan_pie_terakhir(cube, selected_code, data=None, kolom='Jumlah Saham'):
+    _tampilkan(
+        cube, selected_code, "pie_terakhir", (kolom,),
+        lambda: grafik.pie_terakhir(cube, selected_code, data, kolom),
+        key=f"pie_komposisi_{selected_code}",
+    )
+
+
+def plot_line_per_kategori(cube, selected_code, investor_mapping, data=None, kolom='Jumlah Saham'):
+    _tampilkan(
+        cube, selected_code, "per_kategori", (kolom,),
+        lambda: grafik.per_kategori(cube, selected_code, investor_mapping, data, kolom),
+        key=f"line-per-kategori-{selected_code}",
+    )
+
+
+def plot_bar_per_kategori_terakhir(cube, selected_code, investor_mapping, data=None, kolom='Jumlah Saham'):
+    _tampilkan(
+        cube, selected_code, "bar_terakhir", (kolom,),
+        lambda: grafik.bar_terakhir(cube, selected_code, investor_mapping, data, kolom),
+        key=f"bar-kategori-{selected_code}",
+    )
+
+
+def tampilkan_arus_nilai(cube, valuasi, selected_code):
+    st.subheader(f"💰 Arus Nilai Bulanan (Efek Harga vs Efek Jumlah) - {selected_code}")
+    _tampilkan(
+        cube, selected_code, "arus_nilai", (),
+        lambda: grafik.arus_nilai(cube, selected_code, valuasi),
+        key=f"arus-nilai-{selected_code}",
     )
-    st.plotly_chart(fig, use_container_width=True, key=f"bar-kategori-{selected_code}")
 
 
 def tampilkan_tabel_trend_kategori(df_trend_display):
@@ -66,16 +83,13 @@ def tampilkan_tabel_trend_kategori(df_trend_display):
     )
 
 
-def tampilkan_pivot_excel(df_pivot_table, selected_code):
+def tampilkan_pivot_excel(df_pivot_table, selected_code, data_excel):
+    """`data_excel`: callable tanpa argumen -> bytes; baru dipanggil saat tombol diklik."""
     st.dataframe(df_pivot_table, use_container_width=True)
 
-    excel_buffer = io.BytesIO()
-    df_pivot_table.to_excel(excel_buffer, sheet_name="Pivot Multi-Kolom", index=True)
-    excel_buffer.seek(0)
-
     st.download_button(
         label="📥 Download Tabel Multi-Kolom Excel",
-        data=excel_buffer,
+        data=data_excel,
         file_name=f"Rekap_MultiKolom_{selected_code}.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         key=f"download_excel_{selected_code}"